@@ -0,0 +1,183 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Sequence
+
+from PyQt5.QtCore import QEasingCurve, QPoint, Qt, QTimer
+
+from core.enums import TweenKind
+
+Callback = Callable[[], None] | None
+
+
+class Batch:
+    # анимации одного шага: done вызывается один раз, когда доиграла последняя.
+    # Пока batch не закрыт (close), в него можно добавлять анимации
+    __slots__ = ("pending", "done", "closed")
+
+    def __init__(self, done: Callback = None):
+        self.pending = 0
+        self.done = done
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self._check()
+
+    def _check(self):
+        if self.closed and self.pending == 0 and self.done:
+            done, self.done = self.done, None
+            done()
+
+
+class Tween:
+    # одна анимация спрайта; объекты переиспользуются через пул Animator
+    __slots__ = ("kind", "canvas", "sprite", "start", "end", "began", "duration",
+                 "easing", "fps", "peak", "batch", "done")
+
+    def reset(self):
+        self.canvas = self.sprite = self.start = self.end = self.easing = None
+        self.batch = self.done = None
+
+
+class Animator:
+    # одни часы на все анимации процесса: раз в кадр двигает все активные спрайты,
+    # листает кадры взрывов и подсветку. Положение считается по времени, поэтому кадр,
+    # в который не уложились в бюджет, следующий догоняет без рывка назад. Только из потока GUI
+    _instance = None
+    FRAME_MS = 16
+    # столько мс кадра можно потратить на анимации; остальные двигаем в следующем кадре
+    BUDGET_MS = 8
+    POOL_SIZE = 256
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._active: Deque[Tween] = deque()
+        self._pool: List[Tween] = []
+        self._curves: Dict[QEasingCurve.Type, QEasingCurve] = {}
+        # таймер создаётся при первой анимации: модуль импортируется раньше QApplication
+        self._timer: QTimer | None = None
+        # кадров отыграно / сколько из них не уложились в бюджет
+        self.ticks = self.overruns = 0
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter() * 1000
+
+    def __len__(self):
+        return len(self._active)
+
+    def batch(self, done: Callback = None) -> Batch:
+        return Batch(done)
+
+    def move(self, canvas, sprite, end: QPoint, duration: int, easing: QEasingCurve.Type,
+             done: Callback = None, batch: Batch | None = None) -> Tween:
+        tween = self._start(TweenKind.MOVE, canvas, sprite, duration, done, batch)
+        tween.start, tween.end = QPoint(sprite.pos), QPoint(end)
+        tween.easing = self._curve(easing)
+        return tween
+
+    def play_frames(self, canvas, sprite, frames: Sequence, fps: int,
+                    done: Callback = None, batch: Batch | None = None) -> Tween:
+        sprite.frames, sprite.frame = frames, 0
+        tween = self._start(TweenKind.FRAMES, canvas, sprite, len(frames) * 1000 // fps, done, batch)
+        tween.fps = fps
+        return tween
+
+    def glow(self, canvas, sprite, duration: int, peak: float) -> Tween:
+        # подсветка нарастает до peak к середине и гаснет к концу
+        tween = self._start(TweenKind.GLOW, canvas, sprite, duration, None, None)
+        tween.peak = peak
+        tween.easing = self._curve(QEasingCurve.InOutQuad)
+        return tween
+
+    def cancel(self, canvas):
+        # холст удалён: его анимации больше не двигаем, колбэки не вызываем
+        for tween in [t for t in self._active if t.canvas is canvas]:
+            self._active.remove(tween)
+            self._release(tween)
+
+    def _curve(self, easing: QEasingCurve.Type) -> QEasingCurve:
+        curve = self._curves.get(easing)
+        if curve is None:
+            curve = self._curves[easing] = QEasingCurve(easing)
+        return curve
+
+    def _start(self, kind: TweenKind, canvas, sprite, duration: int, done: Callback,
+               batch: Batch | None) -> Tween:
+        tween = self._pool.pop() if self._pool else Tween()
+        tween.kind, tween.canvas, tween.sprite = kind, canvas, sprite
+        tween.began, tween.duration = self.now(), max(duration, 1)
+        tween.batch, tween.done = batch, done
+        if batch is not None:
+            batch.pending += 1
+        self._active.append(tween)
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setTimerType(Qt.PreciseTimer)
+            self._timer.setInterval(self.FRAME_MS)
+            self._timer.timeout.connect(self._tick)
+        if not self._timer.isActive():
+            self._timer.start()
+        return tween
+
+    def _tick(self):
+        self.ticks += 1
+        now = self.now()
+        deadline = time.perf_counter() + self.BUDGET_MS / 1000
+        finished = []
+        # необработанные остаются в начале очереди и пойдут первыми в следующем кадре
+        for _ in range(len(self._active)):
+            tween = self._active.popleft()
+            if self._advance(tween, now):
+                finished.append(tween)
+            else:
+                self._active.append(tween)
+            if time.perf_counter() > deadline:
+                self.overruns += 1
+                break
+        # колбэки — после кадра: они могут запустить следующие анимации
+        for tween in finished:
+            self._finish(tween)
+        if not self._active:
+            self._timer.stop()
+
+    def _advance(self, tween: Tween, now: float) -> bool:
+        canvas, sprite = tween.canvas, tween.sprite
+        t = min(1.0, (now - tween.began) / tween.duration)
+        if tween.kind == TweenKind.MOVE:
+            p = tween.easing.valueForProgress(t)
+            start, end = tween.start, tween.end
+            canvas.move_sprite(sprite, QPoint(round(start.x() + (end.x() - start.x()) * p),
+                                              round(start.y() + (end.y() - start.y()) * p)))
+        elif tween.kind == TweenKind.FRAMES:
+            frame = int((now - tween.began) * tween.fps / 1000)
+            if frame >= len(sprite.frames):
+                canvas.remove(sprite)
+                return True
+            if frame != sprite.frame:
+                sprite.frame = frame
+                canvas.set_pixmap(sprite, sprite.frames[frame])
+            return False
+        elif tween.kind == TweenKind.GLOW:
+            p = tween.easing.valueForProgress(t)
+            canvas.set_glow(sprite, tween.peak * (1 - abs(2 * p - 1)) if t < 1.0 else 0.0)
+        return t >= 1.0
+
+    def _release(self, tween: Tween):
+        tween.reset()
+        if len(self._pool) < self.POOL_SIZE:
+            self._pool.append(tween)
+
+    def _finish(self, tween: Tween):
+        batch, done = tween.batch, tween.done
+        self._release(tween)
+        if done:
+            done()
+        if batch is not None:
+            batch.pending -= 1
+            batch._check()
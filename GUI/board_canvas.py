@@ -0,0 +1,240 @@
+from typing import Dict, List, Tuple
+
+from PyQt5.QtCore import QEasingCurve, QPoint, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+from GUI.animator import Animator, Batch, Callback, Tween
+from core.audio_manager import AudioManager
+from core.element import Element
+from core.enums import Bonus, Color
+from core.resource_manager import ResourceManager
+from core.setting_deploy import get_resource_path
+
+audio = AudioManager.instance()
+resources = ResourceManager.instance()
+animator = Animator.instance()
+
+Cell = Tuple[int, int]
+
+
+class Sprite:
+    # картинка на холсте доски: фишка, ракета или взрыв
+    __slots__ = ("pixmap", "pos", "element", "row", "col", "glow", "frames", "frame")
+
+    def __init__(self, pixmap: QPixmap, pos: QPoint, element: Element | None = None,
+                 row: int | None = None, col: int | None = None):
+        self.pixmap = pixmap
+        self.pos = QPoint(pos)
+        self.element = element
+        self.row, self.col = row, col
+        # сила подсветки после нажатия, 0..1
+        self.glow = 0.0
+        self.frames: Tuple[QPixmap, ...] = ()
+        self.frame = 0
+
+    def rect(self) -> QRect:
+        return QRect(self.pos, self.pixmap.size())
+
+    def __repr__(self):
+        return f"<Sprite row={self.row} col={self.col} element={self.element}>"
+
+
+class BoardCanvas(QWidget):
+    # вся доска — один виджет: клетки, фишки, ракеты и взрывы рисуются в одном paintEvent,
+    # а перерисовывается только то, что сдвинулось. Клетку под курсором находим
+    # арифметикой по origin и cell, а не поиском дочернего виджета
+    swap_requested = pyqtSignal(tuple, tuple)
+
+    BLOCK_IMAGES = [
+        get_resource_path(f"assets/block{i}.png")
+        for i in (1, 2)
+    ]
+    EXPLOSION_FPS = 100
+    HIGHLIGHT_MS = 1000
+    HIGHLIGHT_PEAK = 0.8
+    # на сколько пикселей сдвинуть мышь, чтобы нажатие стало перетаскиванием
+    DRAG_DISTANCE = 10
+
+    def __init__(self, parent: QWidget, origin: QPoint, rows: int, cols: int, cell: int):
+        super().__init__(parent)
+        # холст накрывает всё окно: новые фишки падают из-за верхнего края доски
+        self.setGeometry(0, 0, parent.width(), parent.height())
+        self.origin = QPoint(origin)
+        self.rows, self.cols, self.cell = rows, cols, cell
+        self.tiles: Dict[Cell, Sprite] = {}
+        # те же фишки по Element.id — шаги каскада называют фишки номерами
+        self.by_id: Dict[int, Sprite] = {}
+        # порядок отрисовки: позже добавленные — сверху
+        self._sprites: List[Sprite] = []
+        # движением, взрывами и подсветкой управляют общие часы Animator
+        self.destroyed.connect(lambda: animator.cancel(self))
+        self._grid = self._render_grid()
+        self._tinted: Dict[int, QPixmap] = {}
+        self._press: Tuple[Cell, QPoint] | None = None
+        self._dragging = False
+        self.show()
+
+    @staticmethod
+    def prewarm(size: int):
+        # декодировать кадры всех взрывов заранее, в фоне
+        resources.prewarm_frames([color.value for color in Color], size)
+        resources.prewarm_frames(["bomb"] + [color.value for color in Color], size * 2)
+
+    def _render_grid(self) -> QPixmap:
+        grid = QPixmap(self.cols * self.cell, self.rows * self.cell)
+        grid.fill(QColor(0, 0, 0, 0))
+        painter = QPainter(grid)
+        for r in range(self.rows):
+            for c in range(self.cols):
+                block = resources.pixmap(self.BLOCK_IMAGES[(r + c) % 2], self.cell, self.cell)
+                painter.drawPixmap(c * self.cell, r * self.cell, block)
+        painter.end()
+        return grid
+
+    def cell_pos(self, r: int, c: int) -> QPoint:
+        return QPoint(self.origin.x() + c * self.cell, self.origin.y() + r * self.cell)
+
+    def cell_at(self, pos: QPoint) -> Cell | None:
+        x, y = pos.x() - self.origin.x(), pos.y() - self.origin.y()
+        if x < 0 or y < 0:
+            return None
+        r, c = y // self.cell, x // self.cell
+        return (r, c) if r < self.rows and c < self.cols else None
+
+    def pixmap_for(self, elem: Element | None) -> QPixmap:
+        if elem is None:
+            return QPixmap()
+        return resources.pixmap(get_resource_path(elem.img), self.cell, self.cell)
+
+    def add_sprite(self, pixmap: QPixmap, pos: QPoint) -> Sprite:
+        sprite = Sprite(pixmap, pos)
+        self._sprites.append(sprite)
+        self.update(sprite.rect())
+        return sprite
+
+    def add_tile(self, elem: Element | None, r: int, c: int, pos: QPoint | None = None) -> Sprite:
+        sprite = self.add_sprite(self.pixmap_for(elem), pos if pos is not None else self.cell_pos(r, c))
+        sprite.row, sprite.col = r, c
+        self._set_element(sprite, elem)
+        self.tiles[(r, c)] = sprite
+        return sprite
+
+    def _set_element(self, sprite: Sprite, elem: Element | None):
+        if sprite.element is not None and self.by_id.get(sprite.element.id) is sprite:
+            del self.by_id[sprite.element.id]
+        sprite.element = elem
+        if elem is not None and elem.id:
+            self.by_id[elem.id] = sprite
+
+    def set_tile(self, sprite: Sprite, elem: Element | None):
+        self._set_element(sprite, elem)
+        sprite.pixmap = self.pixmap_for(elem)
+        self.update(QRect(sprite.pos, QSize(self.cell, self.cell)))
+
+    def tile_for(self, elem_id: int, r: int, c: int) -> Sprite | None:
+        # фишка по номеру; номер мог разойтись с контроллером после отката доски —
+        # тогда верим координатам
+        sprite = self.by_id.get(elem_id)
+        if sprite is None or (sprite.row, sprite.col) != (r, c):
+            sprite = self.tiles.get((r, c))
+        return sprite
+
+    def place_tile(self, sprite: Sprite, r: int, c: int):
+        # переставить фишку в другую клетку индекса; рисуется она там, где pos
+        if self.tiles.get((sprite.row, sprite.col)) is sprite:
+            del self.tiles[(sprite.row, sprite.col)]
+        sprite.row, sprite.col = r, c
+        self.tiles[(r, c)] = sprite
+
+    def remove(self, sprite: Sprite):
+        if sprite.element is not None and self.by_id.get(sprite.element.id) is sprite:
+            del self.by_id[sprite.element.id]
+        if sprite in self._sprites:
+            self._sprites.remove(sprite)
+            self.update(sprite.rect())
+
+    def clear_tiles(self):
+        for sprite in self.tiles.values():
+            self.remove(sprite)
+        self.tiles.clear()
+        self.by_id.clear()
+
+    def move_sprite(self, sprite: Sprite, pos: QPoint):
+        old = sprite.rect()
+        sprite.pos = QPoint(pos)
+        self.update(old.united(sprite.rect()))
+
+    def set_pixmap(self, sprite: Sprite, pixmap: QPixmap):
+        sprite.pixmap = pixmap
+        self.update(sprite.rect())
+
+    def set_glow(self, sprite: Sprite, strength: float):
+        sprite.glow = strength
+        self.update(sprite.rect())
+
+    def animate(self, sprite: Sprite, end: QPoint, duration: int, easing: QEasingCurve.Type,
+                finished: Callback = None, batch: Batch | None = None) -> Tween:
+        return animator.move(self, sprite, end, duration, easing, finished, batch)
+
+    def explode(self, color: str, pos: QPoint, bonus: Bonus = Bonus.NONE):
+        size = self.cell
+        if bonus == Bonus.BOMB:
+            size *= 2
+            frames = resources.frames("bomb", size) or resources.frames(color, size)
+        else:
+            frames = resources.frames(color, size)
+        if not frames:
+            return
+        animator.play_frames(self, self.add_sprite(frames[0], pos), frames, self.EXPLOSION_FPS)
+
+    def glow(self, sprite: Sprite):
+        animator.glow(self, sprite, self.HIGHLIGHT_MS, self.HIGHLIGHT_PEAK)
+
+    def _tint(self, pixmap: QPixmap) -> QPixmap:
+        # жёлтая копия фишки для подсветки; одна на картинку
+        key = pixmap.cacheKey()
+        tinted = self._tinted.get(key)
+        if tinted is None:
+            tinted = QPixmap(pixmap)
+            painter = QPainter(tinted)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceAtop)
+            painter.fillRect(tinted.rect(), QColor("yellow"))
+            painter.end()
+            self._tinted[key] = tinted
+        return tinted
+
+    def paintEvent(self, event):
+        dirty = event.rect()
+        painter = QPainter(self)
+        painter.drawPixmap(self.origin, self._grid)
+        for sprite in self._sprites:
+            if sprite.pixmap.isNull() or not sprite.rect().intersects(dirty):
+                continue
+            painter.drawPixmap(sprite.pos, sprite.pixmap)
+            if sprite.glow > 0:
+                painter.setOpacity(sprite.glow)
+                painter.drawPixmap(sprite.pos, self._tint(sprite.pixmap))
+                painter.setOpacity(1.0)
+
+    def mousePressEvent(self, e):
+        cell = self.cell_at(e.pos())
+        if cell is None or cell not in self.tiles:
+            e.ignore()
+            return
+        audio.play_sound("click")
+        self._press = (cell, e.pos())
+        self._dragging = False
+        self.glow(self.tiles[cell])
+
+    def mouseMoveEvent(self, e):
+        if self._press and (e.pos() - self._press[1]).manhattanLength() > self.DRAG_DISTANCE:
+            self._dragging = True
+
+    def mouseReleaseEvent(self, e):
+        if self._press and self._dragging:
+            target = self.cell_at(e.pos())
+            if target is not None and target != self._press[0]:
+                self.swap_requested.emit(self._press[0], target)
+        self._press = None
+        self._dragging = False
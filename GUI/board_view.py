@@ -1,19 +1,21 @@
 import random
 
-from PyQt5.QtCore import QPoint, QSize, QPropertyAnimation, QEasingCurve, Qt
-from PyQt5.QtGui import QPixmap, QIcon, QFontDatabase, QFont
+from PyQt5.QtCore import QPoint, QSize, QEasingCurve, Qt
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import (
     QLabel,
     QFrame, QPushButton, QWidget
 )
 
-from GUI.tile_label import TileLabel
+from GUI.board_canvas import BoardCanvas, Sprite
+from GUI.digit_display import DigitDisplay
 from core.audio_manager import AudioManager
 from core.board import Board
-from core.enums import Bonus
+from core.resource_manager import ResourceManager
 from core.setting_deploy import get_resource_path
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
 
 
 class BoardView(QWidget):
@@ -28,15 +30,6 @@ class BoardView(QWidget):
     SETTINGS_ICON = get_resource_path("assets/buttons/settings.png")
     FONT_PATH = get_resource_path("assets/FontFont.otf")
 
-    TILE_IMAGES = {
-        name: get_resource_path(f"assets/elements/{name}.png")
-        for name in ("orange", "purple", "red", "yellow")
-    }
-    BLOCK_IMAGES = [
-        get_resource_path(f"assets/block{i}.png")
-        for i in (1, 2)
-    ]
-
     def __init__(self):
         super().__init__()
         self.setEnabled(False)
@@ -45,9 +38,8 @@ class BoardView(QWidget):
         self.setWindowFlag(Qt.WindowCloseButtonHint, False)
 
         self.board = None
-        self.animations = []
-        self.selected_tile = None
-        self.tile_labels = {}
+        # что сейчас нарисовано в каждой клетке (Element.short()), чтобы перерисовывать только изменившиеся
+        self._shown = {}
         self._load_fonts()
         self._init_window()
         self._init_background()
@@ -65,9 +57,7 @@ class BoardView(QWidget):
         self.display_number('score', self.score)
 
     def _load_fonts(self):
-        font_id = QFontDatabase.addApplicationFont(self.FONT_PATH)
-        families = QFontDatabase.applicationFontFamilies(font_id)
-        self.font_family = families[0] if families else self.font().family()
+        self.font_family = resources.font_family(self.FONT_PATH)
 
     def _init_window(self):
         self.setWindowTitle("Three in row: animate window")
@@ -77,14 +67,14 @@ class BoardView(QWidget):
 
     def _init_background(self):
         lbl = QLabel(self)
-        pix = QPixmap(self.BACKGROUND_PATH).scaled(self.width(), self.height())
+        pix = resources.pixmap(self.BACKGROUND_PATH, self.width(), self.height())
         lbl.setPixmap(pix)
         lbl.setGeometry(0, 0, self.width(), self.height())
         lbl.lower()
 
     def _init_title(self):
         lbl = QLabel(self)
-        pix = QPixmap(self.TITLE_PATH).scaled(440, 200)
+        pix = resources.pixmap(self.TITLE_PATH, 440, 200)
         lbl.setPixmap(pix)
         lbl.setGeometry(30, 0, 440, 200)
         lbl.raise_()
@@ -126,65 +116,30 @@ class BoardView(QWidget):
         self.board_container = frame
 
     def _init_grid(self):
-        self.background_labels = []
-        for r in range(self.ROWS):
-            row_labels = []
-            for c in range(self.COLS):
-                lbl = QLabel(self)
-                lbl.setPixmap(
-                    QPixmap(self.BLOCK_IMAGES[(r + c) % 2])
-                    .scaled(self.CELL_SIZE, self.CELL_SIZE)
-                )
-                lbl.setGeometry(
-                    self.GRID_ORIGIN.x() + c * self.CELL_SIZE,
-                    self.GRID_ORIGIN.y() + r * self.CELL_SIZE,
-                    self.CELL_SIZE, self.CELL_SIZE
-                )
-                lbl.raise_()
-                row_labels.append(lbl)
-            self.background_labels.append(row_labels)
+        self.canvas = BoardCanvas(self, self.GRID_ORIGIN, self.ROWS, self.COLS, self.CELL_SIZE)
+        self.tiles = self.canvas.tiles
 
     def _init_digit_labels(self):
-        self.digit_labels = {'timer': [], 'score': []}
+        coords = {'timer': (125, 95), 'score': (305, 95)}
+        self.digit_displays = {kind: DigitDisplay(self, x, y) for kind, (x, y) in coords.items()}
 
-    def _animate_fall(self, tile: TileLabel, target_row: int, finished=None):
-        start = tile.pos()
+    def _animate_fall(self, tile: Sprite, target_row: int, finished=None):
+        start = tile.pos
         end = QPoint(start.x(),
                      self.GRID_ORIGIN.y() + target_row * self.CELL_SIZE)
 
         dist = end.y() - start.y()
         dur = 100 + dist * 2
-        anim = QPropertyAnimation(tile, b'pos', self)
-        anim.setStartValue(start)
-        anim.setEndValue(end)
-        anim.setDuration(dur)
-        anim.setEasingCurve(QEasingCurve.OutBounce)
-
-        if finished:
-            anim.finished.connect(finished)
-        anim.start()
-        self.animations.append(anim)
+        self.canvas.animate(tile, end, dur, QEasingCurve.OutBounce, finished)
 
     def display_number(self, kind, value, color: str = None, x=None, y=None):
         _colors = ['blue', 'red', 'green', 'orange', 'purple', 'yellow']
         if color is None:
             color = random.choice(_colors)
-        if x is None or y is None:
-            coords = {'timer': (125, 95), 'score': (305, 95)}
-            x, y = coords[kind]
-        for lbl in self.digit_labels[kind]:
-            lbl.deleteLater()
-        self.digit_labels[kind].clear()
-        for i, ch in enumerate(str(value)):
-            path = get_resource_path(f"assets/score/{color}/{ch}.png")
-            pix = QPixmap(path)
-            lbl = QLabel(self)
-            lbl.setPixmap(pix)
-            w, h = pix.width(), pix.height()
-            lbl.setGeometry(x + i * w, y, w, h)
-            lbl.raise_()
-            lbl.show()
-            self.digit_labels[kind].append(lbl)
+        display = self.digit_displays[kind]
+        if x is not None and y is not None:
+            display.move(x, y)
+        display.set_value(value, color)
 
     def update_score(self, score: int):
         self.score = score
@@ -195,38 +150,23 @@ class BoardView(QWidget):
         self.display_number('timer', self.elapsed_seconds)
 
     def render_from_board(self, first=False):
-        for lbl in self.tile_labels.values():
-            lbl.deleteLater()
-        self.tile_labels.clear()
-
+        # фишки на холсте создаются один раз; дальше меняется только картинка в изменившихся клетках
         for r in range(self.ROWS):
             for c in range(self.COLS):
                 elem = self.board.cell(r, c)
-                pix = self._pix_for_elem(elem)
-                lbl = TileLabel(self, elem)
-                lbl.setPixmap(pix)
-                x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-                y = self.GRID_ORIGIN.y() + (-1 if first else r) * self.CELL_SIZE
-                lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-                lbl.raise_()
-                lbl.show()
-                self.tile_labels[(r, c)] = lbl
+                key = elem.short() if elem is not None else None
+                tile = self.tiles.get((r, c))
+                if tile is None:
+                    tile = self.canvas.add_tile(elem, r, c)
+                elif self._shown.get((r, c)) == key and not first:
+                    continue
+                else:
+                    self.canvas.set_tile(tile, elem)
+                self._shown[(r, c)] = key
                 if first:
-                    self._animate_fall(lbl, r)
+                    self.canvas.move_sprite(tile, QPoint(tile.pos.x(), self.GRID_ORIGIN.y() - self.CELL_SIZE))
+                    self._animate_fall(tile, r)
 
     def update_board(self, board: Board, first=False):
         self.board = board
         self.render_from_board(first)
-
-    def _pix_for_elem(self, elem):
-        if elem is None:
-            return None
-        root = "assets/elements"
-        if elem.bonus == Bonus.NONE:
-            img = f"{root}/{elem.color.value}.png"
-        elif elem.bonus == Bonus.BOMB:
-            img = f"{root}/bomb.png"
-        else:
-            axis = "h" if elem.bonus == Bonus.ROCKET_H else "v"
-            img = f"{root}/rocket_{axis}.png"
-        return QPixmap(get_resource_path(img)).scaled(self.CELL_SIZE, self.CELL_SIZE)
@@ -1,18 +1,22 @@
+import os
 import threading
+import time
 
 from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QIcon, QFont, QFontDatabase, QPixmap
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import (
     QDialog, QLabel, QLineEdit, QPushButton, QSpinBox, QComboBox, QListWidget
 )
 
 from GUI.game_window import GameWindow
 from core.audio_manager import AudioManager
+from core.resource_manager import ResourceManager
 from core.server import Server
 from core.setting_deploy import get_resource_path
 from logger import logger
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
 
 
 class CreateGameWindow(QDialog):
@@ -29,9 +33,7 @@ class CreateGameWindow(QDialog):
         self.setFixedSize(400, 500)
 
         # шрифт
-        fid = QFontDatabase.addApplicationFont(get_resource_path("assets/FontFont.otf"))
-        fams = QFontDatabase.applicationFontFamilies(fid)
-        self.font = fams[0] if fams else self.font().family()
+        self.font = resources.font_family()
 
         # фон
         bg = QLabel(self)
@@ -45,8 +47,8 @@ class CreateGameWindow(QDialog):
 
         # заголовок
         pic = QLabel(self)
-        p = QPixmap(get_resource_path("assets/setting_title.png")) \
-            .scaled(300, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        p = resources.pixmap(get_resource_path("assets/setting_title.png"), 300, 100,
+                             Qt.KeepAspectRatio, Qt.SmoothTransformation)
         pic.setPixmap(p)
         pic.setGeometry(50, 0, 300, 100)
 
@@ -160,8 +162,14 @@ class CreateGameWindow(QDialog):
 
     def _on_generate(self):
         self.spin_time.setDisabled(True)
+        record_dir = os.environ.get("THREE_IN_ROW_RECORD_DIR")
+        record_path = None
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+            record_path = os.path.join(record_dir, time.strftime("session_%Y%m%d_%H%M%S.rec"))
         self.server = Server(nickname=self.nick_edit.text(), mode=self.selected_mode,
-                             time=self.spin_time.value() if self.selected_mode == "time" else 999)
+                             time=self.spin_time.value() if self.selected_mode == "time" else 999,
+                             record_path=record_path)
         self.lbl_code.setText(f"Код доступа {self.server.session_code}")
         self.btn_generate.setVisible(False)
         self.players_list.show()
@@ -0,0 +1,58 @@
+from typing import List, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QLabel, QWidget
+
+from core.resource_manager import ResourceManager
+from core.setting_deploy import get_resource_path
+
+resources = ResourceManager.instance()
+
+
+class DigitDisplay(QWidget):
+    # число из картинок цифр (assets/score/<цвет>/<цифра>.png или атлас score_<цвет>).
+    # Метки цифр создаются один раз: новое значение только подменяет в них готовые картинки
+    # и сдвигает их — ни создания виджетов, ни чтения файлов на каждом тике часов
+    DIGITS = 4
+
+    def __init__(self, parent: QWidget, x: int, y: int, digits: int = DIGITS):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.move(x, y)
+        self._glyphs: List[QLabel] = [QLabel(self) for _ in range(digits)]
+        for lbl in self._glyphs:
+            lbl.hide()
+        # что показано сейчас: (текст, цвет) и картинка в каждой метке
+        self._shown: Tuple[str, str] | None = None
+        self._pixmaps: List[QPixmap | None] = [None] * digits
+        self.raise_()
+        self.show()
+
+    @staticmethod
+    def glyph(color: str, ch: str) -> QPixmap:
+        return resources.sprite(f"score_{color}", ch, get_resource_path(f"assets/score/{color}/{ch}.png"))
+
+    def set_value(self, value: int, color: str):
+        text = str(value)
+        if self._shown == (text, color):
+            return
+        self._shown = (text, color)
+        while len(self._glyphs) < len(text):
+            self._glyphs.append(QLabel(self))
+            self._pixmaps.append(None)
+        width = height = 0
+        for i, lbl in enumerate(self._glyphs):
+            if i >= len(text):
+                lbl.hide()
+                continue
+            pix = self.glyph(color, text[i])
+            if self._pixmaps[i] is not pix:
+                self._pixmaps[i] = pix
+                lbl.setPixmap(pix)
+            # цифра встаёт на i-ю позицию по своей ширине — как рисовались цифры всегда
+            w, h = pix.width(), pix.height()
+            lbl.setGeometry(i * w, 0, w, h)
+            lbl.show()
+            width, height = max(width, (i + 1) * w), max(height, h)
+        self.resize(width, height)
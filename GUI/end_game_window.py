@@ -1,8 +1,10 @@
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QFontDatabase
+from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QDialog, QLabel, QPushButton
 
-from core.setting_deploy import get_resource_path
+from core.resource_manager import ResourceManager
+
+resources = ResourceManager.instance()
 
 
 class EndGameWindow(QDialog):
@@ -22,9 +24,7 @@ class EndGameWindow(QDialog):
         )
         bg.setGeometry(20, 20, 360, 260)
 
-        fid = QFontDatabase.addApplicationFont(get_resource_path("assets/FontFont.otf"))
-        fams = QFontDatabase.applicationFontFamilies(fid)
-        font_family = fams[0] if fams else self.font().family()
+        font_family = resources.font_family()
 
         title = QLabel("Увы, но все", self)
         title.setFont(QFont(font_family, 18, QFont.Bold))
@@ -1,26 +1,33 @@
 import random
-from typing import Set, Tuple, List
+from collections import deque
+from typing import Tuple
 
-from PyQt5.QtCore import QPoint, QSize, QPropertyAnimation, QEasingCurve, QParallelAnimationGroup, QTimer, Qt
-from PyQt5.QtGui import QPixmap, QIcon, QFontDatabase, QFont
+from PyQt5.QtCore import QPoint, QSize, QEasingCurve, QTimer, Qt
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import (
     QLabel,
     QFrame, QPushButton, QMessageBox, QWidget
 )
 
+from GUI.animator import Animator, Batch
+from GUI.board_canvas import BoardCanvas, Sprite
+from GUI.digit_display import DigitDisplay
 from GUI.board_view import BoardView
 from GUI.end_game_window import EndGameWindow
-from GUI.explosion_label import ExplosionLabel
 from GUI.settings_window import SettingsWindow
-from GUI.tile_label import TileLabel
 from core.audio_manager import AudioManager
-from core.board import Board
+from core.board import Board, CascadeStep
+from core.element import Element
 from core.enums import Bonus, Color
-from core.game_controller import GameController
+from core.game_controller import GameController, GameView
+from core.game_state import MoveResult
+from core.resource_manager import ResourceManager
 from core.setting_deploy import get_resource_path
 from logger import logger
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
+animator = Animator.instance()
 
 
 class GameWindow(QWidget):
@@ -28,6 +35,9 @@ class GameWindow(QWidget):
     COLS = 7
     CELL_SIZE = 60
     GRID_ORIGIN = QPoint(40, 300)
+    # как часто окно перечитывает часы сервера в игре на время, мс
+    CLOCK_REFRESH_MS = 200
+    SOLO_NICKNAME = "solo"
 
     ICON_PATH = get_resource_path("assets/icon.png")
     BACKGROUND_PATH = get_resource_path("assets/game_background.png")
@@ -35,33 +45,19 @@ class GameWindow(QWidget):
     SETTINGS_ICON = get_resource_path("assets/buttons/settings.png")
     FONT_PATH = get_resource_path("assets/FontFont.otf")
 
-    TILE_IMAGES = {
-        name: get_resource_path(f"assets/elements/{name}.png")
-        for name in ("orange", "purple", "red", "yellow")
-    }
-    BLOCK_IMAGES = [
-        get_resource_path(f"assets/block{i}.png")
-        for i in (1, 2)
-    ]
-
     def __init__(self, ctrl: GameController = None, main_window=None, solo=False):
         super().__init__()
         self.solo_game = solo
-        print(self.solo_game)
         self.end_game_window = None
-        self.pending_animations = 0
-        self._on_all_animations = None
         self.waiting_overlay = None
         self.opp_view = None
-        self.old_b = None
-        self.old_a = None
         self.main_window = main_window
         self.main_window.hide()
         self.ctrl = ctrl
+        # последний снимок состояния контроллера; сам контроллер живёт в своём потоке
+        self.view: GameView | None = None
         self.board = None
-        self.animations = []
-        self.selected_tile = None
-        self.tile_labels = {}
+        self._move_results = deque()
 
         self._load_fonts()
         self._init_window()
@@ -72,9 +68,6 @@ class GameWindow(QWidget):
         self._init_board_container()
         self._init_grid()
         self._init_digit_labels()
-        if self.solo_game:
-            self.board = Board()
-            self.render_from_board(first=True)
         self.elapsed_seconds = 0
 
         self._clock_timer = QTimer(self)
@@ -86,10 +79,15 @@ class GameWindow(QWidget):
         self.score = 0
         self.display_number('score', self.score)
 
+        if self.solo_game:
+            # одиночная игра идёт по тем же правилам, только без сети и в потоке окна
+            self.ctrl = GameController(mode="solo", time=0, nickname=self.SOLO_NICKNAME,
+                                       is_client=False, actor=False)
+            self.ctrl.state_ready = self.apply_state
+            self.ctrl.new_game([self.SOLO_NICKNAME])
+
     def _load_fonts(self):
-        font_id = QFontDatabase.addApplicationFont(self.FONT_PATH)
-        families = QFontDatabase.applicationFontFamilies(font_id)
-        self.font_family = families[0] if families else self.font().family()
+        self.font_family = resources.font_family(self.FONT_PATH)
 
     def _init_window(self):
         self.setWindowTitle("Three in row")
@@ -99,14 +97,14 @@ class GameWindow(QWidget):
 
     def _init_background(self):
         lbl = QLabel(self)
-        pix = QPixmap(self.BACKGROUND_PATH).scaled(self.width(), self.height())
+        pix = resources.pixmap(self.BACKGROUND_PATH, self.width(), self.height())
         lbl.setPixmap(pix)
         lbl.setGeometry(0, 0, self.width(), self.height())
         lbl.lower()
 
     def _init_title(self):
         lbl = QLabel(self)
-        pix = QPixmap(self.TITLE_PATH).scaled(440, 200)
+        pix = resources.pixmap(self.TITLE_PATH, 440, 200)
         lbl.setPixmap(pix)
         lbl.setGeometry(30, 0, 440, 200)
         lbl.raise_()
@@ -135,6 +133,7 @@ class GameWindow(QWidget):
         btn.setGeometry(420, 140, 40, 40)
         btn.setFlat(True)
         btn.clicked.connect(self._open_settings)
+        self.settings_button = btn
 
     def _init_board_container(self):
         x, y = self.GRID_ORIGIN.x() - 10, self.GRID_ORIGIN.y() - 10
@@ -149,483 +148,196 @@ class GameWindow(QWidget):
         self.board_container = frame
 
     def _init_grid(self):
-        self.background_labels = []
-        for r in range(self.ROWS):
-            row_labels = []
-            for c in range(self.COLS):
-                lbl = QLabel(self)
-                lbl.setPixmap(
-                    QPixmap(self.BLOCK_IMAGES[(r + c) % 2])
-                    .scaled(self.CELL_SIZE, self.CELL_SIZE)
-                )
-                lbl.setGeometry(
-                    self.GRID_ORIGIN.x() + c * self.CELL_SIZE,
-                    self.GRID_ORIGIN.y() + r * self.CELL_SIZE,
-                    self.CELL_SIZE, self.CELL_SIZE
-                )
-                lbl.raise_()
-                row_labels.append(lbl)
-            self.background_labels.append(row_labels)
+        # клетки, фишки и взрывы рисует один виджет; кнопка настроек остаётся над ним
+        self.canvas = BoardCanvas(self, self.GRID_ORIGIN, self.ROWS, self.COLS, self.CELL_SIZE)
+        self.canvas.stackUnder(self.settings_button)
+        self.canvas.swap_requested.connect(self.handle_swap_request)
+        self.tiles = self.canvas.tiles
 
     def _init_digit_labels(self):
-        self.digit_labels = {'timer': [], 'score': []}
+        coords = {'timer': (125, 95), 'score': (305, 95)}
+        self.digit_displays = {kind: DigitDisplay(self, x, y) for kind, (x, y) in coords.items()}
 
-    def _animate_fall(self, tile: TileLabel, target_row: int, finished=None):
-        start = tile.pos()
+    def _animate_fall(self, tile: Sprite, target_row: int, batch: Batch | None = None):
+        start = tile.pos
         end = QPoint(start.x(),
                      self.GRID_ORIGIN.y() + target_row * self.CELL_SIZE)
 
         dist = end.y() - start.y()
         dur = 100 + dist * 2
-        anim = QPropertyAnimation(tile, b'pos', self)
-        anim.setStartValue(start)
-        anim.setEndValue(end)
-        anim.setDuration(dur)
-        anim.setEasingCurve(QEasingCurve.OutBounce)
-        self.pending_animations += 1
-        if finished:
-            anim.finished.connect(finished)
-            self.pending_animations -= 1
-            self._check_animations_done()
-        anim.start()
-        self.animations.append(anim)
-
-    def handle_swap_request(self, a_lbl: TileLabel, b_lbl: TileLabel):
-        if self.solo_game:
-            pass
-        else:
-            if self.ctrl.mode != "time" and not self.ctrl.is_my_step:
-                return
-        if abs(a_lbl.row - b_lbl.row) + abs(a_lbl.col - b_lbl.col) != 1:
+        self.canvas.animate(tile, end, dur, QEasingCurve.OutBounce, batch=batch)
+
+    def handle_swap_request(self, a: Tuple[int, int], b: Tuple[int, int]):
+        if self.view is None or (self.view.mode == "chess" and not self.view.is_my_step):
             return
-        audio.play_sound("swap")
-        self.old_a = (a_lbl.row, a_lbl.col)
-        self.old_b = (b_lbl.row, b_lbl.col)
-        self._animate_swap(a_lbl, b_lbl,
-                           lambda: self._after_swap_logic(a_lbl, b_lbl))
-
-    def _after_swap_logic(self, a_lbl, b_lbl):
-        a = (a_lbl.row, a_lbl.col)
-        b = (b_lbl.row, b_lbl.col)
-        success, removed, bonuses = self.board.swap(a, b)
-        if not self.solo_game:
-            if self.ctrl.mode == "chess":
-                self.ctrl.swap(a_lbl=self.old_a, b_lbl=self.old_b, success=success,
-                               removed=removed, bonuses=bonuses)
-        if not success:
-            self._animate_swap(a_lbl, b_lbl, on_finished=None)
+        if self._move_results:
+            # прошлый ход ещё доигрывается — плитки сейчас не на своих клетках
             return
-
-        audio.play_sound("nice_swap")
-        if not bonuses and removed:
-            self._update_score(len(removed))
-            for r, c in removed:
-                lbl = self.tile_labels.pop((r, c), None)
-
-                if lbl and lbl.element.bonus in [Bonus.ROCKET_H, Bonus.ROCKET_V]:
-                    self._fire_rocket(r, c, lbl.element.bonus)
-                    lbl.deleteLater()
-                elif lbl:
-                    explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100,
-                                               bonus=lbl.element.bonus)
-
-                    lbl.deleteLater()
-
-                    explosion.raise_()
-                    explosion.show()
-                    if lbl.element.bonus == Bonus.BOMB:
-                        audio.play_sound("boom")
-                    else:
-                        audio.play_sound("removed")
-            self._update_game()
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1:
             return
+        # ход разыгрывает контроллер, окно анимирует пришедший swap_result
+        self.ctrl.request_move(a, b)
 
-        self._update_score(len(removed))
-        for r, c in removed:
-            lbl = self.tile_labels.pop((r, c), None)
-            if not lbl:
-                continue
-
-            explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100)
-
-            lbl.deleteLater()
-
-            explosion.raise_()
-            explosion.show()
-            audio.play_sound("removed")
-
-        for r, c, bonus in bonuses:
-            elem = self.board.cell(r, c)
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-            x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() + r * self.CELL_SIZE
-            lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-            self.tile_labels[(r, c)] = lbl
-            audio.play_sound("add_bonus")
-
-        self._update_game()
-
-    def _update_game(self):
-        fallen, spawned = self.board.collapse_and_fill()
-
-        fallen_to_send: list[Tuple[int, int, int, int]] = []
-
-        for elem, new_r, new_c in fallen:
-            for lbl in self.tile_labels.values():
-                if lbl.element is elem:
-                    fallen_to_send.append((lbl.row, lbl.col, new_r, new_c))
-                    break
-        if not self.solo_game:
-            if self.ctrl.mode == "chess":
-                self.ctrl.auto_swap(fallen=fallen_to_send, spawned=spawned)
-
-        for elem, new_r, new_c in fallen:
-            for lbl in self.tile_labels.values():
-                if lbl.element is elem:
-                    print(f"elem {elem}")
-                    print(f"lbl row {lbl.row}  lbl col {lbl.col}")
-                    lbl.row, lbl.col = new_r, new_c
-                    self.tile_labels.pop((elem.y, elem.x), None)  # до смены координат
-                    self.tile_labels[(new_r, new_c)] = lbl
-                    self._animate_fall(lbl, new_r)
-                    audio.play_sound("falling")
-                    break
-        for elem in spawned:
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-
-            x = self.GRID_ORIGIN.x() + elem.y * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() - elem.x * self.CELL_SIZE
-            print(f"x {x} y {y}")
-            lbl.setGeometry(x, y,
-                            self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-
-            self.tile_labels[(elem.x, elem.y)] = lbl
-            self._animate_fall(lbl, elem.x)
-            audio.play_sound("falling")
-        if not self.solo_game:
-            if self.ctrl.mode == "time":
-                self.ctrl.board = self.board
-                self.ctrl.board_update_for_opp()
-
-        while self.board.step():
-            removed, bonuses = self.board.get_auto_matched()
-            for r, c in removed:
-                lbl = self.tile_labels.pop((r, c), None)
-                if not lbl:
-                    continue
-
-                explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100)
-
-                lbl.deleteLater()
-
-                explosion.raise_()
-                explosion.show()
-                audio.play_sound("removed")
-
-            for r, c, bonus in bonuses:
-                elem = self.board.cell(r, c)
-                lbl = TileLabel(self, elem)
-                pix = self._pix_for_elem(elem)
-                lbl.setPixmap(pix)
-                x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-                y = self.GRID_ORIGIN.y() + r * self.CELL_SIZE
-                lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-                lbl.raise_()
-                lbl.show()
-                self.tile_labels[(r, c)] = lbl
-                audio.play_sound("add_bonus")
-
-            fallen, spawned = self.board.collapse_and_fill()
-            fallen_to_send: list[Tuple[int, int, int, int]] = []
-
-            for elem, new_r, new_c in fallen:
-                for lbl in self.tile_labels.values():
-                    if lbl.element is elem:
-                        fallen_to_send.append((lbl.row, lbl.col, new_r, new_c))
-                        break
-
-            if not self.solo_game:
-                if self.ctrl.mode == "chess":
-                    self.ctrl.auto_swap_circle(fallen=fallen_to_send, spawned=spawned, bonuses=bonuses, removed=removed)
-
-            for elem, new_r, new_c in fallen:
-                for lbl in self.tile_labels.values():
-                    if lbl.element is elem:
-                        lbl.row, lbl.col = new_r, new_c
-                        self.tile_labels.pop((elem.y, elem.x), None)  # до смены координат
-                        self.tile_labels[(new_r, new_c)] = lbl
-                        self._animate_fall(lbl, new_r)
-                        audio.play_sound("falling")
-                        break
-
-            for elem in spawned:
-                lbl = TileLabel(self, elem)
-                pix = self._pix_for_elem(elem)
-                lbl.setPixmap(pix)
-
-                x = self.GRID_ORIGIN.x() + elem.y * self.CELL_SIZE
-                y = self.GRID_ORIGIN.y() - elem.x * self.CELL_SIZE
-                lbl.setGeometry(x, y,
-                                self.CELL_SIZE, self.CELL_SIZE)
-                lbl.raise_()
-                lbl.show()
-
-                self.tile_labels[(elem.x, elem.y)] = lbl
-                self._animate_fall(lbl, elem.x)
-                audio.play_sound("falling")
-            if not self.solo_game:
-                if self.ctrl.mode == "time":
-                    self.ctrl.board = self.board
-                    self.ctrl.board_update_for_opp()
-
-    def _animate_swap(self, t1: TileLabel, t2: TileLabel, on_finished=None):
-        group = QParallelAnimationGroup(self)
-        for tile, end in ((t1, t2.pos()), (t2, t1.pos())):
-            anim = QPropertyAnimation(tile, b'pos', self)
-            anim.setDuration(150)
-            anim.setEndValue(end)
-            anim.setEasingCurve(QEasingCurve.InOutQuad)
-            group.addAnimation(anim)
-
-        self.pending_animations += 1
-
+    def _animate_swap(self, t1: Sprite, t2: Sprite, on_finished=None):
         def _after_anim():
             self._swap_tiles(t1, t2)
             if on_finished:
                 on_finished()
-            self.pending_animations -= 1
-            self._check_animations_done()
-
-        group.finished.connect(_after_anim)
-        group.start()
-        self.animations.append(group)
-        # чистим уже закончившиеся
-        self.animations = [g for g in self.animations if g.state() != QPropertyAnimation.Stopped]
-
-    def _pix_for_elem(self, elem):
-        if elem is None:
-            return None
-        root = "assets/elements"
-        if elem.bonus == Bonus.NONE:
-            img = f"{root}/{elem.color.value}.png"
-        elif elem.bonus == Bonus.BOMB:
-            img = f"{root}/bomb.png"
-        else:
-            axis = "h" if elem.bonus == Bonus.ROCKET_H else "v"
-            img = f"{root}/rocket_{axis}.png"
-        return QPixmap(get_resource_path(img)).scaled(self.CELL_SIZE, self.CELL_SIZE)
+
+        batch = animator.batch(_after_anim)
+        for tile, end in ((t1, t2.pos), (t2, t1.pos)):
+            self.canvas.animate(tile, end, 150, QEasingCurve.InOutQuad, batch=batch)
+        batch.close()
 
     def render_from_board(self, first=False):
-        for lbl in self.tile_labels.values():
-            lbl.deleteLater()
-        self.tile_labels.clear()
+        # после хода фишки на холсте уже стоят как на доске — меняем только разошедшиеся клетки,
+        # чтобы у фишек остались номера из шагов каскада
+        if first:
+            self.canvas.clear_tiles()
 
         for r in range(self.ROWS):
             for c in range(self.COLS):
                 elem = self.board.cell(r, c)
-                pix = self._pix_for_elem(elem)
-                lbl = TileLabel(self, elem)
+                tile = self.tiles.get((r, c))
+                if tile is not None:
+                    shown = tile.element.short() if tile.element is not None else None
+                    if shown != (elem.short() if elem is not None else None):
+                        self.canvas.set_tile(tile, elem)
+                    continue
                 audio.play_sound("falling", 1)
-                lbl.setPixmap(pix)
-                x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-                y = self.GRID_ORIGIN.y() + (-1 if first else r) * self.CELL_SIZE
-                lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-                lbl.raise_()
-                lbl.show()
-                self.tile_labels[(r, c)] = lbl
+                start = QPoint(self.GRID_ORIGIN.x() + c * self.CELL_SIZE,
+                               self.GRID_ORIGIN.y() + (-1 if first else r) * self.CELL_SIZE)
+                tile = self.canvas.add_tile(elem, r, c, start)
                 if first:
-                    self._animate_fall(lbl, r)
+                    self._animate_fall(tile, r)
 
-    def _swap_tiles(self, tile1: TileLabel, tile2: TileLabel):
+    def _swap_tiles(self, tile1: Sprite, tile2: Sprite):
         r1, c1 = tile1.row, tile1.col
-        r2, c2 = tile2.row, tile2.col
-
-        tile1.row, tile1.col, tile2.row, tile2.col = r2, c2, r1, c1
-
-        self.tile_labels.pop((r1, c1), None)
-        self.tile_labels.pop((r2, c2), None)
-        self.tile_labels[(tile1.row, tile1.col)] = tile1
-        self.tile_labels[(tile2.row, tile2.col)] = tile2
+        self.canvas.place_tile(tile1, tile2.row, tile2.col)
+        self.canvas.place_tile(tile2, r1, c1)
 
     def _fire_rocket(self, r: int, c: int, orientation: Bonus):
         rocket_img = "rocket_h.png" if orientation == Bonus.ROCKET_H else "rocket_v.png"
-        rocket_lbl = QLabel(self)
-        pix = QPixmap(get_resource_path(f"assets/elements/{rocket_img}")) \
-            .scaled(self.CELL_SIZE, self.CELL_SIZE)
-        rocket_lbl.setPixmap(pix)
+        pix = resources.pixmap(get_resource_path(f"assets/elements/{rocket_img}"), self.CELL_SIZE, self.CELL_SIZE)
         start_x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
         start_y = self.GRID_ORIGIN.y() + r * self.CELL_SIZE
-        rocket_lbl.setGeometry(start_x, start_y, self.CELL_SIZE, self.CELL_SIZE)
-        rocket_lbl.show()
-        rocket_lbl.raise_()
+        rocket = self.canvas.add_sprite(pix, QPoint(start_x, start_y))
 
-        anim = QPropertyAnimation(rocket_lbl, b"pos", self)
-        anim.setDuration(100)
-        anim.setEasingCurve(QEasingCurve.InQuad)
         if orientation == Bonus.ROCKET_H:
-            end_x = self.GRID_ORIGIN.x()
-            anim.setStartValue(QPoint(start_x, start_y))
-            anim.setEndValue(QPoint(end_x, start_y))
+            end = QPoint(self.GRID_ORIGIN.x(), start_y)
         else:
-            end_y = self.GRID_ORIGIN.y()
             audio.play_sound("rocket")
-            anim.setStartValue(QPoint(start_x, start_y))
-            anim.setEndValue(QPoint(start_x, end_y))
+            end = QPoint(start_x, self.GRID_ORIGIN.y())
 
         def _on_rocket_done():
-            rocket_lbl.deleteLater()
-
-            explosion = ExplosionLabel(
-                parent=self,
-                color=Color.RED.value,
-                pos=rocket_lbl.pos(),
-                size=self.CELL_SIZE,
-                fps=100,
-                bonus=Bonus.NONE
-            )
+            self.canvas.remove(rocket)
+            self.canvas.explode(Color.RED.value, rocket.pos)
 
-        anim.finished.connect(_on_rocket_done)
-        anim.start()
-
-    def _update_score(self, score: int):
-        self.score += score
-        if not self.solo_game:
-            if self.ctrl.mode == "time":
-                self.ctrl.score_update(self.score)
-                if self.score > 999:
-                    self.ctrl.finish(self.score)
-                    self._clock_timer.stop()
-                    self._show_waiting_overlay(f"Второй игрок еще не финишировал\n, ждём его…")
-                    return
-        self.display_number('score', self.score)
+        self.canvas.animate(rocket, end, 100, QEasingCurve.InQuad, _on_rocket_done)
 
     def display_number(self, kind, value, color: str = None, x=None, y=None):
         value = 999 if value > 999 else value
         _colors = ['blue', 'red', 'green', 'orange', 'purple', 'yellow']
         if color is None:
             color = random.choice(_colors)
-        if x is None or y is None:
-            coords = {'timer': (125, 95), 'score': (305, 95)}
-            x, y = coords[kind]
-        for lbl in self.digit_labels[kind]:
-            lbl.deleteLater()
-        self.digit_labels[kind].clear()
-        for i, ch in enumerate(str(value)):
-            path = get_resource_path(f"assets/score/{color}/{ch}.png")
-            pix = QPixmap(path)
-            lbl = QLabel(self)
-            lbl.setPixmap(pix)
-            w, h = pix.width(), pix.height()
-            lbl.setGeometry(x + i * w, y, w, h)
-            lbl.raise_()
-            lbl.show()
-            self.digit_labels[kind].append(lbl)
+        display = self.digit_displays[kind]
+        if x is not None and y is not None:
+            display.move(x, y)
+        display.set_value(value, color)
 
     def _open_settings(self):
         if hasattr(self, "_settings") and self._settings.isVisible():
             return
 
-        self._clock_timer.stop()
-
         self._settings = SettingsWindow(self)
         cx = self.x() + (self.width() - self._settings.width()) // 2
         cy = self.y() + (self.height() - self._settings.height()) // 2
         self._settings.move(cx, cy)
-        self._settings.finished.connect(lambda _: self._clock_timer.start())
+        if self._clock is None:
+            # часы игры на время идут на сервере, их пауза настроек не касается
+            self._clock_timer.stop()
+            self._settings.finished.connect(lambda _: self._clock_timer.start())
         self._settings.homeClicked.connect(self._on_settings_home)
         self._settings.show()
 
+    @property
+    def _clock(self):
+        return self.view.clock if self.view and not self.solo_game else None
+
     def _tick_clock(self):
-        self.elapsed_seconds += 1
-
-        if not self.solo_game:
-            if self.ctrl.mode == "time":
-                self.ctrl.time_update(self.elapsed_seconds)
-                if self.elapsed_seconds > self.ctrl.time:
-                    self.ctrl.finish(self.score)
-                    self._clock_timer.stop()
-                    self._show_waiting_overlay(f"Второй игрок еще не финишировал\n, ждём его…")
-                    return
-        self.display_number('timer', self.elapsed_seconds)
+        if self._clock is None:
+            self.elapsed_seconds += 1
+            self.display_number('timer', self.elapsed_seconds)
+            return
+
+        # игра на время: показываем часы сервера, досчитанные локально
+        seconds = int(self._clock.elapsed())
+        if seconds != self.elapsed_seconds:
+            self.elapsed_seconds = seconds
+            self.display_number('timer', seconds)
+            if self.opp_view:
+                self.opp_view.tick_clock(seconds)
+        if self._clock.expired:
+            # итог подведёт сервер по своему дедлайну
+            self._clock_timer.stop()
+            self._show_waiting_overlay("Время вышло, подводим итоги…")
 
     def _show_end_game(self, message: str, winner_name: str = "", score: int = 0):
+        self._clock_timer.stop()
         self.end_game_window = EndGameWindow(self, player_name=winner_name, message=message, score=score)
         self.end_game_window.exec_()
-        self._clock_timer.stop()
         audio.switch_to_lobby()
         if self.main_window is not None:
             self.main_window.show()
-        if not self.solo_game:
-            self.ctrl.close_game()
+        self.ctrl.close_game()
         if self.opp_view:
             self.opp_view.close()
         self.close()
 
-    def apply_state(self, command: str):
+    def apply_state(self, command: str, view: GameView):
+        self.view = view
         logger.info(f"Обработка команды {command}")
-        logger.info(f"Мой ход {self.ctrl.is_my_step}")
+        logger.info(f"Мой ход {view.is_my_step}")
         if command == "start_game":
-            self.board = self.ctrl.board
+            # своя доска окна: в игре на время её дальше ведёт само окно
+            self.board = Board.from_matrix(view.board)
             self.render_from_board(first=True)
 
-            if self.ctrl.mode == "time":
+            if view.mode == "time":
                 self.opp_view = BoardView()
                 self.opp_view.show()
                 self.opp_view.update_board(self.board, True)
+                self._clock_timer.setInterval(self.CLOCK_REFRESH_MS)
         elif command == "board":
-            self.opp_view.update_board(self.ctrl.opp_board)
-        elif command == "time":
-            self.opp_view.tick_clock(self.ctrl.opp_time)
+            if self.opp_view and view.opp_board is not None:
+                self.opp_view.update_board(Board.from_matrix(view.opp_board))
+        elif command == "clock":
+            if self._clock_timer.isActive():
+                self._tick_clock()
         elif command == "score":
-            self.opp_view.update_score(self.ctrl.opp_score)
-        elif command == "swap":
-            self.ctrl.is_my_step = True
-            a_row = self.ctrl.a_row
-            a_col = self.ctrl.a_col
-            b_row = self.ctrl.b_row
-            b_col = self.ctrl.b_col
-            logger.info(f"a_row {a_row} a_col {a_col}")
-            logger.info(f"b_row {b_row} b_col {b_col}")
-            success = self.ctrl.success
-            removed = self.ctrl.removed
-            bonuses = self.ctrl.bonuses
-            a_tile = None
-            b_tile = None
-            for lbl in self.tile_labels.values():
-                if lbl.row == a_row and lbl.col == a_col:
-                    a_tile = lbl
-                elif lbl.row == b_row and lbl.col == b_col:
-                    b_tile = lbl
-                if a_tile and b_tile:
-                    break
-
-            if a_tile and b_tile:
-                self.handle_swap_request_my_swap(a_tile, b_tile, success=success, removed=removed, bonuses=bonuses)
-            else:
-                logger.warning(f"Не нашли соответствующие TileLabel для network step")
-        elif command == "auto_swap":
-            self.auto_swap()
-        elif command == "auto_swap_circle":
-            self.auto_swap_circle()
+            if self.opp_view:
+                self.opp_view.update_score(view.opp_score)
+        elif command == "finish":
+            if view.my_nickname in view.finished and view.winner_player is None:
+                self._clock_timer.stop()
+                self._show_waiting_overlay("Второй игрок еще не финишировал\n, ждём его…")
+        elif command == "swap_result":
+            self._move_results.append(view.move_result)
+            if len(self._move_results) == 1:
+                self._play_move_result(self._move_results[0])
+        elif command in ("resync", "rollback"):
+            self._apply_resync()
         elif command == "end_game":
             if self.waiting_overlay:
                 self.waiting_overlay.close()
             self.setEnabled(True)
-            self._show_end_game(message="С победой", winner_name=self.ctrl.winner_player, score=self.ctrl.winner_score)
+            self._show_end_game(message="С победой", winner_name=view.winner_player, score=view.winner_score)
         elif command == "error":
             self._clock_timer.stop()
-            if self.ctrl.is_client:
+            if view.is_client:
                 text = "Соединение с сервером потеряно."
             else:
-                text = f"Игрок {self.ctrl.exit_nickname} отключился — игра прервана."
+                text = f"Игрок {view.exit_nickname} отключился — игра прервана."
             QMessageBox.critical(self, "Ошибка", text)
             if self.main_window:
                 self.main_window.show()
@@ -636,189 +348,90 @@ class GameWindow(QWidget):
                 self.end_game_window.close()
             self.close()
 
-    def handle_swap_request_my_swap(self, a_lbl: TileLabel, b_lbl: TileLabel, success: bool,
-                                    removed: Set[Tuple[int, int]], bonuses: List[Tuple[int, int, Bonus]]):
-        if abs(a_lbl.row - b_lbl.row) + abs(a_lbl.col - b_lbl.col) != 1:
+    def _apply_resync(self):
+        # после переподключения или неудачного предсказания хода не анимируем — сразу ставим доску сервера
+        if self.view.mode == "chess":
+            while len(self._move_results) > 1:
+                self._move_results.pop()
+            self._move_results.append(self.view.move_result)
+            if len(self._move_results) == 1:
+                self._play_move_result(self._move_results[0])
+        elif self.opp_view:
+            if self.view.opp_board is not None:
+                self.opp_view.update_board(Board.from_matrix(self.view.opp_board))
+            self.opp_view.update_score(self.view.opp_score)
+
+    def _play_move_result(self, result: MoveResult):
+        if result.a is None:
+            self._finish_move_result(result)
             return
-        audio.play_sound("swap")
-        self._animate_swap(a_lbl, b_lbl,
-                           lambda: self._after_swap_logic_my_swap(a_lbl, b_lbl, success=success, removed=removed,
-                                                                  bonuses=bonuses))
-
-    def _after_swap_logic_my_swap(self, a_lbl, b_lbl, success: bool, removed: Set[Tuple[int, int]],
-                                  bonuses: List[Tuple[int, int, Bonus]]):
-        if not success:
-            self._animate_swap(a_lbl, b_lbl, on_finished=None)
+        a_tile = self.tiles.get(result.a)
+        b_tile = self.tiles.get(result.b)
+        if not a_tile or not b_tile:
+            logger.warning(f"Не нашли фишки хода {result.a} {result.b} на доске")
+            self._finish_move_result(result)
             return
 
-        audio.play_sound("nice_swap")
-        if not bonuses and removed:
-            self._update_score(len(removed))
-            for r, c in removed:
-                lbl = self.tile_labels.pop((r, c), None)
-                if lbl and lbl.element.bonus in [Bonus.ROCKET_H, Bonus.ROCKET_V]:
-                    self._fire_rocket(r, c, lbl.element.bonus)
-                    lbl.deleteLater()
-                elif lbl:
-                    explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100,
-                                               bonus=lbl.element.bonus)
-
-                    lbl.deleteLater()
-
-                    explosion.raise_()
-                    explosion.show()
-                    if lbl.element.bonus == Bonus.BOMB:
-                        audio.play_sound("boom")
-                    else:
-                        audio.play_sound("removed")
-
-            self.ctrl.update_board()
-            self.board = self.ctrl.board
+        audio.play_sound("swap")
+        if not result.success:
+            self._animate_swap(a_tile, b_tile,
+                               lambda: self._animate_swap(a_tile, b_tile,
+                                                          lambda: self._finish_move_result(result)))
             return
+        self._animate_swap(a_tile, b_tile, lambda: self._play_cascade(result, 0))
 
-        self.ctrl.update_board()
-        self.board = self.ctrl.board
-        self._update_score(len(removed))
-        for r, c in removed:
-            lbl = self.tile_labels.pop((r, c), None)
-            if not lbl:
+    def _play_cascade(self, result: MoveResult, idx: int):
+        if idx >= len(result.steps):
+            self._finish_move_result(result)
+            return
+        if idx == 0:
+            audio.play_sound("nice_swap")
+        # следующий шаг каскада — когда упали все фишки этого
+        batch = animator.batch(lambda: self._play_cascade(result, idx + 1))
+        self._play_step(result.steps[idx], batch)
+        batch.close()
+
+    def _play_step(self, step: CascadeStep, batch: Batch):
+        for r, c in step.removed:
+            tile = self.tiles.pop((r, c), None)
+            if not tile:
                 continue
+            if tile.element.bonus in [Bonus.ROCKET_H, Bonus.ROCKET_V]:
+                self._fire_rocket(r, c, tile.element.bonus)
+            else:
+                self.canvas.explode(tile.element.color.value, tile.pos, tile.element.bonus)
+                audio.play_sound("boom" if tile.element.bonus == Bonus.BOMB else "removed")
+            self.canvas.remove(tile)
 
-            explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100)
-
-            lbl.deleteLater()
-
-            explosion.raise_()
-            explosion.show()
-            audio.play_sound("removed")
-
-        for bonus in bonuses:
-            r = bonus["r"]
-            c = bonus["c"]
-            elem = self.board.cell(r, c)
-            print(elem)
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-            x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() + r * self.CELL_SIZE
-            lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-            self.tile_labels[(r, c)] = lbl
+        for r, c, bonus, color, elem_id in step.bonuses:
+            self.canvas.add_tile(Element(r, c, color, bonus, elem_id), r, c)
             audio.play_sound("add_bonus")
 
-    def print_matrix(self):
-        lines: List[str] = []
-        for r in range(self.ROWS):
-            row_chars: List[str] = []
-            for c in range(self.COLS):
-                lbl = self.tile_labels.get((r, c))
-                if lbl and lbl.element and lbl.element.color:
-                    char = lbl.element.color.name[0]
-                else:
-                    char = '.'
-                row_chars.append(char)
-            lines.append(' '.join(row_chars))
-        print('\n'.join(lines))
-
-    def auto_swap(self):
-        self.ctrl.update_board()
-        self.board = self.ctrl.board
-        fallen, spawned = self.ctrl.fallen, self.ctrl.spawned
-        print(f"fallen {fallen}")
-        print("\n\n\n----------my board:-----------\n\n\n\n")
-        print(self.board)
-        print("\n\n\n----------self.tile_labels-----------\n\n\n\n")
-        self.print_matrix()
-
-        for old_r, old_c, new_r, new_c in fallen:
-            lbl = self.tile_labels.pop((old_r, old_c), None)
-            if not lbl:
+        # падения идут снизу вверх: клетка назначения к этому моменту уже освобождена
+        for old_r, old_c, new_r, new_c, elem_id in step.fallen:
+            tile = self.canvas.tile_for(elem_id, old_r, old_c)
+            if not tile:
                 continue
-            lbl.row, lbl.col = new_r, new_c
-            self.tile_labels[(new_r, new_c)] = lbl
-            self._animate_fall(lbl, new_r)
-            audio.play_sound("falling")
-
-        for elem in spawned:
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-
-            x = self.GRID_ORIGIN.x() + elem.y * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() - elem.x * self.CELL_SIZE
-            print(f"x {x} y {y}")
-            lbl.setGeometry(x, y,
-                            self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-
-            self.tile_labels[(elem.x, elem.y)] = lbl
-            self._animate_fall(lbl, elem.x)
+            self.canvas.place_tile(tile, new_r, new_c)
+            self._animate_fall(tile, new_r, batch)
             audio.play_sound("falling")
 
-        self.run_after_animations(lambda: self.render_from_board())
-
-    def auto_swap_circle(self):
-        self.ctrl.update_board()
-        self.board = self.ctrl.board
-        fallen, spawned = self.ctrl.fallen, self.ctrl.spawned
-        removed = self.ctrl.removed
-        bonuses = self.ctrl.bonuses
-
-        for r, c in removed:
-            lbl = self.tile_labels.pop((r, c), None)
-            if not lbl:
-                continue
-
-            explosion = ExplosionLabel(self, lbl.element.color.value, lbl.pos(), self.CELL_SIZE, fps=100)
-
-            lbl.deleteLater()
-
-            explosion.raise_()
-            explosion.show()
-            audio.play_sound("removed")
-
-        for r, c, bonus in bonuses:
-            elem = self.board.cell(r, c)
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-            x = self.GRID_ORIGIN.x() + c * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() + r * self.CELL_SIZE
-            lbl.setGeometry(x, y, self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-            self.tile_labels[(r, c)] = lbl
-            audio.play_sound("add_bonus")
-
-        for old_r, old_c, new_r, new_c in fallen:
-            lbl = self.tile_labels.pop((old_r, old_c), None)
-            if not lbl:
-                continue
-            lbl.row, lbl.col = new_r, new_c
-            self.tile_labels[(new_r, new_c)] = lbl
-            self._animate_fall(lbl, new_r)
+        for elem in step.spawned:
+            start = QPoint(self.GRID_ORIGIN.x() + elem.y * self.CELL_SIZE,
+                           self.GRID_ORIGIN.y() - elem.x * self.CELL_SIZE)
+            tile = self.canvas.add_tile(elem, elem.x, elem.y, start)
+            self._animate_fall(tile, elem.x, batch)
             audio.play_sound("falling")
 
-        for elem in spawned:
-            lbl = TileLabel(self, elem)
-            pix = self._pix_for_elem(elem)
-            lbl.setPixmap(pix)
-
-            x = self.GRID_ORIGIN.x() + elem.y * self.CELL_SIZE
-            y = self.GRID_ORIGIN.y() - elem.x * self.CELL_SIZE
-            lbl.setGeometry(x, y,
-                            self.CELL_SIZE, self.CELL_SIZE)
-            lbl.raise_()
-            lbl.show()
-
-            self.tile_labels[(elem.x, elem.y)] = lbl
-            self._animate_fall(lbl, elem.x)
-            audio.play_sound("falling")
+    def _finish_move_result(self, result: MoveResult):
+        self.board.board_from_matrix(result.board)
+        self.render_from_board()
+        self.score = result.scores.get(self.view.my_nickname, 0)
+        self.display_number('score', self.score)
 
-        self.run_after_animations(lambda: self.render_from_board())
+        self._move_results.popleft()
+        if self._move_results:
+            self._play_move_result(self._move_results[0])
 
     def closeEvent(self, event):
         if hasattr(self, "_settings") and self._settings.isVisible():
@@ -839,18 +452,6 @@ class GameWindow(QWidget):
         self.waiting_overlay.show()
         self.setEnabled(False)
 
-    def _check_animations_done(self):
-        if self.pending_animations == 0 and self._on_all_animations:
-            cb = self._on_all_animations
-            self._on_all_animations = None
-            cb()
-
-    def run_after_animations(self, callback):
-        if self.pending_animations > 0:
-            self._on_all_animations = callback
-        else:
-            callback()
-
     def _on_settings_home(self):
         self._clock_timer.stop()
         if self.main_window:
@@ -1,18 +1,27 @@
 import threading
 
-from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QIcon, QFont, QFontDatabase, QPixmap
+from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, QTimer
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import (
-    QDialog, QLabel, QLineEdit, QPushButton
+    QDialog, QLabel, QLineEdit, QPushButton, QListWidget, QListWidgetItem, QComboBox
 )
 
 from GUI.game_window import GameWindow
+from GUI.spectator_window import SpectatorWindow
 from core.audio_manager import AudioManager
 from core.client import Client
+from core.enums import ConnectState
+from core.lobby import SessionDirectory, SessionInfo
+from core.resource_manager import ResourceManager
 from core.setting_deploy import get_resource_path
 from logger import logger
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
+
+MODE_TITLES = {"time": "На время", "chess": "Шахматы"}
+# варианты быстрой игры: режим и лимит времени
+QUICK_MATCHES = [("time", 60), ("time", 180), ("chess", 0)]
 
 
 class JoinGameWindow(QDialog):
@@ -27,11 +36,11 @@ class JoinGameWindow(QDialog):
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Dialog)
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.setModal(True)
-        self.setFixedSize(400, 500)
+        self.setFixedSize(400, 700)
+        self.directory = SessionDirectory.instance()
+        self._shown_sessions = None
 
-        fid = QFontDatabase.addApplicationFont(get_resource_path("assets/FontFont.otf"))
-        fams = QFontDatabase.applicationFontFamilies(fid)
-        self.font = fams[0] if fams else self.font().family()
+        self.font = resources.font_family()
 
         bg = QLabel(self)
         bg.setStyleSheet(
@@ -39,12 +48,12 @@ class JoinGameWindow(QDialog):
             "border:6px solid #af5829;"
             "border-radius:20px;"
         )
-        bg.setGeometry(20, 40, 360, 460)
+        bg.setGeometry(20, 40, 360, 660)
         bg.lower()
 
         pic = QLabel(self)
-        p = QPixmap(get_resource_path("assets/setting_title.png")) \
-            .scaled(300, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        p = resources.pixmap(get_resource_path("assets/setting_title.png"), 300, 100,
+                             Qt.KeepAspectRatio, Qt.SmoothTransformation)
         pic.setPixmap(p)
         pic.setGeometry(50, 0, 300, 100)
 
@@ -73,9 +82,21 @@ class JoinGameWindow(QDialog):
         self.nick_edit.setGeometry(50, 160, 300, 30)
         self.nick_edit.textChanged.connect(self._on_nick_changed)
 
+        lbl_lobby = QLabel("Игры в сети:", self)
+        lbl_lobby.setFont(QFont(self.font, 14))
+        lbl_lobby.setGeometry(50, 200, 300, 30)
+
+        self.sessions_list = QListWidget(self)
+        self.sessions_list.setFont(QFont(self.font, 11))
+        self.sessions_list.setStyleSheet(
+            "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
+        )
+        self.sessions_list.setGeometry(50, 230, 300, 100)
+        self.sessions_list.itemClicked.connect(self._on_session_clicked)
+
         self.lbl_code = QLabel("Пригласительный код:", self)
         self.lbl_code.setFont(QFont(self.font, 14))
-        self.lbl_code.setGeometry(50, 200, 300, 30)
+        self.lbl_code.setGeometry(50, 340, 300, 30)
         self.lbl_code.hide()
         self.code_edit = QLineEdit(self)
         self.code_edit.setStyleSheet(
@@ -83,57 +104,148 @@ class JoinGameWindow(QDialog):
         )
         self.code_edit.setFont(QFont(self.font, 12))
         self.code_edit.setPlaceholderText("Введите код")
-        self.code_edit.setGeometry(50, 230, 300, 30)
+        self.code_edit.setGeometry(50, 370, 300, 30)
         self.code_edit.textChanged.connect(self._on_code_changed)
         self.code_edit.hide()
 
         self.join_button = QPushButton("Присоединится к игре", self)
         self.join_button.setFont(QFont(self.font, 14))
-        self.join_button.setGeometry(50, 280, 300, 40)
+        self.join_button.setGeometry(50, 420, 300, 40)
         self.join_button.setStyleSheet(
             "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
         )
         self.join_button.clicked.connect(self.join_game)
         self.join_button.hide()
 
+        self.watch_button = QPushButton("Смотреть игру", self)
+        self.watch_button.setFont(QFont(self.font, 14))
+        self.watch_button.setGeometry(50, 470, 300, 40)
+        self.watch_button.setStyleSheet(
+            "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
+        )
+        self.watch_button.clicked.connect(self.watch_game)
+        self.watch_button.hide()
+
+        self.quick_combo = QComboBox(self)
+        self.quick_combo.setFont(QFont(self.font, 12))
+        for mode, limit in QUICK_MATCHES:
+            title = MODE_TITLES[mode]
+            self.quick_combo.addItem(f"{title} {limit} с" if limit else title, (mode, limit))
+        self.quick_combo.setStyleSheet(
+            "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
+        )
+        self.quick_combo.setGeometry(50, 520, 140, 40)
+        self.quick_combo.hide()
+
+        self.quick_button = QPushButton("Найти соперника", self)
+        self.quick_button.setFont(QFont(self.font, 12))
+        self.quick_button.setGeometry(200, 520, 150, 40)
+        self.quick_button.setStyleSheet(
+            "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
+        )
+        self.quick_button.clicked.connect(self.quick_match)
+        self.quick_button.hide()
+
         self.status_label = QLabel("", self)
         self.status_label.setFont(QFont(self.font, 14))
-        self.status_label.setGeometry(50, 340, 300, 80)
+        self.status_label.setGeometry(50, 570, 300, 80)
         self.status_label.setVisible(False)
+
+        self._lobby_timer = QTimer(self)
+        self._lobby_timer.setInterval(500)
+        self._lobby_timer.timeout.connect(self._refresh_sessions)
+        self._lobby_timer.start()
+        self._refresh_sessions()
         self._animate_show()
 
+    def _refresh_sessions(self):
+        sessions = self.directory.sessions()
+        shown = [self._session_title(s) for s in sessions]
+        if shown == self._shown_sessions:
+            return
+        self._shown_sessions = shown
+        self.sessions_list.clear()
+        for session, title in zip(sessions, shown):
+            item = QListWidgetItem(title)
+            item.setData(Qt.UserRole, session.code)
+            self.sessions_list.addItem(item)
+
+    @staticmethod
+    def _session_title(session: SessionInfo) -> str:
+        parts = [session.host_nick or session.ip, MODE_TITLES.get(session.mode, session.mode),
+                 f"{session.players}/{session.max_players}"]
+        if session.time_limit:
+            parts.append(f"{session.time_limit} с")
+        if session.started:
+            parts.append("идёт игра")
+        return " · ".join(parts)
+
+    def _on_session_clicked(self, item: QListWidgetItem):
+        self.code_edit.setText(item.data(Qt.UserRole))
+
     def _on_nick_changed(self, text):
-        if len(text) >= 1:
-            self.lbl_code.show()
-            self.code_edit.show()
-        else:
-            self.lbl_code.hide()
-            self.code_edit.hide()
+        for widget in (self.lbl_code, self.code_edit, self.quick_combo, self.quick_button):
+            widget.setVisible(len(text) >= 1)
 
     def _on_code_changed(self, text):
         if len(text) >= 1:
             self.join_button.show()
+            self.watch_button.show()
         else:
             self.join_button.hide()
+            self.watch_button.hide()
 
-    def join_game(self):
+    def join_game(self, spectator=False):
         session_code = self.code_edit.text().strip()
         if not session_code:
             self.show_error("Введите код!")
             return
 
-        self.show_status("Подключение...")
+        self._set_buttons_enabled(False)
+        if self.client:
+            self.client.close()
+        self.client = Client(self.nick_edit.text(), self, spectator=spectator)
+        self.client.state_changed.connect(self._on_client_state)
+        self.client.connect_failed.connect(self.show_error)
+        session = self.directory.find(session_code)
+        # сервер уже есть в списке игр — адрес известен, искать не нужно
+        self.client.connect_to(session_code, (session.ip, session.port) if session else None)
+
+    def quick_match(self):
+        # без кода: сервер подбора сам найдёт соперника и сессию
+        self._set_buttons_enabled(False)
+        if self.client:
+            self.client.close()
+        mode, limit = self.quick_combo.currentData()
+        self.client = Client(self.nick_edit.text(), self)
+        self.client.state_changed.connect(self._on_client_state)
+        self.client.connect_failed.connect(self.show_error)
+        self.client.queue_for_match(mode, limit)
+
+    def _set_buttons_enabled(self, enabled: bool):
+        for button in (self.join_button, self.watch_button, self.quick_button):
+            button.setDisabled(not enabled)
 
-        nickname = self.nick_edit.text()
-        self.client = Client(session_code, nickname, self)
+    def _on_client_state(self, state: ConnectState):
+        if state == ConnectState.SEARCHING:
+            self.show_status("Поиск сервера...")
+        elif state == ConnectState.QUEUED:
+            self.show_status("Ищем соперника...")
+        elif state == ConnectState.CONNECTING:
+            self.show_status("Подключение...")
+        elif state == ConnectState.HANDSHAKE:
+            self.show_status("Подключение установлено...")
+        elif state == ConnectState.CONNECTED:
+            self.show_success("Вы успешно подключились! Ожидайте начала игры.")
+
+    def watch_game(self):
+        self.join_game(spectator=True)
 
     def show_error(self, message):
         self.status_label.setText(message)
         self.status_label.setStyleSheet("font-size: 18px; color: red; font-weight: bold;")
         self.status_label.setVisible(True)
-        self.join_button.setVisible(False)
-        self.nickname_combo.setCurrentIndex(0)
-        self.nickname_combo.setDisabled(False)
+        self._set_buttons_enabled(True)
 
     def show_success(self, message="Вы успешно подключились!/n Ожидайте начала игры."):
         self.status_label.setText(message)
@@ -145,15 +257,29 @@ class JoinGameWindow(QDialog):
         self.status_label.setStyleSheet("font-size: 14px; color: blue; font-weight: bold;")
         self.status_label.setVisible(True)
 
-    def start_game(self):
+    def start_game(self, view):
+        if self.client.spectator:
+            self.client.gui = SpectatorWindow(self.client.ctrl, main_window=self.main_window)
+            self.client.gui.show()
+            self.client.gui.apply_state("start_game", view)
+            logger.info("Spectating start")
+            self.accept()
+            return
         audio.switch_to_game()
         self.client.gui = GameWindow(main_window=self.main_window)
         self.client.gui.ctrl = self.client.ctrl
-        self.client.gui.apply_state("start_game")
+        self.client.gui.apply_state("start_game", view)
         self.client.gui.show()
         logger.info("Game start")
         self.accept()
 
+    def done(self, result):
+        self._lobby_timer.stop()
+        if result == QDialog.Rejected and self.client:
+            # окно закрыли, не дождавшись игры: обрываем подключение
+            self.client.close()
+        super().done(result)
+
     def _animate_show(self):
         fade = QPropertyAnimation(self, b"windowOpacity", self)
         fade.setDuration(300)
@@ -1,5 +1,5 @@
 from PyQt5.QtCore import QSize, Qt
-from PyQt5.QtGui import QIcon, QFont, QPixmap, QFontDatabase
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import QPushButton, QLabel, QWidget
 
 from GUI.create_game_window import CreateGameWindow
@@ -7,10 +7,12 @@ from GUI.game_window import GameWindow
 from GUI.join_game_window import JoinGameWindow
 from GUI.settings_window import SettingsWindow
 from core.audio_manager import AudioManager
+from core.resource_manager import ResourceManager
 from core.setting_deploy import get_resource_path
 from logger import logger
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
 
 
 class MainWindow(QWidget):
@@ -27,21 +29,18 @@ class MainWindow(QWidget):
         self._make_ui()
 
     def _load_font(self):
-        fid = QFontDatabase.addApplicationFont(get_resource_path("assets/FontFont.otf"))
-        fams = QFontDatabase.applicationFontFamilies(fid)
-        self.font_family = fams[0] if fams else self.font().family()
+        self.font_family = resources.font_family()
 
     def _make_background(self):
         bg = QLabel(self)
-        bg.setPixmap(QPixmap(get_resource_path("assets/start_background.png"))
-                     .scaled(self.WIDTH, self.HEIGHT))
+        bg.setPixmap(resources.pixmap(get_resource_path("assets/start_background.png"), self.WIDTH, self.HEIGHT))
         bg.setGeometry(0, 0, self.WIDTH, self.HEIGHT)
         bg.lower()
 
     def _make_ui(self):
         circle = QLabel(self)
-        circle_pix = QPixmap(get_resource_path("assets/circle.png")).scaled(380, 380,
-                                                                            Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        circle_pix = resources.pixmap(get_resource_path("assets/circle.png"), 380, 380,
+                                      Qt.KeepAspectRatio, Qt.SmoothTransformation)
         circle.setPixmap(circle_pix)
         circle.move((self.WIDTH - circle_pix.width()) // 2, 90)
 
@@ -1,13 +1,15 @@
 from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QParallelAnimationGroup, QEasingCurve, pyqtSignal
-from PyQt5.QtGui import QPixmap, QIcon, QFont, QFontDatabase
+from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import (
     QDialog, QLabel, QPushButton
 )
 
 from core.audio_manager import AudioManager
+from core.resource_manager import ResourceManager
 from core.setting_deploy import get_resource_path
 
 audio = AudioManager.instance()
+resources = ResourceManager.instance()
 
 
 class SettingsWindow(QDialog):
@@ -25,15 +27,11 @@ class SettingsWindow(QDialog):
         self.music_on = True
 
         title = QLabel(self)
-        title.setPixmap(
-            QPixmap(get_resource_path("assets/setting_title.png"))
-            .scaled(250, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        )
+        title.setPixmap(resources.pixmap(get_resource_path("assets/setting_title.png"), 250, 80,
+                                         Qt.KeepAspectRatio, Qt.SmoothTransformation))
         title.setGeometry(40, 0, 250, 80)
 
-        font_id = QFontDatabase.addApplicationFont(get_resource_path("assets/FontFont.otf"))
-        families = QFontDatabase.applicationFontFamilies(font_id)
-        self.font_family = families[0] if families else self.font().family()
+        self.font_family = resources.font_family()
 
         lbl = QLabel('Настройки', self)
         lbl.setFont(QFont(self.font_family, 18))
@@ -77,7 +75,7 @@ class SettingsWindow(QDialog):
         btn.setGeometry(x, y, 80, 80)
 
         off = QLabel(btn)
-        off.setPixmap(QPixmap(get_resource_path("assets/buttons/off.png")).scaled(80, 80))
+        off.setPixmap(resources.pixmap(get_resource_path("assets/buttons/off.png"), 80, 80))
         off.setAlignment(Qt.AlignCenter)
         off.hide()
         btn._off = off
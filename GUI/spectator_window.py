@@ -0,0 +1,134 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtWidgets import QLabel, QMessageBox, QPushButton, QWidget
+
+from GUI.board_view import BoardView
+from core.board import Board
+from core.game_controller import GameController, GameView
+from core.resource_manager import ResourceManager
+from core.setting_deploy import get_resource_path
+from logger import logger
+
+resources = ResourceManager.instance()
+
+
+class SpectatorWindow(QWidget):
+    def __init__(self, ctrl: GameController, main_window=None):
+        super().__init__()
+        self.ctrl = ctrl
+        self.main_window = main_window
+        if self.main_window:
+            self.main_window.hide()
+        self.views: dict[str, BoardView] = {}
+        self.view: GameView | None = None
+        self._shown_boards: dict[str, tuple] = {}
+        self._closing = False
+
+        self.setWindowTitle("Three in row: наблюдение")
+        self.setWindowIcon(QIcon(get_resource_path("assets/icon.png")))
+        self.setFixedSize(340, 120)
+        self.setStyleSheet("background: rgb(255,204,141);")
+
+        font_family = resources.font_family()
+
+        self.title = QLabel("Ожидаем начала игры…", self)
+        self.title.setFont(QFont(font_family, 14))
+        self.title.setAlignment(Qt.AlignCenter)
+        self.title.setGeometry(10, 10, 320, 40)
+
+        btn_exit = QPushButton("Выйти", self)
+        btn_exit.setFont(QFont(font_family, 14))
+        btn_exit.setGeometry(110, 60, 120, 40)
+        btn_exit.setStyleSheet(
+            "background-color: rgb(254,243,219); border:2px solid #af5829; border-radius:6px;"
+        )
+        btn_exit.clicked.connect(self.close)
+
+        # часы игры на время досчитываем сами, сервер присылает только поправки
+        self._clock_timer = QTimer(self)
+        self._clock_timer.setInterval(200)
+        self._clock_timer.timeout.connect(self._tick_clock)
+
+    def _open_views(self):
+        for board_view in self.views.values():
+            board_view.close()
+        self.views.clear()
+        self._shown_boards.clear()
+
+        view = self.view
+        self.title.setText(" vs ".join(view.nicknames))
+        if view.mode == "chess":
+            names = ["chess"]
+        else:
+            names = list(view.nicknames)
+
+        for i, name in enumerate(names):
+            board_view = BoardView()
+            board_view.setWindowTitle(f"Three in row: {name}")
+            board_view.move(100 + i * 520, 100)
+            board_view.show()
+            self.views[name] = board_view
+
+        if view.mode == "chess":
+            self.views["chess"].update_board(Board.from_matrix(view.board), True)
+        else:
+            for nick, board_view in self.views.items():
+                matrix = view.player_boards.get(nick, view.board)
+                self._shown_boards[nick] = matrix
+                board_view.update_board(Board.from_matrix(matrix), True)
+                board_view.update_score(view.scores.get(nick, 0))
+            self._tick_clock()
+            self._clock_timer.start()
+
+    def _tick_clock(self):
+        if self.view is None or self.view.clock is None:
+            return
+        seconds = int(self.view.clock.elapsed())
+        for board_view in self.views.values():
+            if board_view.elapsed_seconds != seconds:
+                board_view.tick_clock(seconds)
+
+    def apply_state(self, command: str, view: GameView):
+        self.view = view
+        logger.info(f"Зритель: обработка команды {command}")
+        if command == "start_game":
+            self._open_views()
+        elif command == "board":
+            for nick, matrix in view.player_boards.items():
+                board_view = self.views.get(nick)
+                if board_view and self._shown_boards.get(nick) != matrix:
+                    self._shown_boards[nick] = matrix
+                    board_view.update_board(Board.from_matrix(matrix))
+        elif command == "score":
+            for nick, board_view in self.views.items():
+                board_view.update_score(view.scores.get(nick, 0))
+        elif command == "clock":
+            self._tick_clock()
+        elif command == "swap_result":
+            board_view = self.views.get("chess")
+            if board_view:
+                result = view.move_result
+                board_view.update_board(Board.from_matrix(result.board))
+                board_view.update_score(result.scores.get(result.player, 0))
+        elif command == "end_game":
+            self._clock_timer.stop()
+            QMessageBox.information(self, "Игра окончена",
+                                    f"Победил {view.winner_player} со счётом {view.winner_score}")
+            self.close()
+        elif command == "error":
+            if self._closing:
+                return
+            QMessageBox.critical(self, "Ошибка", "Соединение с сервером потеряно.")
+            self.close()
+
+    def closeEvent(self, event):
+        if self._closing:
+            return super().closeEvent(event)
+        self._closing = True
+        self._clock_timer.stop()
+        for board_view in self.views.values():
+            board_view.close()
+        self.ctrl.close_game()
+        if self.main_window:
+            self.main_window.show()
+        super().closeEvent(event)
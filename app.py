@@ -1,5 +1,7 @@
 import sys
 from PyQt5.QtWidgets import QApplication
+from GUI.board_canvas import BoardCanvas
+from GUI.game_window import GameWindow
 from GUI.main_window import MainWindow
 from core.audio_manager import AudioManager
 from logger import logger
@@ -14,6 +16,8 @@ def main():
         audio = AudioManager.instance()
         audio.switch_to_lobby()
         app = QApplication(sys.argv)
+        # кадры взрывов декодируются в фоне, пока игрок в меню
+        BoardCanvas.prewarm(GameWindow.CELL_SIZE)
         window = MainWindow()
         window.show()
         sys.exit(app.exec_())
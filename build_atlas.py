@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import re
+
+from PIL import Image
+
+# наборы кадров, которые собираются в атласы: имя атласа -> папка с png
+SOURCES = {
+    **{f"explosion_{color}": f"assets/elements/explosion/{color}"
+       for color in ("orange", "purple", "red", "yellow", "bomb")},
+    **{f"score_{color}": f"assets/score/{color}"
+       for color in ("blue", "green", "orange", "purple", "red", "yellow")},
+}
+OUTPUT_DIR = "assets/atlas"
+# ширина строки атласа, пикселей
+MAX_WIDTH = 1024
+
+
+def pack(frames: list[tuple[str, Image.Image]], max_width: int = MAX_WIDTH):
+    # полками: кадры слева направо, новая строка, когда текущая кончилась
+    rects, x, y, shelf, width = {}, 0, 0, 0, 0
+    for name, img in frames:
+        if x and x + img.width > max_width:
+            x, y, shelf = 0, y + shelf, 0
+        rects[name] = (x, y, img.width, img.height)
+        x += img.width
+        shelf = max(shelf, img.height)
+        width = max(width, x)
+    atlas = Image.new("RGBA", (width, y + shelf), (0, 0, 0, 0))
+    for name, img in frames:
+        atlas.paste(img, rects[name][:2])
+    return atlas, rects
+
+
+def build(name: str, source: str, output_dir: str = OUTPUT_DIR) -> bool:
+    if not os.path.isdir(source):
+        print(f"{name}: нет папки {source}, пропускаем")
+        return False
+    # frame_2 раньше frame_10: у бомбы номера кадров без ведущих нулей
+    files = sorted((f for f in os.listdir(source) if f.endswith(".png")),
+                   key=lambda f: [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", f)])
+    frames = [(os.path.splitext(f)[0], Image.open(os.path.join(source, f)).convert("RGBA")) for f in files]
+    atlas, rects = pack(frames)
+    os.makedirs(output_dir, exist_ok=True)
+    atlas.save(os.path.join(output_dir, f"{name}.png"), optimize=True)
+    # порядок кадров в индексе — порядок анимации
+    index = {"image": f"{name}.png", "frames": [{"name": n, "rect": list(rects[n])} for n, _ in frames]}
+    with open(os.path.join(output_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    print(f"{name}: {len(frames)} кадров -> {atlas.width}x{atlas.height}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Собрать кадры анимаций и цифры в атласы (assets/atlas)")
+    parser.add_argument("names", nargs="*", help="какие атласы собрать (по умолчанию все)")
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    args = parser.parse_args()
+    for name in args.names or SOURCES:
+        build(name, SOURCES[name], args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 # core/board.py
 from __future__ import annotations
 import random
+import zlib
+from dataclasses import dataclass
 from typing import List, Tuple, Dict, Iterable, Set
 
 from core.enums import Color, Bonus
@@ -8,9 +10,46 @@ from core.element import Element
 from logger import logger
 
 
+@dataclass
+class CascadeStep:
+    removed: Set[Tuple[int, int]]
+    # последнее поле у бонусов и упавших — Element.id фишки
+    bonuses: List[Tuple[int, int, Bonus, Color, int]]
+    fallen: List[Tuple[int, int, int, int, int]]
+    spawned: List[Element]
+    # фишка, перекрашенная после заполнения, когда на доске не осталось ходов
+    recolored: Tuple[int, int, Color] | None = None
+
+
+# упакованная доска: байт на клетку, цвет в младших двух битах, бонус — в следующих двух
+_EMPTY_CELL = 0xFF
+_COLOR_CODES = {color: i for i, color in enumerate(Color)}
+_BONUS_CODES = {bonus: i for i, bonus in enumerate(Bonus)}
+_CELL_DECODE = {
+    (bonus_code << 2) | color_code: (color, bonus)
+    for color, color_code in _COLOR_CODES.items()
+    for bonus, bonus_code in _BONUS_CODES.items()
+}
+
+# клетка матрицы (Element.short) -> (цвет, бонус): 'R', бонус с цветом 'Hr','Vo','Bp';
+# одиночные 'H','V','B' — старый формат без цвета. Регистр не важен
+_SHORT_DECODE: Dict[str, Tuple[Color, Bonus]] = {}
+for _color in Color:
+    _char = _color.value[0]
+    _SHORT_DECODE[_char] = (_color, Bonus.NONE)
+    for _prefix, _bonus in (("h", Bonus.ROCKET_H), ("v", Bonus.ROCKET_V), ("b", Bonus.BOMB)):
+        _SHORT_DECODE[_prefix + _char] = (_color, _bonus)
+_SHORT_DECODE.update({"h": (Color.RED, Bonus.ROCKET_H), "v": (Color.ORANGE, Bonus.ROCKET_V),
+                      "b": (Color.PURPLE, Bonus.BOMB)})
+_SHORT_DECODE.update({key.upper(): value for key, value in _SHORT_DECODE.items()})
+_SHORT_DECODE.update({key[0].upper() + key[1:]: value for key, value in _SHORT_DECODE.items()})
+
+
 class Board:
     ROWS, COLS = 8, 7
     COLORS = list(Color)
+    # последний выданный Element.id; одинаковые доски выдают одинаковые номера
+    _next_id = 0
 
     def __init__(self):
         self.grid: List[List[Element | None]] = [
@@ -21,10 +60,17 @@ class Board:
     def cell(self, r: int, c: int) -> Element | None:
         return self.grid[r][c]
 
+    def _element(self, r: int, c: int, color: Color, bonus: Bonus = Bonus.NONE) -> Element:
+        self._next_id += 1
+        return Element(r, c, color, bonus, self._next_id)
+
     def swap(self,
              a: Tuple[int, int],
-             b: Tuple[int, int]
+             b: Tuple[int, int],
+             rng: random.Random | None = None
              ) -> Tuple[bool, Set[Tuple[int, int]], List[Tuple[int, int, Bonus]]]:
+        # rng — источник случайности для бонусов; None — общий random
+        rng = rng or random
         r1, c1 = a
         r2, c2 = b
         self.grid[r1][c1], self.grid[r2][c2] = self.grid[r2][c2], self.grid[r1][c1]
@@ -48,17 +94,117 @@ class Board:
             return False, set(), []
 
         matched = self._collect_matches()
-        bonus_cells = self._create_bonuses(matched, a, b)
+        bonus_cells = self._create_bonuses(matched, a, b, rng)
         to_remove = matched - set((r, c) for r, c, _ in bonus_cells)
         for r, c in to_remove:
             self.grid[r][c] = None
 
         return True, matched, bonus_cells
 
+    def resolve_swap(self,
+                     a: Tuple[int, int],
+                     b: Tuple[int, int],
+                     rng: random.Random | None = None
+                     ) -> Tuple[bool, List[CascadeStep]]:
+        # с одинаковым rng одинаковые доски дают одинаковый результат —
+        # на этом держится предсказание хода на клиенте
+        rng = rng or random
+        success, removed, bonuses = self.swap(a, b, rng)
+        if not success:
+            return False, []
+
+        steps = [self._cascade_step(removed, bonuses, rng)]
+        while self.step():
+            removed, bonuses = self.get_auto_matched(rng)
+            steps.append(self._cascade_step(removed, bonuses, rng))
+        return True, steps
+
+    def copy(self) -> Board:
+        other = Board.__new__(Board)
+        other.grid = [
+            [Element(e.x, e.y, e.color, e.bonus, e.id) if e else None for e in row]
+            for row in self.grid
+        ]
+        other._next_id = self._next_id
+        return other
+
+    def pack(self) -> bytes:
+        return bytes(
+            _EMPTY_CELL if e is None else (_BONUS_CODES[e.bonus] << 2) | _COLOR_CODES[e.color]
+            for row in self.grid for e in row
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Board:
+        # номера фишек не упаковываются: распакованная доска нумерует их заново, как новая
+        board = cls.__new__(cls)
+        board.grid = [
+            [
+                None if (code := data[r * cls.COLS + c]) == _EMPTY_CELL
+                else Element(r, c, *_CELL_DECODE[code], r * cls.COLS + c + 1)
+                for c in range(cls.COLS)
+            ]
+            for r in range(cls.ROWS)
+        ]
+        board._next_id = cls.ROWS * cls.COLS
+        return board
+
+    def swap_cells(self, a: Tuple[int, int], b: Tuple[int, int]):
+        (r1, c1), (r2, c2) = a, b
+        self.grid[r1][c1], self.grid[r2][c2] = self.grid[r2][c2], self.grid[r1][c1]
+
+    def apply_step(self, step: CascadeStep):
+        # повторяет записанный шаг каскада без случайности — так журнал игры восстанавливает доску
+        bonus_cells = {(r, c) for r, c, *_ in step.bonuses}
+        for r, c in step.removed:
+            if (r, c) not in bonus_cells:
+                self.grid[r][c] = None
+        for r, c, bonus, color, elem_id in step.bonuses:
+            self.grid[r][c] = Element(r, c, color, bonus, elem_id)
+        # падения записаны в порядке collapse_and_fill: клетка назначения к этому моменту пуста
+        for old_r, old_c, new_r, new_c, _ in step.fallen:
+            e = self.grid[old_r][old_c]
+            self.grid[old_r][old_c] = None
+            self.grid[new_r][new_c] = e
+            e.y, e.x = new_r, new_c
+        for e in step.spawned:
+            self.grid[e.x][e.y] = Element(e.x, e.y, e.color, e.bonus, e.id)
+        self._next_id = max([self._next_id]
+                            + [elem_id for *_, elem_id in step.bonuses]
+                            + [e.id for e in step.spawned])
+        if step.recolored:
+            r, c, color = step.recolored
+            self.grid[r][c].color = color
+
+    def checksum(self) -> int:
+        return zlib.crc32("".join("".join(row) for row in self.to_matrix()).encode())
+
+    def _cascade_step(self,
+                      removed: Set[Tuple[int, int]],
+                      bonuses: List[Tuple[int, int, Bonus]],
+                      rng: random.Random
+                      ) -> CascadeStep:
+        # координаты фиксируем до collapse_and_fill: он переписывает x/y у упавших элементов
+        bonus_cells = [(r, c, bonus, self.grid[r][c].color, self.grid[r][c].id) for r, c, bonus in bonuses]
+        origin = {
+            id(e): (r, c)
+            for r, row in enumerate(self.grid)
+            for c, e in enumerate(row) if e is not None
+        }
+        fallen, spawned, recolored = self.collapse_and_fill(rng)
+        return CascadeStep(
+            removed=set(removed),
+            bonuses=bonus_cells,
+            fallen=[(*origin[id(e)], new_r, new_c, e.id) for e, new_r, new_c in fallen],
+            spawned=[Element(e.x, e.y, e.color, e.bonus, e.id) for e in spawned],
+            recolored=recolored,
+        )
+
     def _create_bonuses(self,
                         matched: Set[Tuple[int, int]],
                         a: Tuple[int, int],
-                        b: Tuple[int, int]
+                        b: Tuple[int, int],
+                        rng: random.Random
                         ) -> List[Tuple[int, int, Bonus]]:
         bonuses = []
         used = set()
@@ -74,10 +220,10 @@ class Board:
             base = self.grid[r][c]
             col = base.color
             if size == 4:
-                bonus = random.choice([Bonus.ROCKET_H, Bonus.ROCKET_V])
+                bonus = rng.choice([Bonus.ROCKET_H, Bonus.ROCKET_V])
             else:
                 bonus = Bonus.BOMB
-            self.grid[r][c] = Element(r, c, col, bonus)
+            self.grid[r][c] = self._element(r, c, col, bonus)
             bonuses.append((r, c, bonus))
             used.update(run)
 
@@ -112,19 +258,23 @@ class Board:
         return bonuses
 
     def has_move(self) -> bool:
+        return self.find_move() is not None
+
+    def find_move(self) -> Tuple[Tuple[int, int], Tuple[int, int]] | None:
         for r in range(self.ROWS):
             for c in range(self.COLS):
                 if c + 1 < self.COLS and self._will_match((r, c), (r, c + 1)):
-                    return True
+                    return (r, c), (r, c + 1)
                 if r + 1 < self.ROWS and self._will_match((r, c), (r + 1, c)):
-                    return True
-        return False
+                    return (r, c), (r + 1, c)
+        return None
 
     def _fill_start_board(self):
         while True:
+            self._next_id = 0
             for r in range(self.ROWS):
                 for c in range(self.COLS):
-                    self.grid[r][c] = Element(r, c, random.choice(self.COLORS))
+                    self.grid[r][c] = self._element(r, c, random.choice(self.COLORS))
             if not self._collect_matches() and self.has_move():
                 break
 
@@ -206,7 +356,11 @@ class Board:
 
         return removed
 
-    def collapse_and_fill(self) -> tuple[list[tuple[Element, int, int]], list[Element]]:
+    def collapse_and_fill(self, rng: random.Random | None = None
+                          ) -> tuple[list[tuple[Element, int, int]], list[Element],
+                                     tuple[int, int, Color] | None]:
+        # упавшие, новые и перекрашенная фишка (r, c, цвет), если после заполнения не осталось ходов
+        rng = rng or random
         fallen: list[tuple[Element, int, int]] = []
 
         for c in range(self.COLS):
@@ -225,14 +379,18 @@ class Board:
         for c in range(self.COLS):
             for r in range(self.ROWS):
                 if self.grid[r][c] is None:
-                    new = Element(r, c, random.choice(self.COLORS))
+                    new = self._element(r, c, rng.choice(self.COLORS))
                     self.grid[r][c] = new
                     spawned.append(new)
 
+        recolored = None
         if not self.has_move():
-            e = random.choice([e for row in self.grid for e in row])
-            e.color = random.choice([c for c in self.COLORS if c != e.color])
-        return fallen, spawned
+            e = rng.choice([e for row in self.grid for e in row])
+            e.color = rng.choice([c for c in self.COLORS if c != e.color])
+            # координаты у упавших фишек записаны наоборот — ищем клетку по самой фишке
+            recolored = next((r, c, e.color) for r, row in enumerate(self.grid)
+                             for c, x in enumerate(row) if x is e)
+        return fallen, spawned, recolored
 
     def _will_match(self, a, b) -> bool:
         (r1, c1), (r2, c2) = a, b
@@ -266,16 +424,17 @@ class Board:
         matched = self._collect_matches()
         return True if len(matched) >= 1 else False
 
-    def get_auto_matched(self) -> Tuple[Set[Tuple[int, int]], List[Tuple[int, int, Bonus]]]:
+    def get_auto_matched(self, rng: random.Random | None = None
+                         ) -> Tuple[Set[Tuple[int, int]], List[Tuple[int, int, Bonus]]]:
         matched = self._collect_matches()
-        bonus_cells = self._create_bonuses_auto(matched)
+        bonus_cells = self._create_bonuses_auto(matched, rng or random)
         to_remove = matched - set((r, c) for r, c, _ in bonus_cells)
         for r, c in to_remove:
             self.grid[r][c] = None
 
         return matched, bonus_cells
 
-    def _create_bonuses_auto(self, matched: Set[Tuple[int, int]]
+    def _create_bonuses_auto(self, matched: Set[Tuple[int, int]], rng: random.Random
                              ) -> List[Tuple[int, int, Bonus]]:
         bonuses: List[Tuple[int, int, Bonus]] = []
 
@@ -283,13 +442,13 @@ class Board:
             n = len(run)
             if n < 4:
                 return
-            r, c = random.choice(run)
+            r, c = rng.choice(run)
             base = self.grid[r][c]
             if n == 4:
-                bonus = random.choice([Bonus.ROCKET_H, Bonus.ROCKET_V])
+                bonus = rng.choice([Bonus.ROCKET_H, Bonus.ROCKET_V])
             else:  # n ≥ 5
                 bonus = Bonus.BOMB
-            self.grid[r][c] = Element(r, c, base.color, bonus)
+            self.grid[r][c] = self._element(r, c, base.color, bonus)
             bonuses.append((r, c, bonus))
 
         # горизонтальные последовательности
@@ -324,21 +483,28 @@ class Board:
         self._last_auto_bonuses = bonuses  # запоминаем для get_auto_matched
         return bonuses
 
+    @classmethod
+    def from_matrix(cls, mat: list[list[str]]) -> Board:
+        # доска из присланной матрицы — без случайного заполнения, которое тут же затрётся
+        board = cls.__new__(cls)
+        board.grid = [[None] * cls.COLS for _ in range(cls.ROWS)]
+        board.board_from_matrix(mat)
+        return board
+
     def board_from_matrix(self, mat: list[list[str]]):
+        # декодирует прямо в эту доску; фишку, которая не изменилась, оставляем как есть
         for r, row in enumerate(mat):
+            grid_row = self.grid[r]
             for c, ch in enumerate(row):
-                # ch: 'r','o','h','v','B','.'
                 if ch == '.':
-                    self.grid[r][c] = None
+                    grid_row[c] = None
+                    continue
+                color, bonus = _SHORT_DECODE[ch]
+                e = grid_row[c]
+                if e is not None and e.color is color and e.bonus is bonus:
+                    e.x, e.y = r, c
                 else:
-                    ch_low = ch.lower()
-                    color_map = {'r': Color.RED, 'o': Color.ORANGE, 'p': Color.PURPLE, 'y': Color.YELLOW,
-                                 'h': Color.RED, 'v': Color.ORANGE, 'b': Color.PURPLE}
-                    bonus_map = {'h': Bonus.ROCKET_H, 'v': Bonus.ROCKET_V, 'b': Bonus.BOMB}
-
-                    color = color_map[ch_low]
-                    bonus = bonus_map.get(ch_low, Bonus.NONE)
-                    self.grid[r][c] = Element(r, c, color, bonus)
+                    grid_row[c] = self._element(r, c, color, bonus)
 
     def to_matrix(self) -> list[list[str]]:
         matrix: list[list[str]] = []
@@ -1,23 +1,50 @@
-import json
 import socket
 import threading
+import time
+from collections import deque
 
 from PyQt5.QtCore import QObject, pyqtSignal, Qt
 
+from core import protocol as proto
+from core.connection import RttEstimator
+from core.enums import ConnectState
 from core.game_controller import GameController
-from core.network_utils import find_server_by_port
+from core.network_utils import MATCH_CODE, find_server
 from logger import logger
 
 
 class Client(QObject):
-    gui_cmd = pyqtSignal(str)
-    gui_requested = pyqtSignal(int)
+    gui_cmd = pyqtSignal(str, object)
+    gui_requested = pyqtSignal(object)
+    state_changed = pyqtSignal(object)
+    connect_failed = pyqtSignal(str)
 
-    def __init__(self, session_code, nickname, join_window):
+    # общий лимит на поиск сервера, соединение и рукопожатие
+    CONNECT_TIMEOUT = 5.0
+    SEARCH_TIMEOUT = 2.0
+
+    def __init__(self, nickname, join_window, spectator=False,
+                 liveness_timeout=proto.LIVENESS_TIMEOUT):
         super().__init__()
+        self.liveness_timeout = liveness_timeout
+        self.rtt = RttEstimator()
+        self._last_seen = time.monotonic()
         self.gui = None
         self.join_window = join_window
         self.nickname = nickname
+        self.spectator = spectator
+        self.state = ConnectState.IDLE
+        self.server_ip, self.server_port = None, None
+        self.sock = None
+        self.token = None
+        self.last_seq = 0
+        self._out_seq = 0
+        # отправленные кадры — досылаются серверу после переподключения
+        self._sent: deque[tuple[int, bytes]] = deque(maxlen=256)
+        self._send_lock = threading.Lock()
+        self._connected = False
+        self._closing = False
+        self._leftover = b""
 
         self.ctrl = GameController(
             mode="",
@@ -31,61 +58,256 @@ class Client(QObject):
         self.ctrl.state_ready = self.gui_cmd.emit
         self.gui_cmd.connect(self._apply_state, Qt.QueuedConnection)
 
-        self.server_ip, self.server_port = find_server_by_port(int(session_code))
-        if not self.server_ip:
-            return self.join_window.show_error("Ошибка: сервер не найден!")
+    def connect_to(self, session_code: str, server_addr=None):
+        # вся сетевая работа — в отдельном потоке, GUI узнаёт о ходе дел из state_changed
+        threading.Thread(target=self._connect_worker, args=(session_code, server_addr), daemon=True).start()
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            self.sock.connect((self.server_ip, self.server_port))
-            self.join_window.show_status("Подключение установлено...")
-        except Exception:
-            return self.join_window.show_error("Ошибка подключения к серверу!")
+    def queue_for_match(self, mode: str, time_limit: int, match_addr=None):
+        # встаём в очередь сервера подбора; когда соперник найден — обычное подключение к сессии
+        threading.Thread(target=self._match_worker, args=(mode, time_limit, match_addr), daemon=True).start()
+
+    def _match_worker(self, mode: str, time_limit: int, match_addr):
+        if match_addr is None:
+            self._set_state(ConnectState.SEARCHING)
+            match_addr = find_server(MATCH_CODE, timeout=self.SEARCH_TIMEOUT,
+                                     cancelled=lambda: self._closing)
+            if not match_addr[0]:
+                return self._fail("Ошибка: сервер подбора не найден!")
+        if self._closing:
+            return self._fail("")
 
-        self.send_message(nickname)
-        resp = self.sock.recv(1024).decode("utf-8")
+        self._set_state(ConnectState.CONNECTING)
+        try:
+            self.sock = socket.create_connection(match_addr, timeout=self.CONNECT_TIMEOUT)
+            self.sock.sendall(proto.hello(f"{proto.QUEUE_PREFIX}{mode}:{time_limit}:{self.nickname}"))
+            resp, _ = proto.read_line(self.sock)
+        except socket.timeout:
+            return self._fail("Сервер подбора не отвечает!")
+        except OSError:
+            return self._fail("Ошибка подключения к серверу подбора!")
+        if resp == proto.UNSUPPORTED_VERSION:
+            return self._fail("Версия клиента не совпадает с сервером подбора!")
         if resp == "INVALID_NICKNAME":
-            return self.join_window.show_error("Никнейм уже занят!")
+            return self._fail("Никнейм уже в очереди!")
+        if resp != "QUEUED":
+            return self._fail("Сервер подбора отклонил запрос!")
 
-        self.join_window.show_success("Вы успешно подключились! Ожидайте начала игры.")
+        self._set_state(ConnectState.QUEUED)
+        try:
+            # ждём соперника сколько потребуется; close() прервёт ожидание
+            self.sock.settimeout(None)
+            resp, _ = proto.read_line(self.sock)
+        except OSError:
+            return self._fail("Связь с сервером подбора потеряна!")
+        finally:
+            self.sock.close()
+        if not resp.startswith("MATCH:"):
+            return self._fail("Сервер подбора отклонил запрос!")
+        port = int(resp[len("MATCH:"):])
+        self._connect_worker(str(port), (match_addr[0], port))
 
-        threading.Thread(target=self._recv_loop, daemon=True).start()
+    def _set_state(self, state: ConnectState):
+        self.state = state
+        logger.info(f"Подключение: {state.name}")
+        self.state_changed.emit(state)
+
+    def _fail(self, message: str):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        if self._closing:
+            self._set_state(ConnectState.CANCELLED)
+            return
+        self._set_state(ConnectState.FAILED)
+        self.connect_failed.emit(message)
+
+    def _connect_worker(self, session_code: str, server_addr):
+        deadline = time.monotonic() + self.CONNECT_TIMEOUT
+        if server_addr is None:
+            self._set_state(ConnectState.SEARCHING)
+            server_addr = find_server(session_code, timeout=self.SEARCH_TIMEOUT,
+                                      cancelled=lambda: self._closing)
+            if not server_addr[0]:
+                return self._fail("Ошибка: сервер не найден!")
+        if self._closing:
+            return self._fail("")
+        self.server_ip, self.server_port = server_addr
+
+        self._set_state(ConnectState.CONNECTING)
+        try:
+            self.sock = socket.create_connection(server_addr, timeout=max(0.1, deadline - time.monotonic()))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            return self._fail("Ошибка подключения к серверу!")
+
+        self._set_state(ConnectState.HANDSHAKE)
+        try:
+            self.sock.settimeout(max(0.1, deadline - time.monotonic()))
+            self.sock.sendall(proto.hello(proto.SPECTATE_PREFIX + self.nickname if self.spectator else self.nickname))
+            resp, self._leftover = proto.read_line(self.sock)
+            self.sock.settimeout(None)
+        except socket.timeout:
+            return self._fail("Сервер не отвечает!")
+        except OSError:
+            return self._fail("Ошибка подключения к серверу!")
+        if resp == proto.UNSUPPORTED_VERSION:
+            return self._fail("Версия клиента не совпадает с сервером!")
+        if resp == "INVALID_NICKNAME":
+            return self._fail("Никнейм уже занят!")
+        if resp.startswith("WELCOME:"):
+            self.token = resp[len("WELCOME:"):]
+        if self._closing:
+            return self._fail("")
 
-    def send_message(self, msg: str):
-        self.sock.send(msg.encode("utf-8"))
+        self._connected = True
+        self._last_seen = time.monotonic()
+        threading.Thread(target=self._recv_loop, daemon=True).start()
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        self._set_state(ConnectState.CONNECTED)
 
     def _recv_loop(self):
+        decoder = proto.FrameDecoder()
+        raw, self._leftover = self._leftover, b""
         while True:
-            try:
-                raw = self.sock.recv(32768)
-                if not raw:
-                    self.ctrl.handle_error()
-                    break
-            except ConnectionResetError:
+            if not raw:
+                try:
+                    raw = self.sock.recv(32768)
+                except OSError:
+                    raw = b""
+                if raw:
+                    self._last_seen = time.monotonic()
+                else:
+                    if self._closing:
+                        break
+                    # игра уже идёт — пробуем вернуться в неё, пока сервер держит место
+                    if self.token is None or self.ctrl.board is None or not self._reconnect():
+                        self.ctrl.handle_error()
+                        break
+                    decoder = proto.FrameDecoder()
+                    raw, self._leftover = self._leftover, b""
+                    continue
+
+            for frame in decoder.feed(raw):
+                try:
+                    data = proto.loads(frame)
+                except Exception:
+                    continue
+                if data["command"] == "ping":
+                    self._send_raw(proto.dumps(proto.pong(data["t"])))
+                    continue
+                if data["command"] == "pong":
+                    rtt = self.rtt.update(time.monotonic() - data["t"])
+                    self.ctrl.update_rtt(GameController.SERVER_PEER, rtt)
+                    continue
+                logger.info(f"Принята команда {data}")
+                self.last_seq = max(self.last_seq, data.get("seq", 0))
 
-                self.ctrl.handle_error()
-                break
+                self.ctrl.submit(self._handle_frame, data)
+            raw = b""
 
+    def _handle_frame(self, data: dict):
+        # выполняется в потоке контроллера: окно игры получает снимок уже после start_game
+        if self.ctrl.handle_command(data):
+            self.gui_requested.emit(self.ctrl.view())
+
+    def _reconnect(self) -> bool:
+        with self._send_lock:
+            self._connected = False
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        logger.warning("Связь с сервером потеряна, переподключаемся…")
+        deadline = time.monotonic() + proto.RESUME_GRACE
+        delay = 0.05
+        while not self._closing and time.monotonic() < deadline:
             try:
-                data = json.loads(raw.decode("utf-8"))
-                logger.info(f"Принята команда {data}")
-            except Exception:
+                sock = socket.create_connection((self.server_ip, self.server_port), timeout=1.0)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.sendall(proto.hello(f"{proto.RESUME_PREFIX}{self.token}:{self.last_seq}"))
+                resp, rest = proto.read_line(sock)
+                sock.settimeout(None)
+            except OSError:
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
                 continue
 
-            players = self.ctrl.handle_command(data)
-            if players:
-                self.gui_requested.emit(players)
+            if not resp.startswith("RESUMED:"):
+                sock.close()
+                logger.warning(f"Сервер отказал в переподключении: {resp}")
+                return False
+            _, self.token, acked = resp.split(":")
+            with self._send_lock:
+                self.sock = sock
+                try:
+                    for seq, frame in self._sent:
+                        if seq > int(acked):
+                            sock.sendall(frame)
+                except OSError:
+                    sock.close()
+                    continue
+                self._connected = True
+            self._leftover = rest
+            self._last_seen = time.monotonic()
+            logger.info("Переподключение выполнено.")
+            return True
+        return False
+
+    def _heartbeat_loop(self):
+        while not self._closing:
+            time.sleep(proto.PING_INTERVAL)
+            if not self._connected:
+                continue
+            silence = time.monotonic() - self._last_seen
+            if silence > self.liveness_timeout:
+                # рвём полуоткрытое соединение сами — дальше обычный путь переподключения
+                logger.warning(f"Сервер молчит {silence:.1f} с — соединение считаем потерянным.")
+                try:
+                    self.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                continue
+            self._send_raw(proto.dumps(proto.ping(time.monotonic())))
+
+    def _send_raw(self, frame: bytes):
+        # служебные кадры: без номера и без сохранения для досылки
+        with self._send_lock:
+            if not self._connected:
+                return
+            try:
+                self.sock.sendall(frame)
+            except OSError:
+                self._connected = False
 
     def _send_to_srv(self, raw: bytes):
-        self.sock.sendall(raw)
+        with self._send_lock:
+            self._out_seq += 1
+            frame = proto.stamp(self._out_seq, raw)
+            self._sent.append((self._out_seq, frame))
+            if not self._connected:
+                # уйдёт после переподключения
+                return
+            try:
+                self.sock.sendall(frame)
+            except OSError:
+                self._connected = False
 
     def close(self):
+        self._closing = True
+        if self.sock is None:
+            return
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         try:
             self.sock.close()
         except OSError:
             logger.error("Error on close sock", OSError)
 
-    def _apply_state(self, cmd: str):
+    def _apply_state(self, cmd: str, view):
         if not self.gui:
             return
-        self.gui.apply_state(cmd)
+        self.gui.apply_state(cmd, view)
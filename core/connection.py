@@ -0,0 +1,244 @@
+import queue
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+from core.protocol import FrameDecoder
+from logger import logger
+
+
+class RttEstimator:
+    # сглаживание как в TCP (RFC 6298)
+    def __init__(self):
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+
+    def update(self, sample: float) -> float:
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar += (abs(self.srtt - sample) - self.rttvar) / 4
+            self.srtt += (sample - self.srtt) / 8
+        return self.srtt
+
+
+class Connection:
+    # сколько кадров может ждать отправки, прежде чем медленного получателя отключат
+    MAX_BACKLOG = 512
+
+    def __init__(self, sock: socket.socket, name: str, hub: "SpectatorHub | None" = None):
+        self.sock = sock
+        self.name = name
+        # мелкие кадры (ход, ping) не должны ждать алгоритма Нейгла
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.closed = False
+        self.rtt = RttEstimator()
+        self.last_seen = time.monotonic()
+        self._hub = hub
+        if hub is not None:
+            # сокет неблокирующий, очередь разбирает общий поток хаба
+            sock.setblocking(False)
+            self._pending: deque[bytes] = deque()
+            self._decoder = FrameDecoder()
+            return
+        self._outbox: queue.Queue = queue.Queue(self.MAX_BACKLOG)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def send(self, data: bytes) -> bool:
+        if self.closed:
+            return False
+        if self._hub is not None:
+            if len(self._pending) >= self.MAX_BACKLOG:
+                logger.warning(f"{self.name} не успевает принимать данные — отключаем.")
+                self.close()
+                return False
+            self._pending.append(data)
+            self._hub.wake(self)
+            return True
+        try:
+            self._outbox.put_nowait(data)
+        except queue.Full:
+            logger.warning(f"{self.name} не успевает принимать данные — отключаем.")
+            self.close()
+            return False
+        return True
+
+    def _write_loop(self):
+        while True:
+            data = self._outbox.get()
+            if data is None:
+                break
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.close()
+                break
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._hub is not None:
+            # сокет закрывает поток хаба, пока тот не держит его в selectors
+            self._hub.wake(self)
+            return
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        try:
+            self._outbox.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class SpectatorHub:
+    # все зрители сессии обслуживаются одним потоком на selectors вместо потока
+    # записи и потока чтения на каждого; поток стартует с первым зрителем
+    def __init__(self, on_frame, on_close):
+        self._on_frame = on_frame
+        self._on_close = on_close
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._lock = threading.Lock()
+        self._dirty: set[Connection] = set()
+        self._conns: set[Connection] = set()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def add(self, conn: Connection, raw: bytes = b""):
+        # байты, пришедшие вместе со строкой рукопожатия
+        conn.last_seen = time.monotonic()
+        for frame in conn._decoder.feed(raw):
+            self._on_frame(conn, frame)
+        self.wake(conn)
+
+    def wake(self, conn: Connection | None = None):
+        with self._lock:
+            if self._stopped:
+                return
+            if conn is not None:
+                self._dirty.add(conn)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            # буфер пробуждения полон — поток и так проснётся
+            pass
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        if thread is not None:
+            thread.join()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _loop(self):
+        while True:
+            for key, events in self._selector.select():
+                conn = key.data
+                if conn is None:
+                    self._drain_wake()
+                    continue
+                if events & selectors.EVENT_READ:
+                    self._read(conn)
+                if events & selectors.EVENT_WRITE and not conn.closed:
+                    self._flush(conn)
+            with self._lock:
+                stopped = self._stopped
+                dirty, self._dirty = self._dirty, set()
+            if stopped:
+                for conn in list(self._conns):
+                    conn.closed = True
+                    self._drop(conn)
+                return
+            for conn in dirty:
+                self._update(conn)
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _read(self, conn: Connection):
+        try:
+            raw = conn.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            raw = b""
+        if not raw:
+            conn.close()
+            return
+        conn.last_seen = time.monotonic()
+        for frame in conn._decoder.feed(raw):
+            self._on_frame(conn, frame)
+
+    def _flush(self, conn: Connection):
+        pending = conn._pending
+        try:
+            while pending:
+                data = pending[0]
+                sent = conn.sock.send(data)
+                if sent < len(data):
+                    pending[0] = data[sent:]
+                    return
+                pending.popleft()
+        except BlockingIOError:
+            pass
+        except OSError:
+            conn.close()
+
+    def _update(self, conn: Connection):
+        if conn.closed:
+            self._drop(conn)
+            return
+        events = selectors.EVENT_READ
+        if conn._pending:
+            # пишем сразу, не дожидаясь следующего select
+            self._flush(conn)
+            if conn.closed:
+                self._drop(conn)
+                return
+            if conn._pending:
+                events |= selectors.EVENT_WRITE
+        if conn in self._conns:
+            self._selector.modify(conn.sock, events, conn)
+        else:
+            self._conns.add(conn)
+            self._selector.register(conn.sock, events, conn)
+
+    def _drop(self, conn: Connection):
+        if conn not in self._conns and conn.sock.fileno() == -1:
+            return
+        if conn in self._conns:
+            self._conns.discard(conn)
+            self._selector.unregister(conn.sock)
+        try:
+            conn.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.sock.close()
+        self._on_close(conn)
@@ -11,6 +11,8 @@ class Element:
     y: int
     color: Color
     bonus: Bonus = Bonus.NONE
+    # номер фишки на её доске: не меняется, пока фишка падает или её меняют местами; 0 — без номера
+    id: int = field(default=0, compare=False)
     img: str = field(init=False)
 
     def __post_init__(self):
@@ -27,6 +29,7 @@ class Element:
         char = self.color.value[0].upper()
         if self.bonus == Bonus.NONE:
             return char
+        # у бонуса тоже есть цвет — он участвует в совпадениях, поэтому передаём его
         if self.bonus == Bonus.BOMB:
-            return "B"
-        return "H" if self.bonus == Bonus.ROCKET_H else "V"
\ No newline at end of file
+            return "B" + char.lower()
+        return ("H" if self.bonus == Bonus.ROCKET_H else "V") + char.lower()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 
 class Color(Enum):
@@ -13,3 +13,42 @@ class Bonus(Enum):
     ROCKET_H = auto()
     ROCKET_V = auto()
     BOMB = auto()
+
+
+class ConnectState(Enum):
+    IDLE = auto()
+    SEARCHING = auto()
+    QUEUED = auto()
+    CONNECTING = auto()
+    HANDSHAKE = auto()
+    CONNECTED = auto()
+    FAILED = auto()
+    CANCELLED = auto()
+
+
+class GamePhase(Enum):
+    WAITING = auto()
+    PLAYING = auto()
+    OVER = auto()
+
+
+class LogKind(IntEnum):
+    # события журнала игры (core/game_log.py); значения пишутся в файл — не перенумеровывать
+    START = 1
+    SWAP = 2
+    STEP = 3
+    SCORE = 4
+    FINISH = 5
+    BOARD = 6
+    SYNC = 7
+    STATE = 8
+    TIME_UP = 9
+    END = 10
+    SNAPSHOT = 11
+
+
+class TweenKind(Enum):
+    # что анимация меняет у спрайта холста (GUI/animator.py)
+    MOVE = auto()
+    FRAMES = auto()
+    GLOW = auto()
@@ -0,0 +1,67 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class ClockView:
+    # снимок часов для GUI: значения, а не живой GameClock, который меняет поток контроллера
+    limit: float
+    started: float | None
+    stopped_at: float | None
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        if self.stopped_at is not None:
+            return self.stopped_at
+        return min(float(self.limit), time.monotonic() - self.started)
+
+    @property
+    def expired(self) -> bool:
+        return self.started is not None and self.elapsed() >= self.limit
+
+
+class GameClock:
+    # часы игры на время: дедлайн держит сервер, клиенты досчитывают
+    # от последней синхронизации по своим монотонным часам
+    def __init__(self, limit: float):
+        self.limit = limit
+        self._started: float | None = None
+        self._stopped_at: float | None = None
+        self._timer: threading.Timer | None = None
+
+    def start(self, elapsed: float = 0.0, on_expired: Callable[[], None] | None = None):
+        self._cancel_timer()
+        self._started = time.monotonic() - elapsed
+        self._stopped_at = None
+        if on_expired:
+            self._timer = threading.Timer(max(0.0, self.limit - elapsed), on_expired)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def sync(self, elapsed: float):
+        # поправка от сервера: таймер дедлайна у клиента не заводится
+        if self._stopped_at is None:
+            self._started = time.monotonic() - elapsed
+
+    def stop(self):
+        self._cancel_timer()
+        if self._stopped_at is None:
+            self._stopped_at = self.elapsed()
+
+    def snapshot(self) -> ClockView:
+        return ClockView(self.limit, self._started, self._stopped_at)
+
+    def elapsed(self) -> float:
+        return self.snapshot().elapsed()
+
+    @property
+    def expired(self) -> bool:
+        return self.snapshot().expired
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
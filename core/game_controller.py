@@ -1,80 +1,295 @@
 from __future__ import annotations
 
+import functools
+import queue
 import random
-from typing import Callable
-from typing import Set, List, Tuple
+import threading
+import time as _time
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+from typing import Dict, List, Tuple
 
 from core import protocol as proto
 from core.board import Board
-from core.element import Element
-from core.enums import Color, Bonus
+from core.game_clock import ClockView, GameClock
+from core.game_log import GameLog
+from core.game_state import GameEvent, GameState, MoveResult
+from core.match_store import MatchRecord
 from logger import logger
 
 
+Matrix = Tuple[Tuple[str, ...], ...]
+
+
+@dataclass(frozen=True)
+class GameView:
+    # неизменяемый снимок состояния, который получает GUI вместе с каждой командой
+    mode: str
+    my_nickname: str | None
+    is_client: bool
+    nicknames: Tuple[str, ...]
+    current: str
+    is_my_step: bool
+    board: Matrix | None
+    scores: Mapping[str, int]
+    opp_board: Matrix | None
+    opp_score: int
+    player_boards: Mapping[str, Matrix]
+    finished: Mapping[str, int]
+    move_result: MoveResult | None
+    clock: ClockView | None
+    winner_player: str | None
+    winner_score: int | None
+    exit_nickname: str | None
+
+
+def _frozen(board: Board | None) -> Matrix | None:
+    return tuple(map(tuple, board.to_matrix())) if board is not None else None
+
+
+def _in_actor(method):
+    # вызов из любого потока ставится в очередь и выполняется в потоке контроллера
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        if self._actor is None or threading.current_thread() is self._actor:
+            return method(self, *args)
+        self.submit(method, self, *args)
+    return wrapper
+
+
 class GameController:
+    # ключ в rtt, под которым клиент хранит задержку до сервера
+    SERVER_PEER = "server"
+
     def __init__(self,
                  mode: str,
                  time: int,
                  nickname: str,
                  is_client: bool = True,
                  on_send: Callable[[bytes], None] | None = None,
-                 on_close: Callable[[], None] | None = None):
-        self.is_opp_finish = False
-        self.winner_score = None
-        self.my_score = None
-        self.b_col = None
-        self.b_row = None
-        self.a_col = None
-        self.a_row = None
-        self.swap_occurred = False
-        self.new_board = None
-        self.success = None
-        self.bonuses = None
-        self.removed = None
-        self.spawned = None
-        self.fallen = None
+                 on_close: Callable[[], None] | None = None,
+                 actor: bool = True,
+                 log_path: str | None = None,
+                 keep_log: bool = False):
+        # правила, доски и счёт — в GameState; контроллер связывает его с сетью, часами и GUI
+        self.game = GameState(mode, me=nickname, judge=not is_client)
+        # журнал всех изменений состояния: перемотка к любому ходу (GameLog.seek).
+        # Ведётся, только если его пишут на диск (log_path) или просят держать в памяти (keep_log):
+        # иначе он копил бы события и снимки на потоке игры, хотя его никто не читает
+        self.log = GameLog(log_path) if log_path or keep_log else None
+        self.game.log = self.log
+        self.move_result: MoveResult | None = None
+        # сид для розыгрыша следующего хода в шахматах: известен заранее, чтобы клиент мог предсказать ход
+        self.next_seed: int | None = None
+        self._prediction: MoveResult | None = None
         self.exit_nickname = None
-        self.mode = mode
         self.time = time
-        self.opp_time = 1
-        self.opp_score = 0
-        self.opp_board = None
-        self.nicknames = None
+        # часы игры на время; на сервере они же следят за дедлайном
+        self.clock: GameClock | None = None
+        self._started_at = 0.0
+        # сервер отдаёт сюда итог игры (MatchStore.record)
+        self.result_ready: Callable[[MatchRecord], None] | None = None
+        # сглаженный RTT до каждого собеседника, секунды
+        self.rtt: Dict[str, float] = {}
         self._send = on_send
         self._close_net = on_close
-        self.state_ready: Callable[[str], None] | None = None
-        self.winner_player = None
-        self.step_player = None
+        self.state_ready: Callable[[str, GameView], None] | None = None
         self.my_nickname = nickname
         self.is_client = is_client
-        self.value_player = 2
-        self.queue = []
-        self.board = None
-        self.elapsed_seconds = 0
-        self.score = 0
-        self.is_my_step = False
-        self.current = ""
+
+        # единственный поток, который меняет состояние: сетевые потоки, таймеры и GUI
+        # только кладут задачи во входящую очередь. actor=False — всё выполняется
+        # в вызывающем потоке (повтор записи, одиночная игра, безголовые прогоны)
+        self._inbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._actor: threading.Thread | None = None
+        if actor:
+            self._actor = threading.Thread(target=self._run, daemon=True, name="game-controller")
+            self._actor.start()
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        future = Future()
+        if self._actor is None:
+            future.set_result(fn(*args))
+        else:
+            self._inbox.put((fn, args, future))
+        return future
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        # дождаться результата; нельзя вызывать, держа блокировку, которую берёт и контроллер
+        if self._actor is None or threading.current_thread() is self._actor:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    def stop(self):
+        # часы тоже: их таймер дедлайна иначе сработал бы в уже закрытой игре
+        if self._actor is None:
+            self._stop_clock()
+            return
+        self.submit(self._stop_clock)
+        self._inbox.put(None)
+
+    def _stop_clock(self):
+        if self.clock:
+            self.clock.stop()
+
+    def _run(self):
+        while (task := self._inbox.get()) is not None:
+            fn, args, future = task
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                logger.exception(f"Ошибка в потоке контроллера: {e}")
+                future.set_exception(e)
+
+    @property
+    def mode(self) -> str:
+        return self.game.mode
+
+    @property
+    def board(self) -> Board | None:
+        return self.game.board
+
+    @property
+    def nicknames(self) -> List[str]:
+        return self.game.nicknames
+
+    @property
+    def queue(self) -> List[str]:
+        return self.game.queue
+
+    @property
+    def current(self) -> str:
+        return self.game.current
+
+    @property
+    def is_my_step(self) -> bool:
+        return self.game.is_my_step
+
+    @property
+    def scores(self) -> Dict[str, int]:
+        return self.game.scores
+
+    @property
+    def finished(self) -> Dict[str, int]:
+        return self.game.finished
+
+    @property
+    def moves(self) -> Dict[str, int]:
+        return self.game.moves
+
+    @property
+    def player_boards(self) -> Dict[str, Board]:
+        return self.game.boards
+
+    @property
+    def opponent_nickname(self) -> str | None:
+        for nick in self.nicknames:
+            if nick != self.my_nickname:
+                return nick
+        return None
+
+    @property
+    def opp_board(self) -> Board | None:
+        return self.game.boards.get(self.opponent_nickname)
+
+    @property
+    def opp_score(self) -> int:
+        return self.game.scores.get(self.opponent_nickname, 0)
+
+    @property
+    def winner_player(self) -> str | None:
+        return self.game.winner
+
+    @property
+    def winner_score(self) -> int | None:
+        return self.game.winner_score
+
+    @_in_actor
+    def update_rtt(self, peer: str, rtt: float):
+        self.rtt[peer] = rtt
+
+    def _clock_latency(self) -> float:
+        # синхронизация часов шла до нас половину RTT
+        return self.rtt.get(self.SERVER_PEER, 0.0) / 2 if self.is_client else 0.0
+
+    def view(self) -> GameView:
+        return GameView(
+            mode=self.mode,
+            my_nickname=self.my_nickname,
+            is_client=self.is_client,
+            nicknames=tuple(self.nicknames),
+            current=self.current,
+            is_my_step=self.is_my_step,
+            board=_frozen(self.board),
+            scores=MappingProxyType(dict(self.scores)),
+            opp_board=_frozen(self.opp_board),
+            opp_score=self.opp_score,
+            player_boards=MappingProxyType({nick: _frozen(b) for nick, b in self.player_boards.items()}),
+            finished=MappingProxyType(dict(self.finished)),
+            move_result=self.move_result,
+            clock=self.clock.snapshot() if self.clock else None,
+            winner_player=self.winner_player,
+            winner_score=self.winner_score,
+            exit_nickname=self.exit_nickname,
+        )
 
     def _dispatch(self, cmd: str) -> None:
         if self.state_ready:
-            self.state_ready(cmd)
+            self.state_ready(cmd, self.view())
+
+    def _publish(self, events: List[GameEvent], local: bool = True):
+        # local — событие нашего хода: о нём сообщаем остальным;
+        # события из чужих кадров только показываем (сервер их уже переслал)
+        for event in events:
+            if event.kind == "end_game":
+                self._game_over()
+                continue
+            if local and self._send:
+                frame = self._frame_for(event)
+                if frame:
+                    self._send(proto.dumps(frame))
+            if event.kind == "swap_result":
+                self.move_result = event.move
+            if event.kind == "score" and local:
+                # свой счёт GUI берёт из итога хода
+                continue
+            self._dispatch(event.kind)
+
+    def _frame_for(self, event: GameEvent) -> dict | None:
+        if event.kind == "swap_result":
+            result = event.move
+            if self.mode == "chess":
+                return proto.swap_result(
+                    player=result.player, a_lbl=result.a, b_lbl=result.b, success=result.success,
+                    steps=result.steps, board=result.board, next_player=result.next_player,
+                    scores=result.scores, checksum=result.checksum, next_seed=self.next_seed)
+            # в игре на время каждый рассылает копию своего поля
+            return proto.board(board_=result.board, player=event.player,
+                               moves=self.moves.get(event.player, 0))
+        if event.kind == "score" and self.mode == "time":
+            return proto.score(score_=event.score, player=event.player)
+        if event.kind == "finish":
+            return proto.finish(score_=event.score, player=event.player)
+        return None
 
+    @_in_actor
     def new_game(self, nicknames):
-        self.nicknames = nicknames
-        self.current = self.my_nickname
-        self.board = Board()
-
-        self.queue = nicknames[:]
-        random.shuffle(self.queue)
-        self.current = self.queue[0]
-        self.is_my_step = self.my_nickname == self.current
+        self.game.start(nicknames)
+        self._started_at = _time.monotonic()
+        self.next_seed = random.getrandbits(32)
+        if self.mode == "time":
+            self.clock = GameClock(self.time)
+            self.clock.start(on_expired=lambda: self.submit(self._time_up))
 
         msg = proto.start_game(
             mode=self.mode,
             queue=self.queue,
             nicknames=self.nicknames,
             board=self.board.to_matrix(),
-            time_limit=self.time
+            time_limit=self.time,
+            next_seed=self.next_seed
         )
 
         if self._send:
@@ -82,189 +297,215 @@ class GameController:
 
         self._dispatch("start_game")
 
-    def _next_player(self):
-        idx = (self.queue.index(self.current) + 1) % len(self.queue)
-        return self.queue[idx]
-
-    def swap(self, a_lbl: Tuple[int, int], b_lbl: Tuple[int, int], success: bool, removed: Set[Tuple[int, int]],
-             bonuses: List[Tuple[int, int, Bonus]]):
-        self.current = self.my_nickname
-        self.current = self._next_player()
-        self.is_my_step = self.my_nickname == self.current
-        if self.mode == "time":
-            self.is_my_step = True
-        if self._send:
-            self._send(proto.dumps(proto.swap(a_lbl=a_lbl, b_lbl=b_lbl, next_player=self.current,
-                                              success=success, removed=removed, bonuses=bonuses,
-                                              board=self.board.to_matrix())))
-
-    def auto_swap(self, fallen: list[tuple[int, int, int, int]], spawned: list[Element]):
-        if self.mode == "time":
-            self.is_my_step = True
-        if self._send:
-            self._send(proto.dumps(proto.auto_swap(fallen=fallen, spawned=spawned,
-                                                   board=self.board.to_matrix())))
-
-    def auto_swap_circle(self, fallen: list[Tuple[int, int, int, int]],
-                         spawned: List[Element],
-                         removed: Set[Tuple[int, int]],
-                         bonuses: List[Tuple[int, int, Bonus]]):
-        if self.mode == "time":
-            self.is_my_step = True
-        if self._send:
-            self._send(proto.dumps(proto.auto_swap_circle(fallen=fallen, spawned=spawned,
-                                                          board_=self.board.to_matrix(), bonuses=bonuses, removed=removed)))
-
-    def handle_command(self, data):
+    @_in_actor
+    def request_move(self, a: Tuple[int, int], b: Tuple[int, int]):
+        if self.is_client and self.mode == "chess":
+            self._predict_move(a, b)
+            if self._send:
+                self._send(proto.dumps(proto.move(a_lbl=a, b_lbl=b)))
+        else:
+            self._play_move(self.my_nickname, a, b)
+
+    def _predict_move(self, a: Tuple[int, int], b: Tuple[int, int]):
+        # разыгрываем свой ход сразу тем же сидом, что и сервер;
+        # его swap_result потом только сверяется по контрольной сумме
+        if not self.is_my_step or self.next_seed is None or self._prediction:
+            return
+        events = self.game.move(self.my_nickname, a, b, random.Random(self.next_seed))
+        if not events:
+            return
+        self._prediction = replace(events[0].move, predicted=True)
+        self.move_result = self._prediction
+        self._dispatch("swap_result")
+
+    def _play_move(self, player: str, a: Tuple[int, int], b: Tuple[int, int]):
+        # в шахматах ход считает сервер, в игре на время и в одиночной — сам игрок
+        rng = random.Random(self.next_seed) if self.mode == "chess" and self.next_seed is not None else None
+        events = self.game.move(player, a, b, rng)
+        if not events:
+            return
+        if self.mode == "chess":
+            self.next_seed = random.getrandbits(32)
+        self._publish(events)
+
+    @_in_actor
+    def handle_command(self, data, sender: str | None = None):
         if data["command"] == "start_game":
             self.handle_start_game(data)
             return True
-        elif data["command"] == "swap":
-            self.handle_swap(data)
-        elif data["command"] == "auto_swap":
-            self.handle_auto_swap(data)
+        elif data["command"] == "snapshot":
+            self.handle_snapshot(data)
+            return True
+        elif data["command"] == "resync":
+            self.handle_resync(data)
+        elif data["command"] == "move":
+            self.handle_move(data, sender)
+        elif data["command"] == "swap_result":
+            self.handle_swap_result(data)
         elif data["command"] == "end_game":
-            self.end_game(data)
+            # итог игры объявляет только сервер
+            if self.is_client:
+                self.end_game(data)
         elif data["command"] == "score":
             self.handle_score(data)
         elif data["command"] == "board":
             self.handle_board(data)
-        elif data["command"] == "time":
-            self.handle_time(data)
+        elif data["command"] == "clock":
+            self.handle_clock(data)
         elif data["command"] == "finish":
             self.handle_finish(data)
-        elif data["command"] == "auto_swap_circle":
-            self.handle_auto_swap_circle(data)
-        elif data["command"] == "end_game":
-            self.end_game(data)
 
     def handle_start_game(self, data):
-        self.queue = data.get("queue_players")
-        self.current = data.get("current_player")
-        self.is_my_step = self.my_nickname == self.current
-        self.board = Board()
         self.time = data.get("time_limit")
-        self.board.board_from_matrix(data.get("board"))
-        self.nicknames = data.get("nicknames")
-        self.mode = data.get("mode")
-
-    def handle_auto_swap(self, data):
-        self.fallen = [
-            (f["old_r"], f["old_c"], f["new_r"], f["new_c"])
-            for f in data["fallen"]
-        ]
-        self.spawned = [
-            Element(d["x"], d["y"], Color(d["color"]), Bonus[d["bonus"]])
-            for d in data["spawned"]
-        ]
-        self.is_my_step = self.my_nickname == self.current
-        if self.mode == "time":
-            self.is_my_step = True
-        self.new_board = data.get("board")
-        self.current = data.get("next_player")
-        self._dispatch("auto_swap")
-
-    def handle_auto_swap_circle(self, data):
-        self.fallen = [
-            (f["old_r"], f["old_c"], f["new_r"], f["new_c"])
-            for f in data["fallen"]
-        ]
-        self.spawned = [
-            Element(d["x"], d["y"], Color(d["color"]), Bonus[d["bonus"]])
-            for d in data["spawned"]
-        ]
-        self.new_board = data.get("board")
-        self.bonuses = data.get("bonuses")
-        self.is_my_step = self.my_nickname == self.current
+        self.game = GameState(data.get("mode"), me=self.my_nickname, judge=not self.is_client)
+        self.game.log = self.log
+        board = Board.from_matrix(data.get("board"))
+        self.game.start(data.get("nicknames"), data.get("queue_players"), board, data.get("current_player"))
+        self.next_seed = data.get("next_seed")
+        self._prediction = None
         if self.mode == "time":
-            self.is_my_step = True
-        self._dispatch("auto_swap")
-
-    def handle_swap(self, data):
-        self.a_row = data.get("a_row")
-        self.a_col = data.get("a_col")
-        self.b_row = data.get("b_row")
-        self.b_col = data.get("b_col")
-        self.current = data.get("next_player")
-        self.is_my_step = self.my_nickname == self.current
-        if self.mode == "time":
-            self.is_my_step = True
+            self.clock = GameClock(self.time)
+            self.clock.start(data.get("elapsed", 0.0) + self._clock_latency())
+
+    def snapshot(self) -> dict:
+        boards = {nick: board.to_matrix() for nick, board in self.player_boards.items()}
+        if self.mode == "time" and self.board is not None and self.my_nickname:
+            boards[self.my_nickname] = self.board.to_matrix()
+        return proto.snapshot(
+            mode=self.mode,
+            queue=self.queue,
+            current=self.current,
+            nicknames=self.nicknames,
+            board=self.board.to_matrix(),
+            time_limit=self.time,
+            scores=dict(self.scores),
+            boards=boards,
+            elapsed=round(self.clock.elapsed(), 3) if self.clock else 0.0,
+            finished=dict(self.finished),
+            next_seed=self.next_seed
+        )
 
-        self.removed = data.get("removed")
-        self.bonuses = data.get("bonuses")
-        self.success = data.get("success")
-        self.new_board = data.get("board")
-        self.swap_occurred = True
-        self._dispatch("swap")
+    def handle_snapshot(self, data, keep: GameState | None = None):
+        self.handle_start_game(data)
+        self.game.restore(data.get("scores"), data.get("finished", {}), data.get("boards"), keep)
+
+    def handle_resync(self, data):
+        # состояние после переподключения; окно игры остаётся прежним.
+        # Своё поле в режиме на время живёт у клиента, от сервера берём только соперников
+        self.handle_snapshot(data, keep=self.game)
+        if self.mode != "time":
+            self.move_result = MoveResult(player="", a=None, b=None, success=False, steps=[],
+                                          board=data.get("board"), next_player=self.current,
+                                          scores=dict(self.scores))
+        self._dispatch("resync")
+
+    def handle_move(self, data, sender: str | None):
+        if self.is_client or sender is None:
+            return
+        if self.mode != "chess":
+            logger.warning(f"Ход {sender} отклонён: режим {self.mode}")
+            return
+        self._play_move(sender,
+                        (data.get("a_row"), data.get("a_col")),
+                        (data.get("b_row"), data.get("b_col")))
+
+    def handle_swap_result(self, data):
+        a = (data.get("a_row"), data.get("a_col"))
+        b = (data.get("b_row"), data.get("b_col"))
+        prediction, self._prediction = self._prediction, None
+        self.next_seed = data.get("next_seed")
+        if prediction is not None:
+            if (data.get("player") == prediction.player and (a, b) == (prediction.a, prediction.b)
+                    and data.get("checksum") == prediction.checksum):
+                # предсказание совпало: ход уже показан, переигрывать нечего
+                self.game.sync(data.get("next_player"), data.get("scores"))
+                return
+            logger.warning("Предсказанный ход разошёлся с сервером — откатываемся к его доске.")
+            self.game.sync(data.get("next_player"), data.get("scores"), data.get("board"))
+            self.move_result = MoveResult(player="", a=None, b=None, success=False, steps=[],
+                                          board=data.get("board"), next_player=self.current,
+                                          scores=dict(self.scores))
+            self._dispatch("rollback")
+            return
+        self.game.sync(data.get("next_player"), data.get("scores"), data.get("board"))
+        self.move_result = MoveResult(
+            player=data.get("player"),
+            a=a,
+            b=b,
+            success=data.get("success"),
+            steps=[proto.dict_to_step(step) for step in data.get("steps")],
+            board=data.get("board"),
+            next_player=self.current,
+            scores=dict(self.scores),
+            checksum=data.get("checksum", 0),
+        )
+        self._dispatch("swap_result")
 
     def end_game(self, data):
-        self.winner_player = data.get("winner")
-        self.winner_score = data.get("score")
+        self.game.end(data.get("winner"), data.get("score"))
+        self._game_over()
+
+    def _game_over(self):
+        if self.clock:
+            self.clock.stop()
+        if not self.is_client:
+            if self.result_ready:
+                self.result_ready(MatchRecord(
+                    mode=self.mode,
+                    time_limit=self.time,
+                    duration=self.clock.elapsed() if self.clock else _time.monotonic() - self._started_at,
+                    winner=self.winner_player,
+                    scores={nick: self.game.final_score(nick) for nick in self.nicknames},
+                    moves=dict(self.moves),
+                ))
+            if self._send:
+                self._send(proto.dumps(proto.end_game(winner=self.winner_player, score_=self.winner_score)))
         self._dispatch("end_game")
 
-    def _compute_and_end_game(self):
-        if self.opp_score > self.my_score:
-            winner, winning_score = self.opponent_nickname, self.opp_score
-        else:
-            winner, winning_score = self.my_nickname, self.my_score
+    def _time_up(self):
+        # дедлайн сервера: кто не финишировал, финиширует с текущим счётом
+        if self.winner_player is not None:
+            return
+        logger.info("Время игры вышло.")
+        events = self.game.time_up()
         if self._send:
-            self._send(proto.dumps(proto.end_game(winner=winner, score_=winning_score)))
-        self.end_game(proto.end_game(winner=winner, score_=winning_score))
+            self._send(proto.dumps(proto.clock(elapsed=self.time, limit=self.time)))
+        self._dispatch("clock")
+        self._publish(events)
+
+    def handle_clock(self, data):
+        if self.clock is None:
+            return
+        self.clock.sync(data.get("elapsed") + self._clock_latency())
+        if self.clock.expired:
+            self.clock.stop()
+        self._dispatch("clock")
 
     def close_game(self):
+        if self.clock:
+            self.clock.stop()
         if self._close_net:
             self._close_net()
+        self.stop()
 
+    @_in_actor
     def handle_error(self, nickname: str | None = None):
         self.exit_nickname = nickname
+        if self.clock:
+            self.clock.stop()
         self._dispatch("error")
 
-    def update_board(self):
-        if self.swap_occurred:
-            self.swap_occurred = False
-            self.board.board_from_matrix(self.new_board)
-
-    def time_update(self, time: int):
-        if self._send:
-            self._send(proto.dumps(proto.time(time_=time)))
-
-    def handle_time(self, data):
-        self.opp_time = data.get("time")
-        self._dispatch("time")
-
-    def score_update(self, score: int):
-        print("update score")
-        if self._send:
-            self._send(proto.dumps(proto.score(score_=score)))
-
     def handle_score(self, data):
-        self.opp_score = data.get("score")
-        self._dispatch("score")
-
-    def board_update_for_opp(self):
-        if self._send:
-            self._send(proto.dumps(proto.board(board_=self.board.to_matrix())))
+        if data.get("player") == self.my_nickname:
+            # свой же кадр, пересланный сервером в истории
+            return
+        self._publish(self.game.set_score(data.get("player"), data.get("score")), local=False)
 
     def handle_board(self, data):
-        self.opp_board = Board()
-        self.opp_board.board_from_matrix(data.get("board"))
+        if data.get("player") == self.my_nickname:
+            return
+        self.game.set_board(data.get("player"), data.get("board"), data.get("moves"))
         self._dispatch("board")
 
-    @property
-    def opponent_nickname(self) -> str | None:
-        for nick in self.nicknames:
-            if nick != self.my_nickname:
-                return nick
-        return None
-
-    def finish(self, score: int):
-        self.my_score = score
-        if self.is_opp_finish:
-            self._compute_and_end_game()
-        else:
-            if self._send:
-                self._send(proto.dumps(proto.finish(score_=score)))
-
     def handle_finish(self, data):
-        self.is_opp_finish = True
-        self.opp_score = data.get("score")
+        self._publish(self.game.finish(data.get("player"), data.get("score")), local=False)
@@ -0,0 +1,256 @@
+import argparse
+import bisect
+import json
+import struct
+import threading
+from collections import Counter
+from typing import BinaryIO, Iterable, List, Tuple
+
+from core import protocol as proto
+from core.board import Board
+from core.enums import GamePhase, LogKind
+from core.game_state import GameState
+
+# версия 2: START хранит, чья доска — state.board (me)
+MAGIC = b"TIRLOG2\n"
+
+# тип события, длина данных
+_HEADER = struct.Struct("<BI")
+_UINT = struct.Struct("<I")
+_BOARD_SIZE = Board.ROWS * Board.COLS
+
+LogEntry = Tuple[LogKind, tuple]
+
+
+def pack_state(state: GameState) -> bytes:
+    header = json.dumps({
+        "mode": state.mode,
+        "me": state.me,
+        "judge": state.judge,
+        "phase": state.phase.name,
+        "nicknames": state.nicknames,
+        "queue": state.queue,
+        "current": state.current,
+        "scores": state.scores,
+        "moves": state.moves,
+        "finished": state.finished,
+        "winner": state.winner,
+        "winner_score": state.winner_score,
+        "board": state.board is not None,
+        "boards": list(state.boards),
+    }, separators=(",", ":")).encode()
+    parts = [_UINT.pack(len(header)), header]
+    if state.board is not None:
+        parts.append(state.board.pack())
+    parts.extend(board.pack() for board in state.boards.values())
+    return b"".join(parts)
+
+
+def unpack_state(data: bytes) -> GameState:
+    (size,) = _UINT.unpack_from(data)
+    h = json.loads(data[_UINT.size:_UINT.size + size])
+    pos = _UINT.size + size
+    state = GameState(h["mode"], me=h["me"], judge=h["judge"])
+    state.phase = GamePhase[h["phase"]]
+    state.nicknames = h["nicknames"]
+    state.queue = h["queue"]
+    state.current = h["current"]
+    state.scores = h["scores"]
+    state.moves = h["moves"]
+    state.finished = h["finished"]
+    state.winner = h["winner"]
+    state.winner_score = h["winner_score"]
+    if h["board"]:
+        state.board = Board.unpack(data[pos:pos + _BOARD_SIZE])
+        pos += _BOARD_SIZE
+    for nick in h["boards"]:
+        state.boards[nick] = Board.unpack(data[pos:pos + _BOARD_SIZE])
+        pos += _BOARD_SIZE
+    return state
+
+
+def apply_event(state: GameState, kind: LogKind, data: tuple):
+    # повторяет событие без случайности: ход не разыгрывается заново, а применяется его запись
+    if kind == LogKind.START:
+        mode, me, nicknames, queue, current, board = data
+        state.mode = mode
+        # без me игра на время раскладывала бы ходы владельца журнала не на ту доску
+        state.me = me
+        state.start(nicknames, queue, Board.unpack(board), current)
+    elif kind == LogKind.SWAP:
+        player, a, b, success, current = data
+        if success:
+            state.board_of(player).swap_cells(a, b)
+            state.moves[player] = state.moves.get(player, 0) + 1
+        state.current = current
+    elif kind == LogKind.STEP:
+        player, step = data
+        state.board_of(player).apply_step(step)
+    elif kind == LogKind.SCORE:
+        player, score = data
+        state.scores[player] = score
+    elif kind == LogKind.FINISH:
+        player, score = data
+        state.finished[player] = score
+        state.scores[player] = score
+    elif kind == LogKind.BOARD:
+        player, board, moves = data
+        if player is None:
+            state.board = Board.unpack(board)
+        else:
+            state.boards[player] = Board.unpack(board)
+        if moves is not None:
+            state.moves[player] = moves
+    elif kind == LogKind.SYNC:
+        state.current, scores = data
+        state.scores = dict(scores)
+    elif kind == LogKind.STATE:
+        state.__dict__.update(unpack_state(data[0]).__dict__)
+    elif kind == LogKind.TIME_UP:
+        for nick in state.nicknames:
+            state.finished.setdefault(nick, state.scores.get(nick, 0))
+    elif kind == LogKind.END:
+        state.phase = GamePhase.OVER
+        state.winner, state.winner_score = data
+
+
+def _encode(kind: LogKind, data: tuple) -> bytes:
+    if kind == LogKind.START:
+        payload = [*data[:5], data[5].hex()]
+    elif kind == LogKind.STEP:
+        payload = [data[0], proto.step_to_dict(data[1])]
+    elif kind == LogKind.BOARD:
+        payload = [data[0], data[1].hex(), data[2]]
+    elif kind == LogKind.STATE:
+        payload = [data[0].hex()]
+    else:
+        payload = list(data)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _decode(kind: LogKind, raw: bytes) -> tuple:
+    d = json.loads(raw)
+    if kind == LogKind.START:
+        return (*d[:5], bytes.fromhex(d[5]))
+    if kind == LogKind.SWAP:
+        return d[0], tuple(d[1]), tuple(d[2]), d[3], d[4]
+    if kind == LogKind.STEP:
+        return d[0], proto.dict_to_step(d[1])
+    if kind == LogKind.BOARD:
+        return d[0], bytes.fromhex(d[1]), d[2]
+    if kind == LogKind.STATE:
+        return (bytes.fromhex(d[0]),)
+    return tuple(d)
+
+
+class GameLog:
+    # журнал всех изменений GameState. Каждые SNAPSHOT_EVERY событий к нему добавляется
+    # упакованный снимок состояния, так что seek к любому событию восстанавливает
+    # ближайший снимок и применяет не больше K событий, а не всю игру с начала
+    SNAPSHOT_EVERY = 64
+
+    def __init__(self, path: str | None = None, snapshot_every: int = SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.events: List[LogEntry] = []
+        # (сколько событий уже применено, снимок)
+        self.snapshots: List[Tuple[int, bytes]] = []
+        self._snapshot_at: List[int] = []
+        self._lock = threading.Lock()
+        self._file: BinaryIO | None = None
+        if path:
+            self._file = open(path, "wb", buffering=1 << 16)
+            self._file.write(MAGIC)
+
+    def __len__(self):
+        return len(self.events)
+
+    def append(self, state: GameState, entries: Iterable[LogEntry]):
+        # вызывает GameState, когда состояние уже согласовано со всеми entries
+        with self._lock:
+            for kind, data in entries:
+                if kind == LogKind.STATE:
+                    data = (pack_state(state),)
+                self.events.append((kind, data))
+                if self._file is not None:
+                    self._write(kind, _encode(kind, data))
+            last = self._snapshot_at[-1] if self._snapshot_at else 0
+            if len(self.events) - last >= self.snapshot_every:
+                self._add_snapshot(len(self.events), pack_state(state))
+
+    def _add_snapshot(self, index: int, packed: bytes):
+        self.snapshots.append((index, packed))
+        self._snapshot_at.append(index)
+        self._write(LogKind.SNAPSHOT, _UINT.pack(index) + packed)
+
+    def _write(self, kind: LogKind, payload: bytes):
+        if self._file is not None and not self._file.closed:
+            self._file.write(_HEADER.pack(kind, len(payload)))
+            self._file.write(payload)
+
+    def seek(self, index: int) -> GameState:
+        # состояние после первых index событий
+        index = max(0, min(index, len(self.events)))
+        pos = bisect.bisect_right(self._snapshot_at, index) - 1
+        if pos >= 0:
+            start, packed = self.snapshots[pos]
+            state = unpack_state(packed)
+        else:
+            start, state = 0, GameState("")
+        for kind, data in self.events[start:index]:
+            apply_event(state, kind, data)
+        return state
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+
+    @classmethod
+    def load(cls, path: str) -> "GameLog":
+        log = cls()
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: не журнал игры")
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                kind, size = _HEADER.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size:
+                    # журнал оборвался на середине записи (например, процесс убили)
+                    break
+                kind = LogKind(kind)
+                if kind == LogKind.SNAPSHOT:
+                    (index,) = _UINT.unpack_from(payload)
+                    log.snapshots.append((index, payload[_UINT.size:]))
+                    log._snapshot_at.append(index)
+                else:
+                    log.events.append((kind, _decode(kind, payload)))
+        return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Журнал игры Three in row: перемотка и сводка")
+    parser.add_argument("path", help="файл журнала (.events)")
+    parser.add_argument("--at", type=int, help="показать состояние после стольких событий (по умолчанию — в конце)")
+    args = parser.parse_args()
+
+    log = GameLog.load(args.path)
+    counts = Counter(kind.name for kind, _ in log.events)
+    print(f"{len(log)} events, {len(log.snapshots)} snapshots: "
+          + ", ".join(f"{name} {n}" for name, n in counts.most_common()))
+    state = log.seek(len(log) if args.at is None else args.at)
+    print(f"mode {state.mode}, phase {state.phase.name}, current {state.current or '-'}")
+    for nick in state.nicknames:
+        finished = " (финишировал)" if nick in state.finished else ""
+        print(f"  {nick:<20}{state.scores.get(nick, 0):>5} очков {state.moves.get(nick, 0):>4} ходов{finished}")
+    if state.winner:
+        print(f"winner {state.winner} with {state.winner_score}")
+    if state.board is not None:
+        print(state.board)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from core.board import Board, CascadeStep
+from core.enums import GamePhase, LogKind
+from logger import logger
+
+
+@dataclass(frozen=True)
+class MoveResult:
+    player: str
+    a: Tuple[int, int]
+    b: Tuple[int, int]
+    success: bool
+    steps: List[CascadeStep]
+    board: List[List[str]]
+    next_player: str
+    scores: Dict[str, int]
+    checksum: int = 0
+    predicted: bool = False
+
+
+@dataclass(frozen=True)
+class GameEvent:
+    # kind совпадает с командой, которую контроллер передаёт GUI: swap_result, score, finish, end_game
+    kind: str
+    player: str | None = None
+    score: int = 0
+    move: MoveResult | None = None
+
+
+class GameState:
+    # правила игры без Qt, сети и часов: очередь ходов, доски, счёт и конец игры.
+    # Команды меняют состояние и возвращают события — разослать и показать их
+    # должен тот, кто владеет состоянием (GameController, бот, тест)
+    #
+    # chess — общая доска, ходы по очереди; по счёту игра не кончается — только выходом игрока;
+    # time  — у каждого своя доска, набравший FINISH_SCORE финиширует, игра кончается,
+    #         когда финишировали все (или вышло время — time_up);
+    # solo  — своя доска без конца игры
+    FINISH_SCORE = 999
+
+    def __init__(self, mode: str, me: str | None = None, judge: bool = True):
+        self.mode = mode
+        # me — чья доска в board в игре на время; None у сервера без хоста и у зрителя
+        self.me = me
+        # judge — эта сторона сама объявляет конец игры; клиент ждёт end_game от сервера
+        self.judge = judge
+        self.phase = GamePhase.WAITING
+        self.nicknames: List[str] = []
+        self.queue: List[str] = []
+        self.current = ""
+        self.board: Board | None = None
+        # доски остальных игроков в игре на время
+        self.boards: Dict[str, Board] = {}
+        self.scores: Dict[str, int] = {}
+        self.moves: Dict[str, int] = {}
+        self.finished: Dict[str, int] = {}
+        self.winner: str | None = None
+        self.winner_score: int | None = None
+        # журнал изменений (core.game_log.GameLog); None — не пишем
+        self.log = None
+
+    def _record(self, *entries):
+        if self.log is not None:
+            self.log.append(self, entries)
+
+    @property
+    def is_my_step(self) -> bool:
+        return self.me == self.current
+
+    def start(self, nicknames: List[str], queue: List[str] | None = None, board: Board | None = None,
+              current: str | None = None):
+        self.nicknames = list(nicknames)
+        if queue is None:
+            queue = self.nicknames[:]
+            random.shuffle(queue)
+        self.queue = list(queue)
+        self.current = current or self.queue[0]
+        self.board = board or Board()
+        self.boards = {}
+        if self.mode == "time":
+            # все начинают с одной и той же доски
+            self.boards = {nick: self.board.copy() for nick in self.queue if nick != self.me}
+        self.scores = {nick: 0 for nick in self.queue}
+        self.moves = {nick: 0 for nick in self.queue}
+        self.finished = {}
+        self.winner = self.winner_score = None
+        self.phase = GamePhase.PLAYING
+        self._record((LogKind.START, (self.mode, self.me, self.nicknames, self.queue, self.current,
+                                      self.board.pack())))
+
+    def restore(self, scores: Dict[str, int], finished: Dict[str, int], boards: Dict[str, List[List[str]]],
+                keep: GameState | None = None):
+        # состояние из снимка сервера поверх start; keep — прежнее состояние, из которого
+        # в игре на время остаются своя доска, счёт и ходы: их сервер знает хуже нас
+        log, self.log = self.log, None
+        self.scores = dict(scores)
+        self.finished = dict(finished)
+        for nick, matrix in boards.items():
+            if nick != self.me:
+                self.set_board(nick, matrix)
+        if keep is not None and self.mode == "time" and keep.board is not None and self.me in keep.scores:
+            self.board = keep.board
+            self.scores[self.me] = keep.scores[self.me]
+            self.moves[self.me] = keep.moves.get(self.me, 0)
+        self.log = log
+        self._record((LogKind.STATE, ()))
+
+    def board_of(self, player: str) -> Board:
+        if self.mode == "time" and player != self.me:
+            return self.boards[player]
+        return self.board
+
+    def final_score(self, player: str) -> int:
+        return self.finished.get(player, self.scores.get(player, 0))
+
+    def _next_player(self) -> str:
+        idx = (self.queue.index(self.current) + 1) % len(self.queue)
+        return self.queue[idx]
+
+    def move(self, player: str, a: Tuple[int, int], b: Tuple[int, int],
+             rng: random.Random | None = None) -> List[GameEvent]:
+        if self.phase != GamePhase.PLAYING or player in self.finished:
+            logger.warning(f"Ход {player} отклонён: игра для него не идёт")
+            return []
+        (r1, c1), (r2, c2) = a, b
+        if not (0 <= r1 < Board.ROWS and 0 <= c1 < Board.COLS
+                and 0 <= r2 < Board.ROWS and 0 <= c2 < Board.COLS
+                and abs(r1 - r2) + abs(c1 - c2) == 1):
+            logger.warning(f"Ход {player} отклонён: некорректные координаты {a} {b}")
+            return []
+        if self.mode == "chess" and player != self.current:
+            logger.warning(f"Ход {player} отклонён: сейчас ходит {self.current}")
+            return []
+
+        board = self.board_of(player)
+        success, steps = board.resolve_swap(a, b, rng)
+        if success:
+            self.moves[player] = self.moves.get(player, 0) + 1
+        if steps:
+            # очки дают только фишки, снятые самим ходом, каскады не считаются
+            self.scores[player] = self.scores.get(player, 0) + len(steps[0].removed)
+        if self.mode == "chess":
+            self.current = self._next_player()
+        self._record((LogKind.SWAP, (player, a, b, success, self.current)),
+                     *((LogKind.STEP, (player, step)) for step in steps),
+                     *([(LogKind.SCORE, (player, self.scores[player]))] if steps else []))
+        result = MoveResult(player=player, a=a, b=b, success=success, steps=steps,
+                            board=board.to_matrix(), next_player=self.current,
+                            scores=dict(self.scores), checksum=board.checksum())
+        events = [GameEvent("swap_result", player, move=result)]
+        if not steps:
+            return events
+        score = self.scores[player]
+        events.append(GameEvent("score", player, score))
+        if score > self.FINISH_SCORE and self.mode == "time":
+            events += self.finish(player, score)
+        return events
+
+    def sync(self, current: str, scores: Dict[str, int], board: List[List[str]] | None = None):
+        # итог хода, посчитанный сервером; доска не нужна, если ход уже разыгран так же
+        if board is not None:
+            self.board.board_from_matrix(board)
+        self.current = current
+        self.scores = dict(scores)
+        self._record(*([(LogKind.BOARD, (None, self.board.pack(), None))] if board is not None else []),
+                     (LogKind.SYNC, (current, self.scores)))
+
+    def set_board(self, player: str, matrix: List[List[str]], moves: int | None = None):
+        board = self.boards.get(player)
+        if board is None:
+            board = self.boards[player] = Board.from_matrix(matrix)
+        else:
+            board.board_from_matrix(matrix)
+        if moves is not None:
+            self.moves[player] = moves
+        self._record((LogKind.BOARD, (player, board.pack(), moves)))
+
+    def set_score(self, player: str, score: int) -> List[GameEvent]:
+        self.scores[player] = score
+        self._record((LogKind.SCORE, (player, score)))
+        return [GameEvent("score", player, score)]
+
+    def finish(self, player: str, score: int) -> List[GameEvent]:
+        if player in self.finished:
+            return []
+        self.finished[player] = score
+        self.scores[player] = score
+        self._record((LogKind.FINISH, (player, score)))
+        events = [GameEvent("finish", player, score)]
+        if self.judge and all(nick in self.finished for nick in self.nicknames):
+            events += self._end()
+        return events
+
+    def time_up(self) -> List[GameEvent]:
+        # кто не финишировал, финиширует с текущим счётом
+        for nick in self.nicknames:
+            self.finished.setdefault(nick, self.scores.get(nick, 0))
+        self._record((LogKind.TIME_UP, ()))
+        return self._end() if self.judge else []
+
+    def _end(self) -> List[GameEvent]:
+        if self.phase == GamePhase.OVER:
+            return []
+        # при равенстве побеждает первый в списке — хост
+        winner = max(self.nicknames, key=self.final_score)
+        return self.end(winner, self.final_score(winner))
+
+    def end(self, winner: str, score: int) -> List[GameEvent]:
+        self.phase = GamePhase.OVER
+        self.winner = winner
+        self.winner_score = score
+        self._record((LogKind.END, (winner, score)))
+        return [GameEvent("end_game", winner, score)]
+
+
+def play_headless(mode: str, nicknames: List[str], seed: int | None = None,
+                  max_moves: int = 1000) -> GameState:
+    # партия ботов, которые делают первый найденный ход; без окна и сети, с полной скоростью.
+    # Шахматы по счёту не кончаются: такая партия обрывается после max_moves ходов
+    rng = random.Random(seed)
+    state = GameState(mode)
+    state.start(nicknames, board=Board())
+    for _ in range(max_moves):
+        if state.phase == GamePhase.OVER:
+            break
+        if mode == "chess":
+            player = state.current
+        else:
+            player = rng.choice([nick for nick in nicknames if nick not in state.finished])
+        state.move(player, *state.board_of(player).find_move(), rng)
+    return state
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Безголовые партии ботов Three in row")
+    parser.add_argument("--mode", choices=("time", "chess"), default="chess")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    nicknames = [f"bot{i + 1}" for i in range(args.players)]
+    random.seed(args.seed)
+    started = time.perf_counter()
+    moves = 0
+    wins: Dict[str, int] = {nick: 0 for nick in nicknames}
+    for i in range(args.games):
+        state = play_headless(args.mode, nicknames, None if args.seed is None else args.seed + i)
+        moves += sum(state.moves.values())
+        if state.winner:
+            wins[state.winner] += 1
+    elapsed = time.perf_counter() - started
+    print(f"{args.games} games, {moves} moves in {elapsed:.2f} s ({moves / elapsed:.0f} moves/s)")
+    print("wins:", wins)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import socket
+import threading
+import time
+from dataclasses import dataclass
+
+from core.network_utils import (ANNOUNCE_INTERVAL, DISCOVERY_PORT, LOBBY_PORT, PROBE,
+                                broadcast_addresses, decode_announce)
+from logger import logger
+
+# сессия пропадает из списка, если о ней не слышно столько секунд
+SESSION_TTL = 3 * ANNOUNCE_INTERVAL
+
+
+@dataclass
+class SessionInfo:
+    code: str
+    ip: str
+    port: int
+    host_nick: str
+    mode: str
+    players: int
+    max_players: int
+    time_limit: int
+    started: bool
+    seen: float
+
+
+class SessionDirectory:
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._sessions: dict[tuple[str, int], SessionInfo] = {}
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            self._sock.bind(("", LOBBY_PORT))
+        except OSError as e:
+            # объявлений не услышим, но ответы на наши запросы всё равно придут
+            logger.error(f"Не удалось открыть порт списка игр {LOBBY_PORT}: {e}")
+            self._sock.bind(("", 0))
+        threading.Thread(target=self._listen, daemon=True).start()
+        self.probe()
+
+    def probe(self):
+        # серверы отвечают сразу — список заполняется, не дожидаясь их рассылки
+        for addr in broadcast_addresses():
+            try:
+                self._sock.sendto(PROBE, (addr, DISCOVERY_PORT))
+            except OSError as e:
+                logger.warning(f"Не удалось отправить запрос поиска на {addr}: {e}")
+
+    def _listen(self):
+        while True:
+            try:
+                data, (ip, _) = self._sock.recvfrom(1024)
+            except OSError:
+                break
+            info = decode_announce(data)
+            if not info:
+                continue
+            try:
+                self._update(ip, info)
+            except (ValueError, TypeError):
+                # кривой пакет из сети не должен останавливать поток — список бы замёрз
+                logger.warning(f"Некорректное объявление от {ip}: {info}")
+
+    def _update(self, ip: str, info: dict):
+        key = (ip, int(info["port"]))
+        with self._lock:
+            if info.get("closed"):
+                self._sessions.pop(key, None)
+                return
+            self._sessions[key] = SessionInfo(
+                code=str(info["code"]),
+                ip=ip,
+                port=int(info["port"]),
+                host_nick=info.get("host_nick") or "",
+                mode=info.get("mode") or "",
+                players=int(info.get("players", 1)),
+                max_players=int(info.get("max_players", 2)),
+                time_limit=int(info.get("time_limit", 0)),
+                started=bool(info.get("started")),
+                seen=time.monotonic(),
+            )
+
+    def sessions(self) -> list[SessionInfo]:
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, s in self._sessions.items() if now - s.seen > SESSION_TTL]:
+                del self._sessions[key]
+            return sorted(self._sessions.values(), key=lambda s: (s.started, s.host_nick))
+
+    def find(self, code: str) -> SessionInfo | None:
+        for session in self.sessions():
+            if session.code == code:
+                return session
+        return None
@@ -0,0 +1,196 @@
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+from logger import logger
+
+# файл базы результатов; по умолчанию рядом с app.log
+DB_PATH = os.environ.get("THREE_IN_ROW_DB", "matches.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    time_limit INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    moves INTEGER NOT NULL,
+    winner TEXT
+);
+CREATE TABLE IF NOT EXISTS match_players (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    nickname TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (match_id, nickname)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_match_players_nickname ON match_players(nickname, finished_at DESC);
+CREATE INDEX IF NOT EXISTS idx_match_players_top ON match_players(mode, score DESC);
+-- сводка по игроку обновляется при записи, чтобы таблица лидеров не пересчитывала миллионы строк
+CREATE TABLE IF NOT EXISTS players (
+    nickname TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    best_score INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_players_wins ON players(wins DESC, best_score DESC);
+"""
+
+
+@dataclass
+class MatchRecord:
+    mode: str
+    time_limit: int
+    duration: float
+    winner: str | None
+    scores: Dict[str, int]
+    moves: Dict[str, int] = field(default_factory=dict)
+    finished_at: float = field(default_factory=time.time)
+
+
+class MatchStore:
+    _instance = None
+    # сколько результатов пишем одной транзакцией
+    BATCH_SIZE = 256
+    # сколько ждём следующих результатов, прежде чем записать неполную пачку, с
+    BATCH_DELAY = 0.5
+
+    @classmethod
+    def instance(cls):
+        if not cls._instance:
+            cls._instance = cls(DB_PATH)
+        return cls._instance
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._local = threading.local()
+        db = self._connect()
+        db.executescript(_SCHEMA)
+        db.commit()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL: чтения таблицы лидеров не ждут записи
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def record(self, result: MatchRecord):
+        # вызывается из игрового потока — только кладём в очередь
+        self._queue.put(result)
+
+    def _write_loop(self):
+        db = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.BATCH_DELAY
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+            results = [r for r in batch if r is not None]
+            try:
+                if results:
+                    self._write(db, results)
+            except sqlite3.Error as e:
+                logger.error(f"Не удалось сохранить результаты игр: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        db.close()
+
+    @staticmethod
+    def _write(db: sqlite3.Connection, results: list[MatchRecord]):
+        with db:
+            players, summary = [], []
+            for r in results:
+                match_id = db.execute(
+                    "INSERT INTO matches (finished_at, mode, time_limit, duration, moves, winner) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (r.finished_at, r.mode, r.time_limit, r.duration, sum(r.moves.values()), r.winner),
+                ).lastrowid
+                for nick, score in r.scores.items():
+                    won = int(nick == r.winner)
+                    players.append((match_id, nick, r.mode, score, r.moves.get(nick, 0), won, r.finished_at))
+                    summary.append((nick, won, score))
+            db.executemany("INSERT INTO match_players VALUES (?, ?, ?, ?, ?, ?, ?)", players)
+            db.executemany(
+                "INSERT INTO players VALUES (?, 1, ?, ?) ON CONFLICT(nickname) DO UPDATE SET "
+                "games = games + 1, wins = wins + excluded.wins, "
+                "best_score = max(best_score, excluded.best_score)",
+                summary,
+            )
+
+    def flush(self):
+        # дождаться, пока всё поставленное в очередь окажется в базе
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+    def _query(self, sql: str, args=()) -> list[tuple]:
+        # у каждого читающего потока своё соединение
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db.execute(sql, args).fetchall()
+
+    def top_players(self, limit: int = 10) -> list[tuple[str, int, int, int]]:
+        return self._query("SELECT nickname, wins, games, best_score FROM players "
+                           "ORDER BY wins DESC, best_score DESC LIMIT ?", (limit,))
+
+    def top_scores(self, mode: str, limit: int = 10) -> list[tuple[str, int, float]]:
+        return self._query("SELECT nickname, score, finished_at FROM match_players "
+                           "WHERE mode = ? ORDER BY score DESC LIMIT ?", (mode, limit))
+
+    def player_stats(self, nickname: str) -> tuple[int, int, int] | None:
+        rows = self._query("SELECT games, wins, best_score FROM players WHERE nickname = ?", (nickname,))
+        return rows[0] if rows else None
+
+    def history(self, nickname: str, limit: int = 20) -> list[tuple]:
+        return self._query(
+            "SELECT m.finished_at, m.mode, p.score, p.won, m.duration, p.moves, m.winner "
+            "FROM match_players p JOIN matches m ON m.id = p.match_id "
+            "WHERE p.nickname = ? ORDER BY p.finished_at DESC LIMIT ?", (nickname, limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Таблица лидеров и история игр Three in row")
+    parser.add_argument("--db", default=DB_PATH, help="файл базы результатов")
+    parser.add_argument("--player", help="история и статистика игрока")
+    parser.add_argument("--mode", choices=("time", "chess"), help="лучшие счета в режиме")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    store = MatchStore(args.db)
+    if args.player:
+        print(args.player, "игр/побед/рекорд:", store.player_stats(args.player))
+        for finished_at, mode, score, won, duration, moves, winner in store.history(args.player, args.limit):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(finished_at))}  {mode:<5} "
+                  f"{score:>5}  {'победа' if won else 'поражение':<9} {duration:>6.0f} с  {moves:>4} ходов")
+    elif args.mode:
+        for nick, score, _ in store.top_scores(args.mode, args.limit):
+            print(f"{nick:<20}{score:>6}")
+    else:
+        for nick, wins, games, best in store.top_players(args.limit):
+            print(f"{nick:<20}{wins:>5} побед {games:>5} игр  рекорд {best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import argparse
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Hashable
+
+from core import protocol as proto
+from core.network_utils import DISCOVERY_PORT, MATCH_CODE, MATCH_PORT, PROBE, encode_announce
+from core.session import Session
+from logger import logger
+
+MODES = ("time", "chess")
+# лимит времени, с которым сервер играет в шахматы (как в CreateGameWindow)
+CHESS_TIME = 999
+
+
+@dataclass
+class MatchTicket:
+    nickname: str
+    mode: str
+    time_limit: int
+    enqueued: float = field(default_factory=time.monotonic)
+    sock: socket.socket | None = field(default=None, repr=False)
+    cancelled: bool = False
+    matched: bool = False
+
+
+class FifoPolicy:
+    # игроков с одинаковым режимом и лимитом сводим в порядке очереди
+    players = 2
+
+    def bucket(self, ticket: MatchTicket) -> Hashable:
+        return ticket.mode, ticket.time_limit if ticket.mode == "time" else 0
+
+    def priority(self, ticket: MatchTicket):
+        return ticket.enqueued
+
+    def settings(self, tickets: list[MatchTicket]) -> tuple[str, int]:
+        first = tickets[0]
+        return first.mode, first.time_limit if first.mode == "time" else CHESS_TIME
+
+
+class AnyLimitPolicy(FifoPolicy):
+    # лимит времени не важен: сводим по режиму и играем по меньшему из лимитов
+    def bucket(self, ticket: MatchTicket) -> Hashable:
+        return ticket.mode
+
+    def settings(self, tickets: list[MatchTicket]) -> tuple[str, int]:
+        mode = tickets[0].mode
+        return mode, min(t.time_limit for t in tickets) if mode == "time" else CHESS_TIME
+
+
+class MatchQueue:
+    # отдельная куча на каждую корзину политики: постановка и подбор — O(log n),
+    # отмена — ленивая, запись выбрасывается, когда дойдёт до вершины кучи
+    def __init__(self, policy: FifoPolicy | None = None):
+        self.policy = policy or FifoPolicy()
+        self._heaps: dict[Hashable, list] = defaultdict(list)
+        self._live: dict[Hashable, int] = defaultdict(int)
+        self._order = itertools.count()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, ticket: MatchTicket) -> list[MatchTicket] | None:
+        bucket = self.policy.bucket(ticket)
+        heapq.heappush(self._heaps[bucket], (self.policy.priority(ticket), next(self._order), ticket))
+        self._live[bucket] += 1
+        self._size += 1
+        if self._live[bucket] < self.policy.players:
+            return None
+        return self._pop(bucket)
+
+    def cancel(self, ticket: MatchTicket):
+        if ticket.cancelled or ticket.matched:
+            return
+        ticket.cancelled = True
+        bucket = self.policy.bucket(ticket)
+        self._live[bucket] -= 1
+        self._size -= 1
+        heap = self._heaps[bucket]
+        if len(heap) > 2 * self._live[bucket] + 64:
+            # отменённых накопилось больше живых — пересобираем кучу
+            heap[:] = [entry for entry in heap if not entry[2].cancelled]
+            heapq.heapify(heap)
+
+    def _pop(self, bucket: Hashable) -> list[MatchTicket]:
+        heap = self._heaps[bucket]
+        match = []
+        while len(match) < self.policy.players:
+            ticket = heapq.heappop(heap)[2]
+            if not ticket.cancelled:
+                ticket.matched = True
+                match.append(ticket)
+        self._live[bucket] -= len(match)
+        self._size -= len(match)
+        if not self._live[bucket]:
+            del self._heaps[bucket], self._live[bucket]
+        return match
+
+
+class MatchServer:
+    # сколько подобранные игроки могут добираться до своей сессии
+    SESSION_JOIN_TIMEOUT = 30.0
+
+    def __init__(self, port: int = MATCH_PORT, policy: FifoPolicy | None = None):
+        self.queue = MatchQueue(policy)
+        self.sessions: dict[Session, float] = {}
+        self._tickets: dict[socket.socket, MatchTicket] = {}
+        self._buffers: dict[socket.socket, bytes] = {}
+        self._nicknames: set[str] = set()
+        self._stopped = threading.Event()
+
+        # тысячи ожидающих держим в одном потоке на selectors, а не по потоку на игрока
+        self._selector = selectors.DefaultSelector()
+        self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listen_socket.bind(("", port))
+        self.listen_socket.listen(1024)
+        self.listen_socket.setblocking(False)
+        self.port = self.listen_socket.getsockname()[1]
+        self._selector.register(self.listen_socket, selectors.EVENT_READ, self._accept)
+        logger.info(f"Сервер подбора соперников запущен на порту {self.port}")
+
+        threading.Thread(target=self.answer_probes, daemon=True).start()
+        threading.Thread(target=self._reap_loop, daemon=True).start()
+
+    def serve_forever(self):
+        while not self._stopped.is_set():
+            for key, _ in self._selector.select(timeout=0.5):
+                key.data(key.fileobj)
+
+    def _accept(self, listen_socket: socket.socket):
+        try:
+            sock, _ = listen_socket.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        self._buffers[sock] = b""
+        self._selector.register(sock, selectors.EVENT_READ, self._read)
+
+    def _read(self, sock: socket.socket):
+        try:
+            data = sock.recv(1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # игрок ушёл из очереди
+            self._drop(sock)
+            return
+        if sock in self._tickets:
+            return
+        self._buffers[sock] += data
+        if b"\n" not in self._buffers[sock]:
+            if len(self._buffers[sock]) > 1024:
+                self._drop(sock)
+            return
+        line = self._buffers.pop(sock).split(b"\n", 1)[0].decode("utf-8", "replace")
+        version, line = proto.parse_hello(line)
+        if version != proto.PROTOCOL_VERSION:
+            self._reply(sock, f"{proto.UNSUPPORTED_VERSION}\n".encode("utf-8"))
+            self._drop(sock)
+            return
+        ticket = self._parse(line)
+        if ticket is None:
+            self._reply(sock, b"INVALID_REQUEST\n")
+            self._drop(sock)
+            return
+        if ticket.nickname in self._nicknames:
+            self._reply(sock, b"INVALID_NICKNAME\n")
+            self._drop(sock)
+            return
+        ticket.sock = sock
+        self._tickets[sock] = ticket
+        self._nicknames.add(ticket.nickname)
+        self._reply(sock, b"QUEUED\n")
+        logger.info(f"{ticket.nickname} в очереди: {ticket.mode} {ticket.time_limit} с, ждут {len(self.queue) + 1}")
+        match = self.queue.push(ticket)
+        if match:
+            self._start_session(match)
+
+    @staticmethod
+    def _parse(line: str) -> MatchTicket | None:
+        if not line.startswith(proto.QUEUE_PREFIX):
+            return None
+        mode, _, rest = line[len(proto.QUEUE_PREFIX):].partition(":")
+        time_limit, _, nickname = rest.partition(":")
+        if mode not in MODES or not time_limit.isdigit() or not nickname:
+            return None
+        if mode == "time" and not 20 <= int(time_limit) <= 999:
+            return None
+        return MatchTicket(nickname=nickname, mode=mode, time_limit=int(time_limit))
+
+    def _start_session(self, match: list[MatchTicket]):
+        mode, time_limit = self.queue.policy.settings(match)
+        nicknames = [t.nickname for t in match]
+        try:
+            session = Session(mode=mode, time=time_limit, port=0, players=nicknames)
+        except OSError as e:
+            logger.error(f"Не удалось создать сессию для {nicknames}: {e}")
+            for ticket in match:
+                self._drop(ticket.sock)
+            return
+        threading.Thread(target=session.start, daemon=True).start()
+        self.sessions[session] = time.monotonic()
+        logger.info(f"Подобрана игра {nicknames}: {mode}, порт {session.port}")
+        reply = f"MATCH:{session.port}\n".encode()
+        for ticket in match:
+            self._reply(ticket.sock, reply)
+            self._drop(ticket.sock)
+
+    @staticmethod
+    def _reply(sock: socket.socket, data: bytes):
+        try:
+            sock.send(data)
+        except OSError:
+            pass
+
+    def _drop(self, sock: socket.socket):
+        self._buffers.pop(sock, None)
+        ticket = self._tickets.pop(sock, None)
+        if ticket:
+            self.queue.cancel(ticket)
+            self._nicknames.discard(ticket.nickname)
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        sock.close()
+
+    def _reap_loop(self):
+        while not self._stopped.wait(1.0):
+            now = time.monotonic()
+            for session, created in list(self.sessions.items()):
+                if session.abandoned or (not session.game_started and now - created > self.SESSION_JOIN_TIMEOUT):
+                    logger.info(f"Сессия на порту {session.port} завершена.")
+                    session.shutdown()
+                    del self.sessions[session]
+
+    def answer_probes(self):
+        # клиенты находят сервер подбора тем же поиском, что и обычные сессии, по коду MATCH_CODE
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            udp.bind(("", DISCOVERY_PORT))
+        except OSError as e:
+            logger.error(f"Не удалось открыть порт поиска {DISCOVERY_PORT}: {e}")
+            udp.close()
+            return
+        udp.settimeout(0.5)
+        reply = encode_announce({"code": MATCH_CODE, "port": self.port})
+        while not self._stopped.is_set():
+            try:
+                data, addr = udp.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if data == PROBE + MATCH_CODE.encode():
+                try:
+                    udp.sendto(reply, addr)
+                except OSError as e:
+                    logger.error(f"Ошибка ответа на поиск для {addr}: {e}")
+        udp.close()
+
+    def shutdown(self):
+        self._stopped.set()
+        for sock in list(self._tickets) + list(self._buffers):
+            self._drop(sock)
+        for session in list(self.sessions):
+            session.shutdown()
+        self.sessions.clear()
+        self._selector.close()
+        self.listen_socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер подбора соперников Three in row")
+    parser.add_argument("--port", type=int, default=MATCH_PORT)
+    parser.add_argument("--any-limit", action="store_true",
+                        help="сводить игроков на время с разными лимитами, играя по меньшему")
+    args = parser.parse_args()
+    server = MatchServer(args.port, AnyLimitPolicy() if args.any_limit else FifoPolicy())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
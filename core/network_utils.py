@@ -1,13 +1,70 @@
+import ipaddress
+import json
 import socket
 import time
+from dataclasses import dataclass
+from functools import lru_cache
 
 from logger import logger
 
+# UDP-порт, на котором серверы отвечают на запросы поиска
+DISCOVERY_PORT = 37020
+# запрос: PROBE + код сессии (пустой код — «отзовитесь все»)
+PROBE = b"TIR?"
+# UDP-порт списка игр: сюда серверы рассылают объявления о себе
+LOBBY_PORT = 37021
+ANNOUNCE_INTERVAL = 2.0
+# сервер подбора соперников: TCP-порт очереди и код, на который он отзывается при поиске
+MATCH_PORT = 37022
+MATCH_CODE = "match"
+
+
+@dataclass(frozen=True)
+class LanInterface:
+    name: str
+    ip: str
+    netmask: str
+    broadcast: str
+
+
+@lru_cache(maxsize=None)
+def lan_interfaces() -> tuple[LanInterface, ...]:
+    # перечисляем интерфейсы напрямую: маршрут в интернет не нужен,
+    # список за время жизни процесса не перечитывается
+    try:
+        # Qt нужен только здесь: безголовый процесс подбора соперников работает и без PyQt5
+        from PyQt5.QtNetwork import QAbstractSocket, QNetworkInterface
+    except ImportError:
+        logger.warning("PyQt5 не найден — сетевые интерфейсы не определены.")
+        return ()
+    result = []
+    for iface in QNetworkInterface.allInterfaces():
+        flags = iface.flags()
+        if not (flags & QNetworkInterface.IsUp and flags & QNetworkInterface.IsRunning) \
+                or flags & QNetworkInterface.IsLoopBack:
+            continue
+        for entry in iface.addressEntries():
+            if entry.ip().protocol() != QAbstractSocket.IPv4Protocol:
+                continue
+            net = ipaddress.IPv4Network(f"{entry.ip().toString()}/{entry.netmask().toString()}", strict=False)
+            broadcast = entry.broadcast().toString() or str(net.broadcast_address)
+            result.append(LanInterface(iface.humanReadableName(), entry.ip().toString(),
+                                       str(net.netmask), broadcast))
+
+    def rank(lan: LanInterface):
+        ip = ipaddress.IPv4Address(lan.ip)
+        # сначала обычные адреса локальной сети, link-local (169.254.x.x) — в конец
+        return ip.is_link_local, not ip.is_private
+
+    result.sort(key=rank)
+    logger.info(f"Сетевые интерфейсы: {result}")
+    return tuple(result)
+
 
 def get_local_ip():
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-        s.connect(("8.8.8.8", 80))
-        return s.getsockname()[0]
+    interfaces = lan_interfaces()
+    # без единой сети играть можно только на этой же машине
+    return interfaces[0].ip if interfaces else "127.0.0.1"
 
 
 def get_free_port():
@@ -16,24 +73,63 @@ def get_free_port():
         return s.getsockname()[1]
 
 
-def find_server_by_port(port):
-    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+@lru_cache(maxsize=None)
+def broadcast_addresses() -> tuple[str, ...]:
+    addresses = ["255.255.255.255"]
+    for lan in lan_interfaces():
+        if lan.broadcast not in addresses:
+            addresses.append(lan.broadcast)
+    if len(addresses) == 1:
+        # нет ни одного интерфейса — ищем хотя бы сервер на этой машине
+        addresses.append("127.0.0.1")
+    return tuple(addresses)
+
+
+def encode_announce(info: dict) -> bytes:
+    return json.dumps(info).encode()
+
+
+def decode_announce(data: bytes) -> dict | None:
     try:
-        udp.bind(("", port))
-    except OSError as e:
-        logger.error(f"Ошибка при привязке к порту {port}: {e}")
-        return None, None
-
-    timeout = time.time() + 15
-    while time.time() < timeout:
-        try:
-            udp.settimeout(5)
-            data, addr = udp.recvfrom(1024)
-            code, ip, srv_port = data.decode().split(":")
-            if code == str(port):
-                return ip, int(srv_port)
-        except socket.timeout:
-            continue
+        info = json.loads(data.decode())
+    except ValueError:
+        return None
+    if not isinstance(info, dict) or "code" not in info or "port" not in info:
+        return None
+    return info
+
 
+def find_server(code: str, timeout: float = 2.0, interval: float = 0.25, cancelled=None):
+    # шлём запрос повторно каждые interval секунд: UDP может потеряться,
+    # а ответивший сервер отвечает сразу, без ожидания периодической рассылки
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+        udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        udp.bind(("", 0))
+        probe = PROBE + code.encode()
+        deadline = time.monotonic() + timeout
+        next_probe = 0.0
+        while (now := time.monotonic()) < deadline:
+            if cancelled is not None and cancelled():
+                break
+            if now >= next_probe:
+                for addr in broadcast_addresses():
+                    try:
+                        udp.sendto(probe, (addr, DISCOVERY_PORT))
+                    except OSError as e:
+                        logger.warning(f"Не удалось отправить запрос поиска на {addr}: {e}")
+                next_probe = now + interval
+            udp.settimeout(max(0.01, min(next_probe, deadline) - now))
+            try:
+                data, (ip, _) = udp.recvfrom(1024)
+            except socket.timeout:
+                continue
+            info = decode_announce(data)
+            if info and info["code"] == code:
+                try:
+                    port = int(info["port"])
+                except (ValueError, TypeError):
+                    logger.warning(f"Некорректный ответ на поиск от {ip}: {info}")
+                    continue
+                # адрес отправителя ответа заведомо достижим из этой сети
+                return ip, port
     return None, None
@@ -1,37 +1,133 @@
 import json
-from typing import Dict, List, Tuple, Any, Set, Union
+from typing import Dict, List, Tuple, Any
 
+from core.board import CascadeStep
 from core.element import Element
-from core.enums import Bonus
+from core.enums import Bonus, Color
+
+# Первая строка рукопожатия идёт с версией: VERSION_PREFIX + "<версия>:" + сама строка.
+# Версия 2: бонусы на доске кодируются двумя буквами с цветом ("Hr", "Vo", "Bp");
+# строка без префикса — клиент версии 1, которому такие доски не разобрать
+PROTOCOL_VERSION = 2
+VERSION_PREFIX = "PROTO"
+UNSUPPORTED_VERSION = "UNSUPPORTED_VERSION"
+# Первая строка рукопожатия: никнейм игрока или SPECTATE_PREFIX + имя зрителя
+SPECTATE_PREFIX = "SPECTATE:"
+# Очередь подбора соперников: QUEUE_PREFIX + "<режим>:<лимит времени>:<никнейм>",
+# ответ QUEUED, затем MATCH:<порт сессии>
+QUEUE_PREFIX = "QUEUE:"
+# Переподключение: RESUME_PREFIX + "<токен>:<последний полученный seq>"
+RESUME_PREFIX = "RESUME:"
+# Столько секунд сервер держит место за отключившимся игроком
+RESUME_GRACE = 10.0
+# Пинг раз в PING_INTERVAL секунд; соединение, молчащее дольше LIVENESS_TIMEOUT, считается мёртвым
+PING_INTERVAL = 1.0
+LIVENESS_TIMEOUT = 5.0
 
 
 def _elem_to_dict(e: Element) -> Dict[str, Any]:
     return {"x": e.x, "y": e.y,
             "color": e.color.value,
             "bonus": e.bonus.name,
+            "id": e.id,
             "img": e.img}
 
 
 def _dict_to_elem(d: Dict[str, Any]) -> Element:
-    from core.enums import Color, Bonus
-    e = Element(d["x"], d["y"], Color(d["color"]), Bonus[d["bonus"]])
+    # id нет у шагов из журналов и сообщений старых версий
+    e = Element(d["x"], d["y"], Color(d["color"]), Bonus[d["bonus"]], d.get("id", 0))
     return e
 
 
+def step_to_dict(step: CascadeStep) -> Dict[str, Any]:
+    d = {
+        "removed": [[r, c] for (r, c) in sorted(step.removed)],
+        "bonuses": [
+            {"r": r, "c": c, "bonus": bonus.name, "color": color.value, "id": elem_id}
+            for (r, c, bonus, color, elem_id) in step.bonuses
+        ],
+        "fallen": [
+            {"old_r": o_r, "old_c": o_c, "new_r": n_r, "new_c": n_c, "id": elem_id}
+            for o_r, o_c, n_r, n_c, elem_id in step.fallen
+        ],
+        "spawned": [
+            _elem_to_dict(e) for e in step.spawned
+        ],
+    }
+    if step.recolored:
+        r, c, color = step.recolored
+        d["recolored"] = {"r": r, "c": c, "color": color.value}
+    return d
+
+
+def dict_to_step(d: Dict[str, Any]) -> CascadeStep:
+    return CascadeStep(
+        removed={(r, c) for r, c in d["removed"]},
+        bonuses=[(b["r"], b["c"], Bonus[b["bonus"]], Color(b["color"]), b.get("id", 0)) for b in d["bonuses"]],
+        fallen=[(f["old_r"], f["old_c"], f["new_r"], f["new_c"], f.get("id", 0)) for f in d["fallen"]],
+        spawned=[_dict_to_elem(e) for e in d["spawned"]],
+        recolored=(d["recolored"]["r"], d["recolored"]["c"], Color(d["recolored"]["color"]))
+        if "recolored" in d else None,
+    )
+
+
+# Каждое сообщение — одна строка JSON, завершённая "\n"
+# (json.dumps экранирует переводы строк внутри значений).
 def dumps(msg: Dict[str, Any]) -> bytes:
-    return json.dumps(msg, ensure_ascii=False).encode()
+    return json.dumps(msg, ensure_ascii=False).encode() + b"\n"
 
 
 def loads(raw: bytes) -> Dict[str, Any]:
     return json.loads(raw.decode())
 
 
+def stamp(seq: int, frame: bytes) -> bytes:
+    # дописываем номер в уже закодированный кадр, не пересобирая JSON
+    return b'{"seq":%d,' % seq + frame[1:]
+
+
+def read_line(sock) -> Tuple[str, bytes]:
+    # строка рукопожатия и всё, что пришло за ней в том же recv
+    buf = b""
+    while b"\n" not in buf:
+        chunk = sock.recv(1024)
+        if not chunk:
+            raise ConnectionError("соединение закрыто во время рукопожатия")
+        buf += chunk
+    line, rest = buf.split(b"\n", 1)
+    return line.decode("utf-8"), rest
+
+
+def hello(line: str) -> bytes:
+    return f"{VERSION_PREFIX}{PROTOCOL_VERSION}:{line}\n".encode("utf-8")
+
+
+def parse_hello(line: str) -> Tuple[int, str]:
+    # (версия, строка без префикса)
+    if line.startswith(VERSION_PREFIX):
+        version, sep, rest = line[len(VERSION_PREFIX):].partition(":")
+        if sep and version.isdigit():
+            return int(version), rest
+    return 1, line
+
+
+class FrameDecoder:
+    def __init__(self):
+        self._buf = b""
+
+    def feed(self, raw: bytes) -> List[bytes]:
+        self._buf += raw
+        *frames, self._buf = self._buf.split(b"\n")
+        return [f for f in frames if f.strip()]
+
+
 def start_game(
         mode: str,
         queue: List[str],
         nicknames: List[str],
         board: List[List[str]],
-        time_limit: int
+        time_limit: int,
+        next_seed: int | None = None
 ) -> Dict[str, Any]:
     return {
         "command": "start_game",
@@ -40,105 +136,121 @@ def start_game(
         "current_player": queue[0],
         "nicknames": nicknames,
         "board": board,
-        "time_limit": time_limit
+        "time_limit": time_limit,
+        "next_seed": next_seed,
     }
 
 
-def swap(
-        a_lbl: Tuple[int, int],
-        b_lbl: Tuple[int, int],
-        next_player: str,
-        removed: Set[Tuple[int, int]],
-        bonuses: List[Tuple[int, int, Bonus]],
-        success: bool,
-        board: List[List[str]]
+def snapshot(
+        mode: str,
+        queue: List[str],
+        current: str,
+        nicknames: List[str],
+        board: List[List[str]],
+        time_limit: int,
+        scores: Dict[str, int],
+        boards: Dict[str, List[List[str]]],
+        elapsed: float,
+        finished: Dict[str, int],
+        next_seed: int | None = None
 ) -> Dict[str, Any]:
+    return {
+        "command": "snapshot",
+        "mode": mode,
+        "queue_players": queue,
+        "current_player": current,
+        "nicknames": nicknames,
+        "board": board,
+        "time_limit": time_limit,
+        "scores": scores,
+        "boards": boards,
+        "elapsed": elapsed,
+        "finished": finished,
+        "next_seed": next_seed,
+    }
+
+
+def resync(snapshot_: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(snapshot_, command="resync")
+
+
+def move(a_lbl: Tuple[int, int], b_lbl: Tuple[int, int]) -> Dict[str, Any]:
     a_row, a_col = a_lbl
     b_row, b_col = b_lbl
     return {
-        "command": "swap",
+        "command": "move",
         "a_row": a_row,
         "a_col": a_col,
         "b_row": b_row,
         "b_col": b_col,
-        "next_player": next_player,
-        "board": board,
-        "success": success,
-        "removed": [[r, c] for (r, c) in sorted(removed)],
-        "bonuses": [
-            {"r": r, "c": c, "bonus": bonus.name}
-            for (r, c, bonus) in bonuses
-        ]
     }
 
 
-def auto_swap(
-        fallen: List[Tuple[int, int, int, int]],
-        spawned: List[Element],
-        board: List[List[str]]
+def swap_result(
+        player: str,
+        a_lbl: Tuple[int, int],
+        b_lbl: Tuple[int, int],
+        success: bool,
+        steps: List[CascadeStep],
+        board: List[List[str]],
+        next_player: str,
+        scores: Dict[str, int],
+        checksum: int,
+        next_seed: int
 ) -> Dict[str, Any]:
+    a_row, a_col = a_lbl
+    b_row, b_col = b_lbl
     return {
-        "command": "auto_swap",
-        "fallen": [
-            {"old_r": o_r, "old_c": o_c, "new_r": n_r, "new_c": n_c}
-            for o_r, o_c, n_r, n_c in fallen
-        ],
-        "spawned": [
-            _elem_to_dict(e) for e in spawned
-        ],
+        "command": "swap_result",
+        "player": player,
+        "a_row": a_row,
+        "a_col": a_col,
+        "b_row": b_row,
+        "b_col": b_col,
+        "success": success,
+        "steps": [step_to_dict(step) for step in steps],
         "board": board,
+        "next_player": next_player,
+        "scores": scores,
+        "checksum": checksum,
+        "next_seed": next_seed,
     }
 
 
-def board(board_: List[List[str]]) -> Dict[str, Any]:
+def board(board_: List[List[str]], player: str, moves: int = 0) -> Dict[str, Any]:
     return {
         "command": "board",
+        "player": player,
         "board": board_,
+        "moves": moves,
     }
 
 
-def score(score_: int) -> Dict[str, Any]:
+def score(score_: int, player: str) -> Dict[str, Any]:
     return {
         "command": "score",
+        "player": player,
         "score": score_,
     }
 
 
-def time(time_: int) -> Dict[str, Any]:
-    return {
-        "command": "time",
-        "time": time_,
-    }
-
-
-def auto_swap_circle(
-        fallen: List[Tuple[int, int, int, int]],
-        spawned: List[Element],
-        removed: Set[Tuple[int, int]],
-        bonuses: List[Tuple[int, int, Bonus]],
-        board_: List[List[str]]
-) -> Dict[str, Any]:
-    return {
-        "command": "auto_swap_circle",
-        "fallen": [
-            {"old_r": o_r, "old_c": o_c, "new_r": n_r, "new_c": n_c}
-            for o_r, o_c, n_r, n_c in fallen
-        ],
-        "removed": [[r, c] for (r, c) in sorted(removed)],
-        "spawned": [
-            _elem_to_dict(e) for e in spawned
-        ],
-        "bonuses": [
-            {"r": r, "c": c, "bonus": bonus.name}
-            for (r, c, bonus) in bonuses
-        ],
-        "board": board_,
-    }
+# синхронизация часов игры на время: сколько секунд прошло по часам сервера
+def clock(elapsed: float, limit: int) -> Dict[str, Any]:
+    return {"command": "clock", "elapsed": round(elapsed, 3), "limit": limit}
 
 
 def end_game(winner: str, score_: int) -> Dict:
     return {"command": "end_game", "winner": winner, "score": score_}
 
 
-def finish(score_: int) -> Dict:
-    return {"command": "finish", "score": score_}
+def finish(score_: int, player: str) -> Dict:
+    return {"command": "finish", "player": player, "score": score_}
+
+
+# ping/pong — служебные кадры без номера, t — time.monotonic() отправителя пинга
+def ping(t: float) -> Dict:
+    return {"command": "ping", "t": t}
+
+
+def pong(t: float) -> Dict:
+    return {"command": "pong", "t": t}
@@ -0,0 +1,66 @@
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+MAGIC = b"TIRREC1\n"
+
+INBOUND = 0
+OUTBOUND = 1
+
+# время с начала записи (с), направление, длина имени отправителя, длина кадра
+_HEADER = struct.Struct("<dBBI")
+
+
+@dataclass
+class Record:
+    t: float
+    direction: int
+    peer: str
+    frame: bytes
+
+
+class SessionRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self._file: BinaryIO = open(path, "wb", buffering=1 << 16)
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.closed = False
+
+    def record(self, direction: int, frame: bytes, peer: str = ""):
+        frame = frame.rstrip(b"\n")
+        peer_raw = peer.encode("utf-8")[:255]
+        header = _HEADER.pack(time.monotonic() - self._start, direction, len(peer_raw), len(frame))
+        with self._lock:
+            if self.closed:
+                return
+            self._file.write(header)
+            self._file.write(peer_raw)
+            self._file.write(frame)
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._file.close()
+
+
+def read_records(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: не файл записи сессии")
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            t, direction, peer_len, frame_len = _HEADER.unpack(header)
+            peer = f.read(peer_len).decode("utf-8")
+            frame = f.read(frame_len)
+            if len(frame) < frame_len:
+                # запись оборвалась на середине кадра (например, процесс убили)
+                return
+            yield Record(t, direction, peer, frame)
@@ -0,0 +1,169 @@
+import argparse
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from core import protocol as proto
+from core.game_controller import GameController
+from core.recorder import INBOUND, OUTBOUND, Record, read_records
+
+
+def replay(records: Iterable[Record],
+           handler: Callable[[Record], None],
+           speed: float = 1.0):
+    # speed <= 0 — без пауз, максимально быстро
+    start = time.monotonic()
+    for rec in records:
+        if speed > 0:
+            delay = rec.t / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        handler(rec)
+
+
+@dataclass
+class MoveInput(Record):
+    # сид, которым сервер разыграл этот ход при записи
+    seed: int | None = None
+
+
+def server_inputs(records: list[Record]) -> list[Record]:
+    # ходы хоста по сети не ходят — восстанавливаем их из его swap_result.
+    # Каждый ход шахмат сервер разыгрывает сидом, объявленным перед ним (next_seed в start_game
+    # или в прошлом swap_result); без него каскады повтора разошлись бы с записью с первого хода.
+    # В игре на время сервер ходы не разыгрывает — доски приходят готовыми кадрами board
+    peers = {rec.peer for rec in records if rec.direction == INBOUND}
+    inputs = []
+    seed = None
+    for rec in records:
+        data = proto.loads(rec.frame)
+        if rec.direction == INBOUND:
+            if data["command"] == "move":
+                rec = MoveInput(rec.t, rec.direction, rec.peer, rec.frame, seed)
+            inputs.append(rec)
+            continue
+        if data["command"] == "swap_result" and data["player"] not in peers:
+            move = proto.move((data["a_row"], data["a_col"]), (data["b_row"], data["b_col"]))
+            inputs.append(MoveInput(rec.t, INBOUND, data["player"], proto.dumps(move), seed))
+        if data["command"] in ("start_game", "swap_result"):
+            seed = data.get("next_seed")
+    return inputs
+
+
+def seed_move(ctrl: GameController, rec: Record):
+    if isinstance(rec, MoveInput) and rec.seed is not None:
+        ctrl.next_seed = rec.seed
+
+
+def make_controller(records: list[Record], target: str) -> GameController:
+    is_client = target == "client"
+    # кадры подаются по одному из потока повтора — отдельный поток контроллера не нужен
+    # у серверного контроллера нет своего игрока: хост, если был, ходил через кадры записи
+    ctrl = GameController(mode="", time=0, nickname="replay" if is_client else None,
+                          is_client=is_client, actor=False)
+    if not is_client:
+        # сервер сам рассылал start_game — берём из него начальное состояние
+        for rec in records:
+            data = proto.loads(rec.frame)
+            if rec.direction == OUTBOUND and data["command"] == "start_game":
+                ctrl.handle_start_game(data)
+                break
+    return ctrl
+
+
+class CommandTimer:
+    def __init__(self, ctrl: GameController):
+        self.ctrl = ctrl
+        self.timings: dict[str, list[float]] = defaultdict(list)
+
+    def __call__(self, rec: Record):
+        data = proto.loads(rec.frame)
+        seed_move(self.ctrl, rec)
+        started = time.perf_counter()
+        self.ctrl.handle_command(data, rec.peer or None)
+        self.timings[data["command"]].append(time.perf_counter() - started)
+
+    def report(self) -> str:
+        lines = [f"{'command':<14}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for cmd, samples in sorted(self.timings.items()):
+            samples = sorted(samples)
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            lines.append(f"{cmd:<14}{len(samples):>8}"
+                         f"{statistics.fmean(samples) * 1000:>10.3f}"
+                         f"{statistics.median(samples) * 1000:>10.3f}"
+                         f"{p99 * 1000:>10.3f}"
+                         f"{samples[-1] * 1000:>10.3f}")
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Повтор записанной сессии Three in row")
+    parser.add_argument("path", help="файл записи сессии (.rec)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="множитель скорости; 0 — без пауз")
+    parser.add_argument("--target", choices=("server", "client"), default="client",
+                        help="server — входящие кадры в серверный контроллер, "
+                             "client — исходящие кадры сервера в клиентский")
+    parser.add_argument("--gui", action="store_true",
+                        help="применять кадры к GameWindow, как это делает клиент")
+    args = parser.parse_args()
+
+    records = list(read_records(args.path))
+    ctrl = make_controller(records, args.target)
+    if args.target == "server":
+        frames = server_inputs(records)
+    else:
+        frames = [rec for rec in records if rec.direction == OUTBOUND]
+
+    if not args.gui:
+        timer = CommandTimer(ctrl)
+        started = time.perf_counter()
+        replay(frames, timer, speed=args.speed)
+        print(timer.report())
+        print(f"total {time.perf_counter() - started:.3f} s, {len(frames)} frames")
+        return
+
+    import sys
+    import threading
+
+    from PyQt5.QtCore import QObject, Qt, pyqtSignal
+    from PyQt5.QtWidgets import QApplication, QWidget
+
+    class _Bridge(QObject):
+        gui_cmd = pyqtSignal(str, object)
+
+    app = QApplication(sys.argv)
+    from GUI.game_window import GameWindow
+
+    holder = QWidget()
+    bridge = _Bridge()
+    window = None
+
+    def _apply(cmd: str, view):
+        nonlocal window
+        if cmd == "start_game" and window is None:
+            window = GameWindow(ctrl=ctrl, main_window=holder)
+            window.show()
+        if window is not None:
+            window.apply_state(cmd, view)
+
+    bridge.gui_cmd.connect(_apply, Qt.QueuedConnection)
+    ctrl.state_ready = bridge.gui_cmd.emit
+
+    def _run():
+        def _handle(rec: Record):
+            seed_move(ctrl, rec)
+            if ctrl.handle_command(proto.loads(rec.frame), rec.peer or None):
+                bridge.gui_cmd.emit("start_game", ctrl.view())
+
+        replay(frames, _handle, speed=args.speed)
+        print(f"replay finished, {len(frames)} frames")
+
+    threading.Thread(target=_run, daemon=True).start()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
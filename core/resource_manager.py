@@ -0,0 +1,182 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Tuple
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QFontDatabase, QGuiApplication, QImage, QPixmap
+
+from core.setting_deploy import get_resource_path
+from logger import logger
+
+FONT_PATH = get_resource_path("assets/FontFont.otf")
+# кадры анимаций: <EXPLOSION_DIR>/<набор>/frame_00.png ...
+EXPLOSION_DIR = "assets/elements/explosion"
+FRAME_COUNT = 60
+# атласы из build_atlas.py: <имя>.png и индекс кадров <имя>.json
+ATLAS_DIR = "assets/atlas"
+
+Atlas = Tuple[QImage, Dict[str, QRect]]
+
+
+class ResourceManager:
+    # картинки и шрифты на весь процесс: каждая картинка читается с диска и масштабируется
+    # один раз на размер, а не при каждой отрисовке клетки или цифры. Только из потока GUI
+    _instance = None
+    # сколько байт декодированных картинок держим; дальше выбрасываем давно не нужные
+    PIXMAP_LIMIT = 64 * 1024 * 1024
+
+    @classmethod
+    def instance(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, limit: int = PIXMAP_LIMIT):
+        self.limit = limit
+        self._pixmaps: OrderedDict[tuple, QPixmap] = OrderedDict()
+        self._bytes = 0
+        self._fonts: Dict[str, str | None] = {}
+        self.hits = self.misses = 0
+        # кадры анимаций по (набор, размер): не вытесняются, их немного и они нужны всё время
+        self._frames: Dict[Tuple[str, int], Tuple[QPixmap, ...]] = {}
+        # кадры, которые декодирует фоновый поток prewarm_frames
+        self._frame_jobs: Dict[Tuple[str, int], Future] = {}
+        # атлас декодируется один раз; None — атласа нет, берём отдельные файлы
+        self._atlases: Dict[str, Atlas | None] = {}
+        self._atlas_lock = threading.Lock()
+
+    @staticmethod
+    def _size_of(pix: QPixmap) -> int:
+        return pix.width() * pix.height() * max(pix.depth(), 8) // 8
+
+    def pixmap(self, path: str, width: int = 0, height: int = 0,
+               aspect: Qt.AspectRatioMode = Qt.IgnoreAspectRatio,
+               mode: Qt.TransformationMode = Qt.FastTransformation) -> QPixmap:
+        # path — уже через get_resource_path; width/height 0 — картинка как есть
+        key = (path, width, height, aspect, mode)
+        pix = self._pixmaps.get(key)
+        if pix is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+            return pix
+        self.misses += 1
+        pix = QPixmap(path)
+        if pix.isNull():
+            logger.warning(f"Не удалось загрузить картинку {path}")
+        elif width and height:
+            pix = pix.scaled(width, height, aspect, mode)
+        self._remember(key, pix)
+        return pix
+
+    def _remember(self, key: tuple, pix: QPixmap):
+        self._pixmaps[key] = pix
+        self._bytes += self._size_of(pix)
+        while self._bytes > self.limit and len(self._pixmaps) > 1:
+            _, old = self._pixmaps.popitem(last=False)
+            self._bytes -= self._size_of(old)
+
+    def memory(self) -> Tuple[int, int]:
+        # (картинок в кэше, байт)
+        return len(self._pixmaps), self._bytes
+
+    def clear(self):
+        self._pixmaps.clear()
+        self._bytes = 0
+
+    def font_family(self, path: str = FONT_PATH) -> str:
+        # шрифт регистрируется в Qt один раз на процесс
+        if path not in self._fonts:
+            font_id = QFontDatabase.addApplicationFont(path)
+            families = QFontDatabase.applicationFontFamilies(font_id)
+            if not families:
+                logger.warning(f"Не удалось загрузить шрифт {path}")
+            self._fonts[path] = families[0] if families else None
+        return self._fonts[path] or QGuiApplication.font().family()
+
+    def frames(self, name: str, size: int) -> Tuple[QPixmap, ...]:
+        # кадры одного набора на одном размере — общие для всех анимаций;
+        # пустой кортеж, если такого набора нет
+        key = (name, size)
+        frames = self._frames.get(key)
+        if frames is None:
+            job = self._frame_jobs.pop(key, None)
+            images = job.result() if job is not None else self._decode_frames(name, size)
+            frames = self._frames[key] = tuple(QPixmap.fromImage(image) for image in images)
+        return frames
+
+    def _decode_frames(self, name: str, size: int) -> List[QImage]:
+        atlas = self.atlas(f"explosion_{name}")
+        if atlas is not None:
+            image, rects = atlas
+            return [image.copy(rect).scaled(size, size) for rect in rects.values()]
+        images = []
+        for i in range(FRAME_COUNT):
+            # у бомбы кадры без ведущего нуля: frame_0.png
+            image = QImage(get_resource_path(f"{EXPLOSION_DIR}/{name}/frame_{i:02d}.png"))
+            if image.isNull():
+                image = QImage(get_resource_path(f"{EXPLOSION_DIR}/{name}/frame_{i}.png"))
+            if image.isNull():
+                break
+            images.append(image.scaled(size, size))
+        if not images:
+            logger.warning(f"Нет кадров анимации {name}")
+        return images
+
+    def prewarm_frames(self, names: Iterable[str], size: int):
+        # QImage, в отличие от QPixmap, можно декодировать не в потоке GUI:
+        # к первому взрыву кадры уже готовы, потоку GUI остаётся только обернуть их в QPixmap
+        jobs = []
+        for name in names:
+            key = (name, size)
+            if key not in self._frames and key not in self._frame_jobs:
+                job = self._frame_jobs[key] = Future()
+                jobs.append((key, job))
+        if jobs:
+            threading.Thread(target=self._prewarm, args=(jobs,), daemon=True, name="frames-prewarm").start()
+
+    def _prewarm(self, jobs: List[Tuple[Tuple[str, int], Future]]):
+        for (name, size), job in jobs:
+            try:
+                job.set_result(self._decode_frames(name, size))
+            except Exception as e:
+                job.set_exception(e)
+
+    def atlas(self, name: str) -> Atlas | None:
+        # вызывается и из фонового потока prewarm_frames
+        with self._atlas_lock:
+            if name not in self._atlases:
+                self._atlases[name] = self._load_atlas(name)
+            return self._atlases[name]
+
+    @staticmethod
+    def _load_atlas(name: str) -> Atlas | None:
+        try:
+            with open(get_resource_path(f"{ATLAS_DIR}/{name}.json"), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        image = QImage(get_resource_path(f"{ATLAS_DIR}/{index['image']}"))
+        if image.isNull():
+            logger.warning(f"Атлас {name} не читается, берём отдельные файлы")
+            return None
+        rects = {frame["name"]: QRect(*frame["rect"]) for frame in index["frames"]}
+        return image, rects
+
+    def sprite(self, atlas: str, name: str, path: str) -> QPixmap:
+        # кадр name из атласа; если атласа или кадра нет — файл path
+        key = (atlas, name)
+        pix = self._pixmaps.get(key)
+        if pix is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+            return pix
+        found = self.atlas(atlas)
+        if found is None or name not in found[1]:
+            return self.pixmap(path)
+        self.misses += 1
+        image, rects = found
+        pix = QPixmap.fromImage(image.copy(rects[name]))
+        self._remember(key, pix)
+        return pix
@@ -0,0 +1,453 @@
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+
+from core import protocol as proto
+from core.connection import Connection, SpectatorHub
+from core.game_controller import GameController
+from core.match_store import MatchStore
+from core.network_utils import (ANNOUNCE_INTERVAL, DISCOVERY_PORT, LOBBY_PORT, PROBE,
+                                broadcast_addresses, encode_announce, get_local_ip)
+from core.recorder import INBOUND, OUTBOUND, SessionRecorder
+from logger import logger
+
+
+class Session:
+    # сетевая сессия игры без Qt: игроки, зрители, переподключение и поиск по сети.
+    # Сама по себе — сессия без хоста для процесса подбора соперников;
+    # окно хоста работает с наследником core.server.Server
+    # кадры игроков, которые пересылаются зрителям как есть
+    RELAYED_COMMANDS = ("board", "score", "finish")
+    # сколько последних кадров храним для догоняющей отправки при переподключении
+    HISTORY_LIMIT = 1024
+
+    def __init__(self, nickname=None, mode=None, time=999, record_path=None,
+                 liveness_timeout=proto.LIVENESS_TIMEOUT, port=8080, players=None):
+        # players — сессия без хоста от подбора соперников: ждём именно их и стартуем сами
+        self.players = list(players) if players else None
+        self.liveness_timeout = liveness_timeout
+        self._stopped = threading.Event()
+        # запись всех кадров сессии для последующего повтора (python -m core.replay)
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        self.time = time
+        self.mode = mode
+        self.nickname = nickname
+        self.game_started = False
+        self.ctrl = GameController(
+            mode=self.mode,
+            time=self.time,
+            nickname=nickname,
+            is_client=False,
+            on_send=self._broadcast,
+            on_close=self.shutdown,
+            # журнал состояния пишется рядом с записью кадров: game.rec -> game.events
+            log_path=os.path.splitext(record_path)[0] + ".events" if record_path else None
+        )
+
+        # итоги пишет сервер: он один знает счёт всех игроков
+        self.ctrl.result_ready = MatchStore.instance().record
+        self.game_started = False
+        # сессии без хоста адрес не нужен: игроки приходят по порту, который им сообщил MatchServer
+        self.host = get_local_ip() if self.players is None else "0.0.0.0"
+        self.value_players = len(self.players) if self.players else 1
+        self.clients: dict[str, Connection] = {}
+        self.spectators: list[Connection] = []
+        self._spectators_lock = threading.Lock()
+        self._spectator_hub = SpectatorHub(self._spectator_frame, self._spectator_closed)
+        # будит рассылку объявлений, когда изменился состав игроков
+        self._announce_now = threading.Event()
+
+        # номера кадров и история для переподключения
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._history: deque[tuple[int, bytes]] = deque(maxlen=self.HISTORY_LIMIT)
+        self._tokens: dict[str, str] = {}
+        self._received: dict[str, int] = {}
+        self._dropped: dict[str, threading.Timer] = {}
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # порт сразу после прошлой игры ещё в TIME_WAIT
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # слушаем все интерфейсы: ответ на поиск мог уйти с любого из них
+        self.server_socket.bind(("", port))
+        self.server_socket.listen()
+        # port=0 — свободный порт выбирает система
+        self.port = self.server_socket.getsockname()[1]
+        self.session_code = str(self.port)
+        logger.info(f"Сервер запущен на {self.host}:{self.port} с кодом сессии: {self.session_code}")
+
+        if self.players is None:
+            # сессии подбора соперников в списке игр не показываются: адрес игрокам сообщает MatchServer
+            self.discovery_thread = threading.Thread(target=self.answer_probes, daemon=True)
+            self.discovery_thread.start()
+            threading.Thread(target=self.announce_session, daemon=True).start()
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+
+    def _broadcast(self, data: bytes, exclude: str | None = None):
+        # data уже закодирован: номер дописывается один раз, и один и тот же буфер
+        # уходит каждому подписчику и в историю
+        with self._seq_lock:
+            self._seq += 1
+            data = proto.stamp(self._seq, data)
+            self._history.append((self._seq, data))
+            if self.recorder:
+                self.recorder.record(OUTBOUND, data)
+            for nickname, conn in list(self.clients.items()):
+                if nickname != exclude:
+                    conn.send(data)
+        self._send_to_spectators(data)
+
+    def _send_to_spectators(self, data: bytes):
+        with self._spectators_lock:
+            spectators = list(self.spectators)
+        for conn in spectators:
+            conn.send(data)
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(proto.PING_INTERVAL):
+            now = time.monotonic()
+            ping = proto.dumps(proto.ping(now))
+            with self._spectators_lock:
+                conns = list(self.clients.values()) + self.spectators
+            for conn in conns:
+                if now - conn.last_seen > self.liveness_timeout:
+                    # полуоткрытое соединение: recv сам по себе этого не заметит
+                    logger.warning(f"{conn.name} молчит {now - conn.last_seen:.1f} с — отключаем.")
+                    conn.close()
+                else:
+                    conn.send(ping)
+
+    def _handle_control(self, conn: Connection, data: dict, peer: str | None = None) -> bool:
+        if data["command"] == "ping":
+            conn.send(proto.dumps(proto.pong(data["t"])))
+            return True
+        if data["command"] == "pong":
+            rtt = conn.rtt.update(time.monotonic() - data["t"])
+            if peer:
+                self.ctrl.update_rtt(peer, rtt)
+            return True
+        return False
+
+    def session_info(self) -> dict:
+        return {
+            "code": self.session_code,
+            "host": self.host,
+            "port": self.port,
+            "host_nick": self.nickname,
+            "mode": self.mode,
+            "players": 1 + len(self.clients),
+            "max_players": 1 + self.value_players,
+            "time_limit": self.time if self.mode == "time" else 0,
+            "started": self.game_started,
+        }
+
+    def announce_session(self):
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        def _send(info: dict):
+            data = encode_announce(info)
+            for addr in broadcast_addresses():
+                try:
+                    udp.sendto(data, (addr, LOBBY_PORT))
+                except OSError as e:
+                    logger.error(f"Ошибка рассылки объявления на {addr}: {e}")
+
+        while not self._stopped.is_set():
+            _send(self.session_info())
+            self._announce_now.wait(ANNOUNCE_INTERVAL)
+            self._announce_now.clear()
+        # списки игр убирают сессию сразу, не дожидаясь истечения TTL
+        _send(dict(self.session_info(), closed=True))
+        udp.close()
+
+    def answer_probes(self):
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # несколько серверов на одной машине слушают один порт поиска
+            udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            udp.bind(("", DISCOVERY_PORT))
+        except OSError as e:
+            logger.error(f"Не удалось открыть порт поиска {DISCOVERY_PORT}: {e}")
+            udp.close()
+            return
+        # таймаут — чтобы поток заметил остановку сервера
+        udp.settimeout(0.5)
+        while not self._stopped.is_set():
+            try:
+                data, addr = udp.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data.startswith(PROBE):
+                continue
+            code = data[len(PROBE):].decode("utf-8", "replace")
+            if code in ("", self.session_code):
+                try:
+                    udp.sendto(encode_announce(self.session_info()), addr)
+                except OSError as e:
+                    logger.error(f"Ошибка ответа на поиск для {addr}: {e}")
+        udp.close()
+
+    def handle_client(self, client_socket, address):
+        logger.info(f"Клиент {address} подключился.")
+        try:
+            # строка рукопожатия может прийти по частям или слиться со следующими кадрами;
+            # молчащий клиент не держит поток дольше LIVENESS_TIMEOUT
+            client_socket.settimeout(self.liveness_timeout)
+            hello, rest = proto.read_line(client_socket)
+            client_socket.settimeout(None)
+            version, hello = proto.parse_hello(hello)
+            if version != proto.PROTOCOL_VERSION:
+                logger.warning(f"Клиент {address} говорит на версии протокола {version}, нужна {proto.PROTOCOL_VERSION}.")
+                client_socket.send(f"{proto.UNSUPPORTED_VERSION}\n".encode("utf-8"))
+                client_socket.close()
+                return
+            if hello.startswith(proto.SPECTATE_PREFIX):
+                self.handle_spectator(client_socket, hello[len(proto.SPECTATE_PREFIX):], rest)
+                return
+            if hello.startswith(proto.RESUME_PREFIX):
+                self.handle_resume(client_socket, hello[len(proto.RESUME_PREFIX):], rest)
+                return
+
+            nickname = hello
+            if nickname == self.nickname or nickname in self.clients or nickname in self._dropped \
+                    or (self.players is not None and nickname not in self.players):
+                client_socket.send(b"INVALID_NICKNAME\n")
+                client_socket.close()
+                return
+
+            token = secrets.token_hex(8)
+            client_socket.send(f"WELCOME:{token}\n".encode("utf-8"))
+            conn = Connection(client_socket, nickname)
+            with self._seq_lock:
+                self._tokens[token] = nickname
+                self._received[nickname] = 0
+                self.clients[nickname] = conn
+        except (OSError, UnicodeDecodeError):
+            client_socket.close()
+            return
+
+        if len(self.clients) == self.value_players:
+            logger.info("Достигнуто максимальное количество игроков.")
+            if self.players is not None and not self.game_started:
+                self.game_started = True
+                self.ctrl.new_game(list(self.players))
+        self._announce_now.set()
+        self._serve_player(conn, nickname, rest)
+
+    def _serve_player(self, conn: Connection, nickname: str, raw: bytes = b""):
+        # raw — байты, пришедшие вместе со строкой рукопожатия
+        decoder = proto.FrameDecoder()
+        try:
+            while True:
+                if not raw:
+                    raw = conn.sock.recv(32768)
+                    if not raw:
+                        break
+                conn.last_seen = time.monotonic()
+                for frame in decoder.feed(raw):
+                    try:
+                        data = proto.loads(frame)
+                        if self._handle_control(conn, data, nickname):
+                            continue
+                        seq = data.get("seq", 0)
+                        if seq:
+                            if seq <= self._received.get(nickname, 0):
+                                # уже обработан до обрыва, клиент прислал его повторно
+                                continue
+                            # кадр без номера отметку не двигает: иначе повтор после
+                            # переподключения применился бы второй раз
+                            self._received[nickname] = seq
+                        # запись, ход и пересылка — одной задачей контроллера, чтобы порядок
+                        # кадров в истории совпадал с порядком изменений состояния
+                        self.ctrl.submit(self._apply_frame, frame, data, nickname)
+                    except Exception as e:
+                        logger.error(e)
+                raw = b""
+        except OSError:
+            pass
+        finally:
+            self.remove_client(conn, nickname)
+
+    def _apply_frame(self, frame: bytes, data: dict, nickname: str):
+        if self.recorder:
+            self.recorder.record(INBOUND, frame, nickname)
+        logger.info(f"Команда {data}")
+        self.ctrl.handle_command(data, nickname)
+        if data["command"] in self.RELAYED_COMMANDS:
+            # остальным игрокам и зрителям — под номером сервера, без номера клиента
+            data.pop("seq", None)
+            self._broadcast(proto.dumps(data), exclude=nickname)
+
+    def handle_resume(self, client_socket, payload: str, rest: bytes = b""):
+        token, _, last_seq = payload.partition(":")
+        with self._seq_lock:
+            nickname = self._tokens.pop(token, None)
+            if nickname is None or not last_seq.isdigit():
+                client_socket.send(b"RESUME_FAILED\n")
+                client_socket.close()
+                logger.warning("Переподключение отклонено: неизвестный токен.")
+                return
+            timer = self._dropped.pop(nickname, None)
+            if timer:
+                timer.cancel()
+
+            token = secrets.token_hex(8)
+            self._tokens[token] = nickname
+            client_socket.send(f"RESUMED:{token}:{self._received.get(nickname, 0)}\n".encode("utf-8"))
+        conn = Connection(client_socket, nickname)
+        # догоняющая отправка — в потоке контроллера: между снимком и подпиской не проскочит ни один кадр
+        old, sent = self.ctrl.call(self._attach_resumed, conn, nickname, int(last_seq))
+        if old is not None:
+            old.close()
+        logger.info(f"{nickname} переподключился, дослано кадров: {sent}")
+        self._serve_player(conn, nickname, rest)
+
+    def _attach_resumed(self, conn: Connection, nickname: str, last_seq: int) -> tuple[Connection | None, int]:
+        with self._seq_lock:
+            frames = self._catch_up(last_seq)
+        for frame in frames:
+            conn.send(frame)
+        clock = self.ctrl.clock
+        if clock and not clock.expired and self.ctrl.winner_player is None:
+            # пока клиента не было, его часы могли уйти (например, сон системы)
+            conn.send(proto.dumps(proto.clock(elapsed=clock.elapsed(), limit=self.ctrl.time)))
+        with self._seq_lock:
+            old = self.clients.get(nickname)
+            self.clients[nickname] = conn
+        return old, len(frames)
+
+    def _catch_up(self, last_seq: int) -> list[bytes]:
+        # пропущенные кадры или один снимок состояния — что короче
+        missed = [data for seq, data in self._history if seq > last_seq]
+        complete = last_seq >= self._seq or (self._history and self._history[0][0] <= last_seq + 1)
+        if complete and len(missed) <= 1:
+            return missed
+        frames = [proto.stamp(self._seq, proto.dumps(proto.resync(self.ctrl.snapshot())))]
+        if self.ctrl.winner_player is not None:
+            frames.append(proto.stamp(self._seq, proto.dumps(
+                proto.end_game(winner=self.ctrl.winner_player, score_=self.ctrl.winner_score))))
+        if complete and sum(map(len, missed)) <= sum(map(len, frames)):
+            return missed
+        return frames
+
+    def handle_spectator(self, client_socket, name: str, raw: bytes = b""):
+        client_socket.send(b"WELCOME\n")
+        conn = Connection(client_socket, f"зритель {name}", hub=self._spectator_hub)
+        self.ctrl.call(self._attach_spectator, conn)
+        logger.info(f"Зритель {name} подключился, всего зрителей: {len(self.spectators)}")
+        # дальше зрителя ведёт общий поток хаба, поток рукопожатия завершается
+        self._spectator_hub.add(conn, raw)
+
+    def _spectator_frame(self, conn: Connection, frame: bytes):
+        # от зрителя приходят только ping/pong
+        try:
+            self._handle_control(conn, proto.loads(frame))
+        except (ValueError, KeyError):
+            pass
+
+    def _spectator_closed(self, conn: Connection):
+        with self._spectators_lock:
+            if conn in self.spectators:
+                self.spectators.remove(conn)
+        logger.info(f"Отключился {conn.name}.")
+
+    def _attach_spectator(self, conn: Connection):
+        if self.ctrl.board is not None:
+            conn.send(proto.dumps(self.ctrl.snapshot()))
+        with self._spectators_lock:
+            self.spectators.append(conn)
+
+    def remove_client(self, conn: Connection, nickname=None):
+        conn.close()
+        with self._seq_lock:
+            if self.clients.get(nickname) is not conn:
+                # соединение уже заменено переподключением
+                return
+            del self.clients[nickname]
+            if self.game_started:
+                timer = threading.Timer(proto.RESUME_GRACE, self._resume_expired, args=(nickname,))
+                timer.daemon = True
+                self._dropped[nickname] = timer
+                timer.start()
+            else:
+                self._forget(nickname)
+        logger.info(f"Клиент {nickname} отключился.")
+
+        if not self.game_started:
+            logger.info("Игрок отключился до начала игры, место снова свободно.")
+            self._announce_now.set()
+        else:
+            logger.info(f"Ждём переподключения {nickname} {proto.RESUME_GRACE:.0f} с.")
+
+    @property
+    def abandoned(self) -> bool:
+        # игра шла, но все ушли и никого не ждём
+        return self.game_started and not self.clients and not self._dropped
+
+    def _forget(self, nickname: str):
+        for token, nick in list(self._tokens.items()):
+            if nick == nickname:
+                del self._tokens[token]
+        self._received.pop(nickname, None)
+
+    def _resume_expired(self, nickname: str):
+        with self._seq_lock:
+            if self._dropped.pop(nickname, None) is None:
+                return
+            self._forget(nickname)
+        logger.info(f"{nickname} не вернулся — аварийное завершение.")
+        self.ctrl.handle_error(nickname)
+
+    def start(self):
+        logger.info("Для остановки сервера нажмите CTRL+C")
+        while True:
+            try:
+                client_socket, address = self.server_socket.accept()
+                threading.Thread(target=self.handle_client, args=(client_socket, address), daemon=True).start()
+            except OSError:
+                break
+
+    def shutdown(self, *_):
+        logger.info("Завершаем сервер...")
+        self._stopped.set()
+        self._announce_now.set()
+        try:
+            # иначе accept в потоке start не проснётся и порт останется занят
+            self.server_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.server_socket.close()
+        except OSError:
+            pass
+
+        with self._seq_lock:
+            for timer in self._dropped.values():
+                timer.cancel()
+            self._dropped.clear()
+            self._tokens.clear()
+            for conn in list(self.clients.values()):
+                conn.close()
+            self.clients.clear()
+        with self._spectators_lock:
+            spectators, self.spectators = self.spectators, []
+        for conn in spectators:
+            conn.close()
+        self._spectator_hub.stop()
+        # без этого поток контроллера так и ждал бы задач: процесс подбора соперников
+        # терял бы по потоку на каждую завершённую сессию
+        self.ctrl.stop()
+        if self.recorder:
+            self.recorder.close()
+            logger.info(f"Запись сессии сохранена в {self.recorder.path}")
+        if self.ctrl.log is not None:
+            self.ctrl.log.close()
+            logger.info(f"Журнал игры сохранён в {self.ctrl.log.path}")
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# тесты запускаются из корня репозитория: пакеты core и GUI лежат рядом с app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import match_store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def match_db(tmp_path, monkeypatch):
+    # сессии пишут итоги в MatchStore.instance(): во временную базу, а не в matches.db рабочего каталога
+    monkeypatch.setattr(match_store, "DB_PATH", str(tmp_path / "matches.db"))
+    monkeypatch.setattr(match_store.MatchStore, "_instance", None)
+    # пачку не ждём: close() иначе держал бы каждый тест по полсекунды
+    monkeypatch.setattr(match_store.MatchStore, "BATCH_DELAY", 0.01)
+    yield
+    if match_store.MatchStore._instance is not None:
+        match_store.MatchStore._instance.close()
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from core.board import Board
+from core.element import Element
+from core.enums import Bonus, Color
+
+
+@pytest.fixture
+def board():
+    random.seed(11)
+    return Board()
+
+
+def _ids(board):
+    return [[e.id if e else None for e in row] for row in board.grid]
+
+
+def test_pack_unpack_roundtrip(board):
+    packed = board.pack()
+    assert len(packed) == Board.ROWS * Board.COLS
+    other = Board.unpack(packed)
+    assert other.to_matrix() == board.to_matrix()
+    assert other.pack() == packed
+    # распакованная доска нумерует фишки построчно, как новая
+    assert _ids(other) == [[r * Board.COLS + c + 1 for c in range(Board.COLS)] for r in range(Board.ROWS)]
+
+
+def test_pack_keeps_bonuses_and_holes(board):
+    board.grid[2][3] = Element(2, 3, Color.ORANGE, Bonus.ROCKET_V)
+    board.grid[5][1] = None
+    other = Board.unpack(board.pack())
+    assert other.cell(2, 3).bonus is Bonus.ROCKET_V and other.cell(2, 3).color is Color.ORANGE
+    assert other.cell(5, 1) is None
+    assert other.to_matrix() == board.to_matrix()
+
+
+def test_from_matrix_roundtrip(board):
+    board.grid[0][0] = Element(0, 0, Color.PURPLE, Bonus.BOMB)
+    matrix = board.to_matrix()
+    assert matrix[0][0] == "Bp"
+    assert Board.from_matrix(matrix).to_matrix() == matrix
+
+
+def test_apply_step_replays_resolve_swap(board):
+    rng = random.Random(5)
+    for _ in range(20):
+        replica = board.copy()
+        a, b = board.find_move()
+        success, steps = board.resolve_swap(a, b, rng)
+        assert success
+        replica.swap_cells(a, b)
+        for step in steps:
+            replica.apply_step(step)
+        assert replica.to_matrix() == board.to_matrix()
+        assert _ids(replica) == _ids(board)
+        assert replica.checksum() == board.checksum()
+
+
+def test_same_rng_same_result(board):
+    a, b = board.find_move()
+    first, second = board.copy(), board.copy()
+    assert first.resolve_swap(a, b, random.Random(42)) == second.resolve_swap(a, b, random.Random(42))
+    assert first.checksum() == second.checksum()
+
+
+def test_checksum_tracks_cells(board):
+    other = board.copy()
+    assert other.checksum() == board.checksum()
+    cell = other.cell(0, 0)
+    cell.color = next(color for color in Color if color is not cell.color)
+    assert other.checksum() != board.checksum()
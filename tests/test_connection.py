@@ -0,0 +1,102 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from core import protocol as proto
+from core.connection import Connection, RttEstimator, SpectatorHub
+
+
+def test_first_sample_seeds_estimate():
+    rtt = RttEstimator()
+    assert rtt.srtt is None
+    assert rtt.update(0.2) == pytest.approx(0.2)
+    assert rtt.rttvar == pytest.approx(0.1)
+
+
+def test_smoothing_follows_rfc6298():
+    rtt = RttEstimator()
+    rtt.update(0.1)
+    assert rtt.update(0.3) == pytest.approx(0.1 + (0.3 - 0.1) / 8)
+    assert rtt.rttvar == pytest.approx(0.05 + (0.2 - 0.05) / 4)
+
+
+def test_converges_to_stable_rtt_and_ignores_single_spike():
+    rtt = RttEstimator()
+    for _ in range(100):
+        rtt.update(0.05)
+    assert rtt.srtt == pytest.approx(0.05, abs=1e-4)
+    assert rtt.update(1.0) < 0.2
+
+
+def _tcp_pair():
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        client = socket.create_connection(listener.getsockname())
+        server, _ = listener.accept()
+    return server, client
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+@pytest.fixture
+def hub():
+    frames, closed = [], []
+    hub = SpectatorHub(lambda conn, frame: frames.append((conn, frame)), closed.append)
+    hub.frames, hub.closed = frames, closed
+    yield hub
+    hub.stop()
+
+
+def test_hub_serves_many_spectators_from_one_thread(hub):
+    before = threading.active_count()
+    pairs = [_tcp_pair() for _ in range(20)]
+    conns = [Connection(server, f"s{i}", hub=hub) for i, (server, _) in enumerate(pairs)]
+    for conn in conns:
+        hub.add(conn)
+    frame = proto.dumps(proto.ping(1.0))
+    for conn in conns:
+        assert conn.send(frame)
+    for _, client in pairs:
+        client.settimeout(2.0)
+        assert proto.read_line(client)[0] == frame[:-1].decode()
+    assert threading.active_count() == before + 1
+    for server, client in pairs:
+        client.close()
+
+
+def test_hub_reads_frames_including_handshake_rest(hub):
+    server, client = _tcp_pair()
+    conn = Connection(server, "s", hub=hub)
+    hub.add(conn, proto.dumps(proto.ping(1.0)))
+    client.sendall(proto.dumps(proto.pong(2.0)))
+    assert _wait(lambda: len(hub.frames) == 2)
+    assert [proto.loads(f)["command"] for _, f in hub.frames] == ["ping", "pong"]
+    client.close()
+
+
+def test_hub_reports_closed_spectators(hub):
+    server, client = _tcp_pair()
+    conn = Connection(server, "s", hub=hub)
+    hub.add(conn)
+    client.close()
+    assert _wait(lambda: hub.closed == [conn])
+    assert conn.closed and not conn.send(b"x\n")
+
+
+def test_hub_drops_spectator_that_stops_reading(hub):
+    server, client = _tcp_pair()
+    conn = Connection(server, "s", hub=hub)
+    hub.add(conn)
+    frame = b"x" * 65536 + b"\n"
+    for _ in range(Connection.MAX_BACKLOG * 4):
+        if not conn.send(frame):
+            break
+    assert conn.closed
+    assert _wait(lambda: hub.closed == [conn])
+    client.close()
@@ -0,0 +1,43 @@
+import dataclasses
+import random
+import time
+
+import pytest
+
+from core.game_clock import GameClock
+from core.game_controller import GameController
+
+
+def test_clock_counts_and_stops():
+    clock = GameClock(60)
+    assert clock.elapsed() == 0.0 and not clock.expired
+    clock.start(elapsed=10.0)
+    assert clock.elapsed() == pytest.approx(10.0, abs=0.1)
+    clock.stop()
+    stopped = clock.elapsed()
+    time.sleep(0.02)
+    assert clock.elapsed() == stopped
+    clock.sync(50.0)
+    assert clock.elapsed() == stopped
+
+
+def test_clock_caps_at_limit():
+    clock = GameClock(5)
+    clock.start(elapsed=30.0)
+    assert clock.elapsed() == 5.0 and clock.expired
+
+
+def test_view_holds_clock_snapshot_not_live_clock():
+    random.seed(1)
+    ctrl = GameController("time", 60, "alice", is_client=False, actor=False)
+    ctrl.new_game(["alice", "bob"])
+    view = ctrl.view()
+    ctrl.clock.sync(40.0)
+    ctrl.clock.stop()
+    # снимок, отданный GUI, не меняется от действий потока контроллера
+    assert view.clock.elapsed() < 1.0
+    assert view.clock.stopped_at is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        view.clock.started = 0.0
+    assert ctrl.view().clock.elapsed() == pytest.approx(40.0, abs=0.1)
+    ctrl.stop()
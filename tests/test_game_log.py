@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from core.board import Board
+from core.enums import GamePhase
+from core.game_log import GameLog
+from core.game_state import GameState
+
+
+def _view(state):
+    boards = {nick: b.to_matrix() for nick, b in state.boards.items()}
+    return (state.phase, state.current, dict(state.scores), dict(state.moves),
+            state.board.to_matrix() if state.board is not None else None, boards, state.winner)
+
+
+def _play(mode, log, moves=60):
+    # партия с журналом; возвращает живое состояние после каждого события журнала
+    random.seed(2)
+    state = GameState(mode, me="alice" if mode == "time" else None)
+    state.log = log
+    state.start(["alice", "bob"], queue=["alice", "bob"], board=Board())
+    live = {len(log): _view(state)}
+    rng = random.Random(9)
+    for i in range(moves):
+        player = state.current if mode == "chess" else ("alice", "bob")[i % 2]
+        state.move(player, *state.board_of(player).find_move(), rng)
+        live[len(log)] = _view(state)
+    return state, live
+
+
+@pytest.mark.parametrize("mode", ["chess", "time"])
+def test_seek_matches_live_state(mode):
+    log = GameLog(snapshot_every=8)
+    _, live = _play(mode, log)
+    assert log.snapshots
+    for index, view in live.items():
+        assert _view(log.seek(index)) == view
+
+
+def test_seek_clamps_index():
+    log = GameLog()
+    state, live = _play("chess", log, moves=5)
+    assert _view(log.seek(10 ** 6)) == _view(state)
+    assert log.seek(-1).phase == GamePhase.WAITING
+
+
+def test_load_reads_written_log(tmp_path):
+    path = tmp_path / "game.events"
+    log = GameLog(str(path), snapshot_every=16)
+    state, _ = _play("chess", log)
+    state.end("alice", state.scores["alice"])
+    log.close()
+    loaded = GameLog.load(str(path))
+    assert len(loaded) == len(log)
+    assert [i for i, _ in loaded.snapshots] == [i for i, _ in log.snapshots]
+    assert _view(loaded.seek(len(loaded))) == _view(state)
+
+
+def test_load_tolerates_truncated_tail(tmp_path):
+    path = tmp_path / "game.events"
+    log = GameLog(str(path))
+    _play("chess", log, moves=10)
+    log.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    loaded = GameLog.load(str(path))
+    assert len(loaded) == len(log) - 1
+
+
+def test_load_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not.events"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError):
+        GameLog.load(str(path))
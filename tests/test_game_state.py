@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from core.board import Board
+from core.enums import GamePhase
+from core.game_state import GameState, play_headless
+
+
+def _start(mode, me=None, seed=1):
+    random.seed(seed)
+    state = GameState(mode, me=me)
+    state.start(["alice", "bob"], queue=["alice", "bob"], board=Board())
+    return state
+
+
+def test_play_headless_finishes():
+    random.seed(7)
+    state = play_headless("time", ["alice", "bob"], seed=7)
+    assert state.phase == GamePhase.OVER
+    assert state.winner in ("alice", "bob")
+    assert state.winner_score == max(state.final_score(nick) for nick in ("alice", "bob"))
+    assert state.winner_score > GameState.FINISH_SCORE
+
+
+def test_chess_does_not_end_on_score():
+    random.seed(7)
+    state = play_headless("chess", ["alice", "bob"], seed=7, max_moves=1000)
+    assert state.phase == GamePhase.PLAYING
+    assert sum(state.moves.values()) == 1000
+    assert max(state.scores.values()) > GameState.FINISH_SCORE
+
+
+def test_play_headless_is_deterministic():
+    results = []
+    for _ in range(2):
+        random.seed(3)
+        state = play_headless("chess", ["alice", "bob"], seed=3)
+        results.append((state.scores, state.moves, state.board.to_matrix()))
+    assert results[0] == results[1]
+
+
+def test_chess_move_passes_turn_and_scores():
+    state = _start("chess")
+    a, b = state.board.find_move()
+    events = state.move("alice", a, b, random.Random(0))
+    assert [e.kind for e in events][:2] == ["swap_result", "score"]
+    result = events[0].move
+    assert result.success and result.steps
+    assert state.current == "bob"
+    assert state.scores["alice"] == len(result.steps[0].removed)
+    assert result.checksum == state.board.checksum()
+
+
+def test_chess_rejects_out_of_turn_and_bad_coordinates():
+    state = _start("chess")
+    a, b = state.board.find_move()
+    before = state.board.to_matrix()
+    assert state.move("bob", a, b) == []
+    assert state.move("alice", (0, 0), (2, 0)) == []
+    assert state.move("alice", (0, 0), (0, 7)) == []
+    assert state.board.to_matrix() == before
+    assert state.current == "alice"
+
+
+def test_time_mode_players_have_own_boards():
+    state = _start("time", me="alice")
+    assert state.board_of("bob") is not state.board
+    assert state.board_of("bob").to_matrix() == state.board.to_matrix()
+    a, b = state.board_of("bob").find_move()
+    state.move("bob", a, b)
+    assert state.scores["bob"] > 0 and state.scores["alice"] == 0
+
+
+def test_time_up_ends_game_with_current_scores():
+    state = _start("time", me="alice")
+    state.set_score("alice", 5)
+    state.set_score("bob", 9)
+    events = state.time_up()
+    assert [e.kind for e in events] == ["end_game"]
+    assert (state.winner, state.winner_score) == ("bob", 9)
+    assert state.phase == GamePhase.OVER
+
+
+def test_client_does_not_judge_the_end():
+    random.seed(1)
+    state = GameState("time", me="alice", judge=False)
+    state.start(["alice", "bob"], queue=["alice", "bob"], board=Board())
+    assert [e.kind for e in state.finish("alice", 1000)] == ["finish"]
+    assert [e.kind for e in state.finish("bob", 1001)] == ["finish"]
+    assert state.phase == GamePhase.PLAYING
@@ -0,0 +1,28 @@
+import socket
+import time
+
+from core.lobby import SessionDirectory
+from core.network_utils import encode_announce
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_bad_announce_does_not_stop_listener():
+    directory = SessionDirectory()
+    port = directory._sock.getsockname()[1]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+        for bad in ({"code": 1, "port": "x"}, {"code": 2, "port": 9000, "players": None},
+                    {"code": 3, "port": [1]}):
+            udp.sendto(encode_announce(bad), ("127.0.0.1", port))
+        udp.sendto(b"\xff\xfe", ("127.0.0.1", port))
+        udp.sendto(encode_announce({"code": "4", "port": 9001, "host_nick": "alice", "mode": "chess"}),
+                   ("127.0.0.1", port))
+        assert _wait(lambda: directory.find("4") is not None)
+    session = directory.find("4")
+    assert (session.port, session.host_nick, session.players) == (9001, "alice", 1)
+    assert directory.find("1") is None and directory.find("2") is None
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from core.match_store import MatchRecord, MatchStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.db"))
+    yield store
+    store.close()
+
+
+def _record(winner, scores, mode="time", finished_at=1.0, **kw):
+    return MatchRecord(mode=mode, time_limit=60, duration=12.5, winner=winner, scores=scores,
+                       finished_at=finished_at, **kw)
+
+
+def test_record_updates_leaderboard(store):
+    store.record(_record("alice", {"alice": 30, "bob": 10}, moves={"alice": 4, "bob": 3}))
+    store.record(_record("bob", {"alice": 5, "bob": 50}, finished_at=2.0))
+    store.record(_record("bob", {"bob": 20, "carol": 15}, finished_at=3.0))
+    store.flush()
+    assert store.top_players() == [("bob", 2, 3, 50), ("alice", 1, 2, 30), ("carol", 0, 1, 15)]
+    assert store.player_stats("alice") == (2, 1, 30)
+    assert store.player_stats("nobody") is None
+    assert [row[:2] for row in store.top_scores("time", limit=2)] == [("bob", 50), ("alice", 30)]
+    assert store.top_scores("chess") == []
+
+
+def test_history_is_newest_first(store):
+    store.record(_record("alice", {"alice": 30, "bob": 10}, moves={"alice": 4, "bob": 3}))
+    store.record(_record("bob", {"alice": 5, "bob": 50}, mode="chess", finished_at=2.0))
+    store.flush()
+    history = store.history("alice")
+    assert [(h[0], h[1], h[2], h[3], h[6]) for h in history] == [
+        (2.0, "chess", 5, 0, "bob"),
+        (1.0, "time", 30, 1, "alice"),
+    ]
+    assert history[1][5] == 4
+
+
+def test_batches_from_many_threads(store):
+    def worker(i):
+        for j in range(50):
+            store.record(_record(f"p{i}", {f"p{i}": j, "rival": 0}, finished_at=float(j)))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.flush()
+    assert store.player_stats("rival") == (400, 0, 0)
+    assert store.player_stats("p3") == (50, 50, 49)
+
+
+def test_close_writes_pending_results(tmp_path):
+    path = str(tmp_path / "matches.db")
+    store = MatchStore(path)
+    store.record(_record("alice", {"alice": 1}))
+    store.close()
+    reopened = MatchStore(path)
+    try:
+        assert reopened.player_stats("alice") == (1, 1, 1)
+    finally:
+        reopened.close()
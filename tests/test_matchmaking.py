@@ -0,0 +1,125 @@
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from core import protocol as proto
+from core.matchmaking import CHESS_TIME, AnyLimitPolicy, MatchQueue, MatchServer, MatchTicket
+
+
+def _ticket(nickname, mode="time", time_limit=60, enqueued=0.0):
+    return MatchTicket(nickname=nickname, mode=mode, time_limit=time_limit, enqueued=enqueued)
+
+
+def test_pairs_in_fifo_order():
+    queue = MatchQueue()
+    tickets = [_ticket(n, enqueued=i) for i, n in enumerate("abcd")]
+    assert queue.push(tickets[0]) is None
+    assert len(queue) == 1
+    assert queue.push(tickets[1]) == tickets[:2]
+    assert queue.push(tickets[2]) is None
+    assert queue.push(tickets[3]) == tickets[2:]
+    assert len(queue) == 0
+    assert all(t.matched for t in tickets)
+
+
+def test_pairs_only_within_bucket():
+    queue = MatchQueue()
+    assert queue.push(_ticket("a", "time", 60)) is None
+    assert queue.push(_ticket("b", "time", 90)) is None
+    assert queue.push(_ticket("c", "chess", 60)) is None
+    assert len(queue) == 3
+    # в шахматах лимит времени не важен
+    match = queue.push(_ticket("d", "chess", 120))
+    assert [t.nickname for t in match] == ["c", "d"]
+    assert queue.policy.settings(match) == ("chess", CHESS_TIME)
+
+
+def test_cancelled_ticket_is_skipped():
+    queue = MatchQueue()
+    a, b, c = _ticket("a", enqueued=0), _ticket("b", enqueued=1), _ticket("c", enqueued=2)
+    queue.push(a)
+    queue.cancel(a)
+    queue.cancel(a)
+    assert len(queue) == 0
+    assert queue.push(b) is None
+    assert queue.push(c) == [b, c]
+    assert not a.matched
+
+
+def test_cancel_after_match_is_noop():
+    queue = MatchQueue()
+    a, b = _ticket("a"), _ticket("b")
+    queue.push(a)
+    queue.push(b)
+    queue.cancel(a)
+    assert not a.cancelled and len(queue) == 0
+
+
+def test_mass_cancel_keeps_queue_consistent():
+    queue = MatchQueue()
+    # ушедшие из очереди остаются в куче лениво, пока их не выбросит пересборка
+    for i in range(300):
+        t = _ticket(f"p{i}", enqueued=i)
+        assert queue.push(t) is None
+        queue.cancel(t)
+    assert len(queue) == 0
+    a, b = _ticket("a", enqueued=1000), _ticket("b", enqueued=1001)
+    assert queue.push(a) is None
+    assert queue.push(b) == [a, b]
+
+
+def test_any_limit_policy_plays_the_shorter_limit():
+    queue = MatchQueue(AnyLimitPolicy())
+    queue.push(_ticket("a", time_limit=90))
+    match = queue.push(_ticket("b", time_limit=45))
+    assert queue.policy.settings(match) == ("time", 45)
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("QUEUE:time:60:bob", ("bob", "time", 60)),
+    ("QUEUE:chess:999:a:b", ("a:b", "chess", 999)),
+    ("QUEUE:time:5:bob", None),
+    ("QUEUE:blitz:60:bob", None),
+    ("QUEUE:time:60:", None),
+    ("bob", None),
+])
+def test_parse(line, expected):
+    ticket = MatchServer._parse(line)
+    assert (ticket and (ticket.nickname, ticket.mode, ticket.time_limit)) == expected
+
+
+def test_headless_import_has_no_qt():
+    code = "import sys, core.matchmaking; sys.exit('PyQt5' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def _queue(port, line):
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    sock.sendall(line)
+    return sock
+
+
+def test_server_pairs_players_into_session():
+    server = MatchServer(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        a = _queue(server.port, proto.hello("QUEUE:chess:999:alice"))
+        assert proto.read_line(a)[0] == "QUEUED"
+        dup = _queue(server.port, proto.hello("QUEUE:chess:999:alice"))
+        assert proto.read_line(dup)[0] == "INVALID_NICKNAME"
+        old = _queue(server.port, b"QUEUE:chess:999:carol\n")
+        assert proto.read_line(old)[0] == proto.UNSUPPORTED_VERSION
+        b = _queue(server.port, proto.hello("QUEUE:chess:999:bob"))
+        assert proto.read_line(b)[0] == "QUEUED"
+        replies = {proto.read_line(a)[0], proto.read_line(b)[0]}
+        (session,) = server.sessions
+        assert replies == {f"MATCH:{session.port}"}
+        assert session.players == ["alice", "bob"]
+        assert session.ctrl.state_ready is None
+        for sock in (a, b, dup, old):
+            sock.close()
+    finally:
+        server.shutdown()
@@ -0,0 +1,66 @@
+import random
+from collections import deque
+
+import pytest
+
+from core import protocol as proto
+from core.game_controller import GameController
+
+
+class Link:
+    # сервер и клиент в одном потоке: кадры идут через protocol, как по сети
+    def __init__(self):
+        self.to_client: deque[bytes] = deque()
+        self.to_server: deque[bytes] = deque()
+        self.server = GameController("chess", 999, "host", is_client=False,
+                                     on_send=self.to_client.append, actor=False)
+        self.client = GameController("chess", 999, "cli", is_client=True,
+                                     on_send=self.to_server.append, actor=False)
+        self.commands = []
+        self.client.state_ready = lambda cmd, view: self.commands.append(cmd)
+
+    def pump(self):
+        while self.to_client or self.to_server:
+            while self.to_server:
+                self.server.handle_command(proto.loads(self.to_server.popleft()), "cli")
+            while self.to_client:
+                self.client.handle_command(proto.loads(self.to_client.popleft()))
+
+    def play(self, moves):
+        for _ in range(moves):
+            side = self.server if self.server.current == "host" else self.client
+            side.request_move(*side.board.find_move())
+            if side is self.client:
+                assert self.client.move_result.predicted
+            self.pump()
+
+
+@pytest.fixture
+def link():
+    random.seed(8)
+    link = Link()
+    link.server.new_game(["host", "cli"])
+    link.pump()
+    return link
+
+
+def test_predicted_moves_match_server(link):
+    link.play(40)
+    assert link.client.board.to_matrix() == link.server.board.to_matrix()
+    assert link.client.board.checksum() == link.server.board.checksum()
+    assert link.client.scores == link.server.scores
+    assert "rollback" not in link.commands
+    assert link.commands.count("swap_result") == 40
+
+
+def test_mispredicted_move_rolls_back_to_server_board(link):
+    if link.server.current == "host":
+        link.play(1)
+    # клиент разыграет ход не тем сидом, что сервер
+    link.client.next_seed ^= 1
+    link.play(1)
+    assert link.commands[-1] == "rollback"
+    assert link.client.board.to_matrix() == link.server.board.to_matrix()
+    assert link.client.scores == link.server.scores
+    link.play(10)
+    assert link.client.board.checksum() == link.server.board.checksum()
@@ -0,0 +1,95 @@
+import json
+import random
+import socket
+
+import pytest
+
+from core import protocol as proto
+from core.board import Board
+
+
+def test_stamp_prepends_seq():
+    frame = proto.dumps(proto.ping(1.5))
+    stamped = proto.stamp(7, frame)
+    assert stamped.endswith(b"\n")
+    assert proto.loads(stamped) == {"seq": 7, "command": "ping", "t": 1.5}
+
+
+def test_frame_decoder_splits_and_buffers():
+    frames = [proto.stamp(i, proto.dumps(proto.ping(i))) for i in range(1, 4)]
+    data = b"".join(frames)
+    decoder = proto.FrameDecoder()
+    got = []
+    # кадры приходят кусками произвольной длины
+    for i in range(0, len(data), 5):
+        got += decoder.feed(data[i:i + 5])
+    assert [proto.loads(f)["seq"] for f in got] == [1, 2, 3]
+
+
+def test_frame_decoder_skips_blank_lines():
+    decoder = proto.FrameDecoder()
+    assert decoder.feed(b"\n\n" + proto.dumps(proto.pong(1.0))[:-1]) == []
+    assert [proto.loads(f) for f in decoder.feed(b"\n")] == [proto.pong(1.0)]
+
+
+def test_read_line_keeps_rest():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(b"bo")
+        a.sendall(b"b\n" + proto.dumps(proto.ping(2.0)))
+        line, rest = proto.read_line(b)
+        assert line == "bob"
+        while not rest.endswith(b"\n"):
+            rest += b.recv(1024)
+        assert proto.FrameDecoder().feed(rest) == [proto.dumps(proto.ping(2.0))[:-1]]
+
+
+def test_read_line_raises_on_close():
+    a, b = socket.socketpair()
+    with b:
+        a.sendall(b"half")
+        a.close()
+        with pytest.raises(ConnectionError):
+            proto.read_line(b)
+
+
+def test_swap_result_steps_roundtrip():
+    random.seed(4)
+    board = Board()
+    replica = board.copy()
+    a, b = board.find_move()
+    success, steps = board.resolve_swap(a, b, random.Random(1))
+    msg = proto.swap_result(player="alice", a_lbl=a, b_lbl=b, success=success, steps=steps,
+                            board=board.to_matrix(), next_player="bob", scores={"alice": 3},
+                            checksum=board.checksum(), next_seed=1)
+    data = proto.loads(proto.dumps(msg))
+    decoded = [proto.dict_to_step(step) for step in data["steps"]]
+    assert decoded == steps
+    replica.swap_cells(a, b)
+    for step in decoded:
+        replica.apply_step(step)
+    assert replica.checksum() == data["checksum"]
+
+
+def test_dumps_is_one_compact_line():
+    raw = proto.dumps(proto.start_game(mode="chess", queue=["a", "b"], nicknames=["a", "b"],
+                                       board=Board().to_matrix(), time_limit=60, next_seed=5))
+    assert raw.count(b"\n") == 1 and raw.endswith(b"\n")
+    assert json.loads(raw)["command"] == "start_game"
+
+
+def test_hello_carries_protocol_version():
+    raw = proto.hello("SPECTATE:eve")
+    assert raw.endswith(b"\n")
+    assert proto.parse_hello(raw[:-1].decode()) == (proto.PROTOCOL_VERSION, "SPECTATE:eve")
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("bob", (1, "bob")),
+    ("PROTO3:bob", (3, "bob")),
+    ("PROTO:bob", (1, "PROTO:bob")),
+    ("PROTOx:bob", (1, "PROTOx:bob")),
+    ("PROTO2:RESUME:ab:4", (2, "RESUME:ab:4")),
+])
+def test_parse_hello(line, expected):
+    assert proto.parse_hello(line) == expected
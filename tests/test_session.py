@@ -0,0 +1,111 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from core import protocol as proto
+from core.session import Session
+
+
+@pytest.fixture
+def session():
+    # сессия без хоста: стартует сама, когда подключились оба игрока
+    session = Session(mode="chess", time=999, port=0, players=["alice", "bob"])
+    threading.Thread(target=session.start, daemon=True).start()
+    yield session
+    session.shutdown()
+
+
+def _connect(session, *parts):
+    sock = socket.create_connection(("127.0.0.1", session.port), timeout=5)
+    for part in parts:
+        sock.sendall(part)
+        time.sleep(0.02)
+    return sock
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def _frames(sock, rest, until):
+    decoder = proto.FrameDecoder()
+    frames = [proto.loads(f) for f in decoder.feed(rest)]
+    while not any(until(f) for f in frames):
+        frames += [proto.loads(f) for f in decoder.feed(sock.recv(65536))]
+    return frames
+
+
+def test_hello_split_across_packets(session):
+    hello = proto.hello("alice")
+    with _connect(session, hello[:4], hello[4:]) as sock:
+        line, _ = proto.read_line(sock)
+        assert line.startswith("WELCOME:")
+
+
+def test_frames_after_hello_are_kept(session):
+    with _connect(session, proto.hello("alice") + proto.dumps(proto.ping(4.0))) as sock:
+        line, rest = proto.read_line(sock)
+        assert line.startswith("WELCOME:")
+        frames = _frames(sock, rest, lambda f: f["command"] == "pong")
+        assert any(f["command"] == "pong" and f["t"] == 4.0 for f in frames)
+
+
+@pytest.mark.parametrize("hello", [b"alice\n", b"PROTO1:alice\n", b"PROTO3:SPECTATE:eve\n"])
+def test_other_protocol_versions_are_rejected(session, hello):
+    with _connect(session, hello) as sock:
+        assert proto.read_line(sock)[0] == proto.UNSUPPORTED_VERSION
+        assert sock.recv(1) == b""
+
+
+def test_unknown_player_is_rejected(session):
+    with _connect(session, proto.hello("mallory")) as sock:
+        assert proto.read_line(sock)[0] == "INVALID_NICKNAME"
+
+
+def test_game_reaches_players_and_spectator(session):
+    socks = [_connect(session, proto.hello(nick)) for nick in ("alice", "bob")]
+    spectator = _connect(session, proto.hello(proto.SPECTATE_PREFIX + "eve"))
+    try:
+        for sock in socks:
+            line, rest = proto.read_line(sock)
+            assert line.startswith("WELCOME:")
+            start = _frames(sock, rest, lambda f: f["command"] == "start_game")[-1]
+            assert start["nicknames"] == ["alice", "bob"]
+        line, rest = proto.read_line(spectator)
+        assert line == "WELCOME"
+        frames = _frames(spectator, rest, lambda f: f["command"] in ("start_game", "snapshot"))
+        # зритель успел к началу (start_game) или пришёл позже (snapshot) — доска та же
+        assert frames[-1]["board"] == start["board"]
+        assert session.game_started
+    finally:
+        for sock in socks + [spectator]:
+            sock.close()
+
+
+def test_shutdown_stops_controller_and_clock():
+    session = Session(mode="time", time=60, port=0, players=["alice", "bob"])
+    session.ctrl.new_game(["alice", "bob"])
+    clock = session.ctrl.call(lambda: session.ctrl.clock)
+    session.shutdown()
+    session.ctrl._actor.join(timeout=2)
+    assert not session.ctrl._actor.is_alive()
+    assert clock._timer is None
+
+
+def test_unstamped_frame_keeps_dedupe_watermark(session):
+    applied = []
+    session._apply_frame = lambda frame, data, nickname: applied.append(data.get("seq", 0))
+    move = proto.dumps(proto.move((0, 0), (0, 1)))
+    with _connect(session, proto.hello("alice")) as sock:
+        proto.read_line(sock)
+        sock.sendall(proto.stamp(1, move) + proto.stamp(2, move) + move + proto.stamp(2, move)
+                     + proto.stamp(1, move) + proto.stamp(3, move))
+        assert _wait(lambda: len(applied) == 4)
+        time.sleep(0.05)
+        assert applied == [1, 2, 0, 3]
+        assert session._received["alice"] == 3